@@ -0,0 +1,411 @@
+"""
+Benchmark of the whole ingest pipeline (MainScript.run_main_script) against local S3 stand-in.
+
+Run from the root of repository:
+    python -m benchmarks.benchmark_pipeline --files 20 --file-size 8MiB --columns 12
+    python -m benchmarks.benchmark_pipeline --scenario gzip --set compression_config.codec=gzip --save-baseline
+    python -m benchmarks.benchmark_pipeline --scenario gzip --set compression_config.codec=gzip --compare
+
+Synthetic csv files are generated in temporary workspace with its own copy of config_data, so real configs, raw data
+and buckets are never touched. Report contains wall time, throughput (MB/s, files/s) and peak RSS of the whole run and
+of every stage. Baselines are saved to benchmarks/baselines/<scenario>.json, '--compare' fails if some stage became
+slower than baseline by more than '--tolerance'.
+"""
+from benchmarks.corpus_generator import CorpusGenerator
+from benchmarks.local_s3 import LocalS3Client
+from collections import defaultdict
+from typing import Any, Optional
+import argparse
+import functools
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class StageTimer:
+    """
+    Class StageTimer measures wall time of pipeline stages by wrapping static methods of the script classes.
+    Time of a stage doesn't include time of other stages which are called inside it (e.g. verification of uploaded
+    objects inside upload), so times of all stages add up to time of the run.
+    """
+    def __init__(self):
+        self.__seconds: dict[str, float] = defaultdict(float)
+        self.__calls: dict[str, int] = defaultdict(int)
+        self.__lock: threading.Lock = threading.Lock()
+        self.__local: threading.local = threading.local()
+        self.__patched: list[tuple[type, str, staticmethod]] = []
+
+    def wrap(self, owner: type, method_name: str, stage: str):
+        """
+        Method wrap replaces static method of the class by the method which measures time of its calls
+        :param owner: class of the method
+        :type owner: type
+        :param method_name: name of static method
+        :type method_name: str
+        :param stage: name of stage which time is measured
+        :type stage: str
+        :return: Nothing
+        """
+        original: staticmethod = owner.__dict__[method_name]
+        function = original.__func__
+        timer: StageTimer = self
+
+        @functools.wraps(function)
+        def timed_function(*args, **kwargs):
+            stack: list[float] = timer.__get_stack()
+            stack.append(0.0)
+            start: float = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed: float = time.perf_counter() - start
+                nested: float = stack.pop()
+                if len(stack) > 0:
+                    stack[-1] += elapsed
+                with timer.__lock:
+                    timer.__seconds[stage] += elapsed - nested
+                    timer.__calls[stage] += 1
+
+        setattr(owner, method_name, staticmethod(timed_function))
+        self.__patched.append((owner, method_name, original))
+
+    def restore(self):
+        """
+        Method restore returns original methods back to their classes
+        :return: Nothing
+        """
+        for owner, method_name, original in reversed(self.__patched):
+            setattr(owner, method_name, original)
+        self.__patched.clear()
+
+    def get_stages(self) -> dict[str, dict]:
+        """
+        Method get_stages returns measured stages
+        :return: 'seconds' and 'calls' of every stage by its name
+        :rtype: dict[str, dict]
+        """
+        with self.__lock:
+            return {stage: {"seconds": self.__seconds[stage], "calls": self.__calls[stage]} for stage in self.__seconds}
+
+    def __get_stack(self) -> list[float]:
+        """
+        Private method for getting stack of stages which are measured in the current thread
+        :return: time of nested stages of every measured stage
+        :rtype: list[float]
+        """
+        if not hasattr(self.__local, "stack"):
+            self.__local.stack = []
+        return self.__local.stack
+
+
+class PipelineBenchmark:
+    """
+    Class PipelineBenchmark prepares workspace, runs the pipeline and builds report of the run
+    """
+    repo_root: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    baselines_dir: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+    mib: int = 1024 * 1024
+
+    @staticmethod
+    def parse_size(size: str) -> int:
+        """
+        Method parse_size converts size like '512KiB', '8MiB', '1GiB' or number of bytes to number of bytes
+        :param size: size with optional unit
+        :type size: str
+        :return: number of bytes
+        :rtype: int
+        """
+        match: Optional[re.Match] = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMG]?)(?:i?B)?\s*", size, re.IGNORECASE)
+        if match is None:
+            raise argparse.ArgumentTypeError(f"Size '{size}' can't be parsed")
+        multiplier: int = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}[match.group(2).upper()]
+        return int(float(match.group(1)) * multiplier)
+
+    @staticmethod
+    def parse_override(override: str) -> tuple[list[str], Any]:
+        """
+        Method parse_override parses override of main config like 'compression_config.codec=gzip'. Value is parsed as
+        json if it's possible, otherwise it's used as string.
+        :param override: '<section>.<key>=<value>'
+        :type override: str
+        :return: path of keys and value
+        :rtype: tuple[list[str], Any]
+        """
+        keys, separator, value = override.partition("=")
+        if separator == "":
+            raise argparse.ArgumentTypeError(f"Override '{override}' must look like 'section.key=value'")
+        try:
+            return keys.split("."), json.loads(value)
+        except ValueError:
+            return keys.split("."), value
+
+    @staticmethod
+    def prepare_workspace(workspace: str, overrides: list[tuple[list[str], Any]]):
+        """
+        Method prepare_workspace copies config_data to workspace and points all directories of configs to workspace
+        :param workspace: directory of the run
+        :type workspace: str
+        :param overrides: overrides of main config
+        :type overrides: list[tuple[list[str], Any]]
+        :return: Nothing
+        """
+        config_dir: str = os.path.join(workspace, "config_data")
+        shutil.copytree(os.path.join(PipelineBenchmark.repo_root, "config_data"), config_dir)
+        with open(os.path.join(config_dir, "main_config.json"), encoding="utf-8") as config_file:
+            main_config: dict = json.load(config_file)
+        main_config["raw_data_dir"] = os.path.join(workspace, "raw", "")
+        main_config["dir_to_move"] = os.path.join(workspace, "moved", "")
+        main_config["multipart_config"]["checkpoint_dir"] = os.path.join(workspace, "checkpoints", "")
+        main_config["dedup_config"]["manifest_path"] = os.path.join(workspace, "manifest", "manifest.sqlite3")
+        main_config["journal_config"]["journal_dir"] = os.path.join(workspace, "journals", "")
+        main_config["watch_config"]["enabled"] = "False"
+        main_config["pipelines"] = []
+        for keys, value in overrides:
+            section: dict = main_config
+            for key in keys[:-1]:
+                section = section.setdefault(key, {})
+            section[keys[-1]] = value
+        with open(os.path.join(config_dir, "main_config.json"), "w", encoding="utf-8") as config_file:
+            json.dump(main_config, config_file, indent=2)
+
+        with open(os.path.join(config_dir, "logger_config.json"), encoding="utf-8") as config_file:
+            logger_config: dict = json.load(config_file)
+        logger_config["log_dir"] = os.path.join(workspace, "logs")
+        with open(os.path.join(config_dir, "logger_config.json"), "w", encoding="utf-8") as config_file:
+            json.dump(logger_config, config_file, indent=2)
+        os.makedirs(main_config["dir_to_move"], exist_ok=True)
+
+    @staticmethod
+    def get_peak_rss_mb(who: int) -> Optional[float]:
+        """
+        Method get_peak_rss_mb returns peak resident set size of the process or of its finished child processes
+        :param who: resource.RUSAGE_SELF or resource.RUSAGE_CHILDREN
+        :type who: int
+        :return: peak RSS in MiB or None if it can't be measured on this platform
+        :rtype: Optional[float]
+        """
+        if resource is None:
+            return None
+        peak_rss: int = resource.getrusage(who).ru_maxrss
+        # ru_maxrss is measured in bytes on macOS and in KiB on the other platforms
+        return peak_rss / PipelineBenchmark.mib if sys.platform == "darwin" else peak_rss / 1024
+
+    @staticmethod
+    def run(args: argparse.Namespace) -> dict:
+        """
+        Method run generates corpus, runs the pipeline against local S3 stand-in and returns report of the run
+        :param args: arguments of command line
+        :type args: argparse.Namespace
+        :return: report of the run
+        :rtype: dict
+        """
+        workspace: str = tempfile.mkdtemp(prefix="s3_ingest_benchmark_")
+        current_dir: str = os.getcwd()
+        PipelineBenchmark.prepare_workspace(workspace, args.overrides)
+        corpus: list[str] = CorpusGenerator.generate_corpus(os.path.join(workspace, "raw"), args.files,
+                                                            args.file_size, args.columns, args.seed)
+        corpus_bytes: int = sum(os.path.getsize(path) for path in corpus)
+        os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+        os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+        os.environ.setdefault("REGION_NAME", "us-east-1")
+        os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+        os.chdir(workspace)
+        timer: StageTimer = StageTimer()
+        mock = None
+        local_s3_client: Optional[LocalS3Client] = None
+        try:
+            # modules of the script read configs from 'config_data' of current directory when they are imported
+            from main import MainScript
+            from utils.aws_utils.aws_waiter_manager import WaiterManager
+            from utils.aws_utils.multipart_uploader import MultipartUploader
+            from utils.aws_utils.s3_client_manager import S3ClientManager
+            from utils.aws_utils.s3_uploader import S3Uploader
+            from utils.config_manager import ConfigReader
+            from utils.csv_sniffer import CsvSniffer
+            from utils.file_manager_utils.file_manager import FileManager
+            from utils.file_manager_utils.file_writer import FileWriter
+            from utils.file_profiler import FileProfiler
+            from utils.parquet_converter import ParquetConverter
+
+            if args.backend == "moto":
+                from moto import mock_aws
+                mock = mock_aws()
+                mock.start()
+            else:
+                local_s3_client = LocalS3Client(os.path.join(workspace, "s3"), args.throttle_rate,
+                                                args.max_concurrent_requests, args.latency, args.seed)
+                S3ClientManager().set_s3_client(local_s3_client)
+            main_config = ConfigReader.get_main_config()
+            for bucket in {main_config["s3_raw_bucket"], main_config["s3_metadata_bucket"]}:
+                S3ClientManager().get_s3_client().create_bucket(Bucket=bucket)
+
+            for stage, owner, method_name in (
+                    ("scan", FileManager, "scan_raw_data_files"),
+                    ("sniff", CsvSniffer, "sniff_multiple_files"),
+                    ("rename", FileManager, "rename_multiple_files"),
+                    ("profile", FileProfiler, "profile_multiple_files"),
+                    ("convert", ParquetConverter, "convert_csv_to_parquet"),
+                    ("metadata_write", FileWriter, "create_json_ingest_metadata_file"),
+                    ("upload", MultipartUploader, "abort_stale_uploads"),
+                    ("upload", S3Uploader, "upload_multiple_files_to_s3_bucket"),
+                    ("upload", S3Uploader, "copy_object_in_s3"),
+                    ("upload", S3Uploader, "sent_file_to_s3_bucket_and_wait_for_it_being_uploaded"),
+                    ("wait", WaiterManager, "verify_objects_exist_in_S3"),
+                    ("move_or_delete", FileManager, "move_files_to_folder"),
+                    ("move_or_delete", FileManager, "remove_multiple_files")):
+                timer.wrap(owner, method_name, stage)
+            start: float = time.perf_counter()
+            MainScript.run_main_script()
+            total_seconds: float = time.perf_counter() - start
+        finally:
+            timer.restore()
+            if mock is not None:
+                mock.stop()
+            os.chdir(current_dir)
+            if not args.keep:
+                shutil.rmtree(workspace, ignore_errors=True)
+
+        corpus_mb: float = corpus_bytes / PipelineBenchmark.mib
+        stages: dict[str, dict] = timer.get_stages()
+        for stage in stages.values():
+            stage["mb_per_second"] = corpus_mb / stage["seconds"] if stage["seconds"] > 0 else None
+            stage["files_per_second"] = args.files / stage["seconds"] if stage["seconds"] > 0 else None
+        stages["other"] = {"seconds": max(total_seconds - sum(stage["seconds"] for stage in stages.values()), 0.0),
+                           "calls": 1, "mb_per_second": None, "files_per_second": None}
+        return {
+            "scenario": args.scenario,
+            "parameters": {"files": args.files, "file_size_bytes": args.file_size, "columns": args.columns,
+                           "seed": args.seed, "backend": args.backend, "throttle_rate": args.throttle_rate,
+                           "max_concurrent_requests": args.max_concurrent_requests, "latency": args.latency,
+                           "overrides": {".".join(keys): value for keys, value in args.overrides}},
+            "corpus_bytes": corpus_bytes,
+            "total_seconds": total_seconds,
+            "mb_per_second": corpus_mb / total_seconds,
+            "files_per_second": args.files / total_seconds,
+            "peak_rss_mb": PipelineBenchmark.get_peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+            "peak_rss_children_mb": PipelineBenchmark.get_peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None,
+            "stages": stages,
+            "throttled_requests": local_s3_client.throttled_requests if local_s3_client is not None else None,
+            "workspace": workspace if args.keep else None
+        }
+
+    @staticmethod
+    def format_report(report: dict) -> str:
+        """
+        Method format_report formats report as table for console
+        :param report: report of the run
+        :type report: dict
+        :return: formatted report
+        :rtype: str
+        """
+        lines: list[str] = [
+            f"scenario '{report['scenario']}': {report['parameters']['files']} files, "
+            f"{report['corpus_bytes'] / PipelineBenchmark.mib:.1f} MiB, backend '{report['parameters']['backend']}'",
+            f"{'stage':<16}{'seconds':>10}{'calls':>8}{'MB/s':>10}{'files/s':>10}"
+        ]
+        for stage, measures in report["stages"].items():
+            mb_per_second: str = f"{measures['mb_per_second']:.1f}" if measures["mb_per_second"] else "-"
+            files_per_second: str = f"{measures['files_per_second']:.1f}" if measures["files_per_second"] else "-"
+            lines.append(f"{stage:<16}{measures['seconds']:>10.3f}{measures['calls']:>8}"
+                         f"{mb_per_second:>10}{files_per_second:>10}")
+        lines.append(f"{'total':<16}{report['total_seconds']:>10.3f}{'':>8}"
+                     f"{report['mb_per_second']:>10.1f}{report['files_per_second']:>10.1f}")
+        if report["peak_rss_mb"] is not None:
+            lines.append(f"peak RSS: {report['peak_rss_mb']:.1f} MiB, "
+                         f"child processes: {report['peak_rss_children_mb']:.1f} MiB")
+        if report["throttled_requests"]:
+            lines.append(f"throttled requests: {report['throttled_requests']}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def compare_with_baseline(report: dict, baseline: dict, tolerance: float, min_seconds: float) -> list[str]:
+        """
+        Method compare_with_baseline finds stages which became slower than in baseline by more than tolerance.
+        Differences smaller than min_seconds are ignored as noise.
+        :param report: report of the run
+        :type report: dict
+        :param baseline: report of baseline run
+        :type baseline: dict
+        :param tolerance: allowed relative slowdown, e.g. 0.2 for 20%
+        :type tolerance: float
+        :param min_seconds: allowed absolute slowdown in seconds
+        :type min_seconds: float
+        :return: descriptions of regressions
+        :rtype: list[str]
+        """
+        measures: dict[str, tuple[float, float]] = {"total": (report["total_seconds"], baseline["total_seconds"])}
+        for stage, stage_measures in report["stages"].items():
+            if stage in baseline["stages"]:
+                measures[stage] = (stage_measures["seconds"], baseline["stages"][stage]["seconds"])
+        regressions: list[str] = []
+        for stage, (seconds, baseline_seconds) in measures.items():
+            if seconds > baseline_seconds * (1 + tolerance) and seconds - baseline_seconds > min_seconds:
+                regressions.append(f"{stage}: {seconds:.3f}s vs baseline {baseline_seconds:.3f}s")
+        if report["peak_rss_mb"] and baseline.get("peak_rss_mb") \
+                and report["peak_rss_mb"] > baseline["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"peak RSS: {report['peak_rss_mb']:.1f} MiB vs baseline "
+                               f"{baseline['peak_rss_mb']:.1f} MiB")
+        return regressions
+
+
+def main() -> int:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Benchmark of the whole ingest pipeline")
+    parser.add_argument("--scenario", default="default", help="name of scenario, used as name of baseline")
+    parser.add_argument("--files", type=int, default=20, help="number of generated csv files")
+    parser.add_argument("--file-size", type=PipelineBenchmark.parse_size, default="4MiB",
+                        help="approximate size of every file, e.g. 512KiB, 8MiB")
+    parser.add_argument("--columns", type=int, default=12, help="number of columns of generated files")
+    parser.add_argument("--seed", type=int, default=0, help="seed of generated data")
+    parser.add_argument("--backend", choices=("local", "moto"), default="local",
+                        help="'local' is filesystem-backed S3 stand-in, 'moto' requires 'moto' package")
+    parser.add_argument("--throttle-rate", type=float, default=0.0,
+                        help="probability of 503 SlowDown response of local backend to upload request")
+    parser.add_argument("--max-concurrent-requests", type=int, default=0,
+                        help="upload requests over this number are throttled by local backend, 0 means no limit")
+    parser.add_argument("--latency", type=float, default=0.0, help="min duration of upload request of local backend")
+    parser.add_argument("--set", dest="overrides", type=PipelineBenchmark.parse_override, action="append",
+                        default=[], help="override of main config, e.g. compression_config.codec=gzip")
+    parser.add_argument("--save-baseline", action="store_true", help="save report as baseline of scenario")
+    parser.add_argument("--compare", action="store_true", help="compare report with baseline of scenario")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown against baseline")
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="allowed absolute slowdown in seconds")
+    parser.add_argument("--output", help="path where json report is saved")
+    parser.add_argument("--keep", action="store_true", help="don't remove workspace of the run")
+    args: argparse.Namespace = parser.parse_args()
+
+    report: dict = PipelineBenchmark.run(args)
+    print(PipelineBenchmark.format_report(report))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+    baseline_path: str = os.path.join(PipelineBenchmark.baselines_dir, f"{args.scenario}.json")
+    if args.save_baseline:
+        os.makedirs(PipelineBenchmark.baselines_dir, exist_ok=True)
+        with open(baseline_path, "w", encoding="utf-8") as baseline_file:
+            json.dump(report, baseline_file, indent=2)
+        print(f"baseline is saved to '{baseline_path}'")
+    if args.compare:
+        with open(baseline_path, encoding="utf-8") as baseline_file:
+            baseline: dict = json.load(baseline_file)
+        regressions: list[str] = PipelineBenchmark.compare_with_baseline(report, baseline, args.tolerance,
+                                                                         args.min_seconds)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if len(regressions) > 0:
+            return 1
+        print("no regressions against baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
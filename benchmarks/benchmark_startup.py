@@ -0,0 +1,97 @@
+"""
+Benchmark of cold start of the script: time of importing of main module measured by 'python -X importtime'.
+
+Run from the root of repository:
+    python -m benchmarks.benchmark_startup
+    python -m benchmarks.benchmark_startup --budget-ms 200 --runs 9
+
+The same checks are run by tests/test_startup.py.
+
+Every run is a fresh interpreter which only imports main module, so nothing is cached between runs except compiled
+bytecode. The check fails if median import time is over '--budget-ms' or if heavy packages which are required only by
+some stages (pandas, numpy, pyarrow, boto3, zstandard) are loaded by the import.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+
+class StartupBenchmark:
+    """
+    Class StartupBenchmark runs import of main module in fresh interpreters and parses output of '-X importtime'
+    """
+    repo_root: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    lazy_packages: tuple[str, ...] = ("pandas", "numpy", "pyarrow", "boto3", "botocore.client",
+                                      "boto3_type_annotations", "zstandard")
+    budget_ms: float = 250.0
+
+    @staticmethod
+    def measure_import(module: str) -> dict[str, tuple[int, int]]:
+        """
+        Method measure_import imports module in fresh interpreter with '-X importtime'
+        :param module: name of imported module
+        :type module: str
+        :return: self and cumulative import time in microseconds of every imported module by its name
+        :rtype: dict[str, tuple[int, int]]
+        """
+        completed: subprocess.CompletedProcess = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=StartupBenchmark.repo_root, capture_output=True, text=True, check=True
+        )
+        import_times: dict[str, tuple[int, int]] = {}
+        for line in completed.stderr.splitlines():
+            if not line.startswith("import time:") or "imported package" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            import_times[name.strip()] = (int(self_us), int(cumulative_us))
+        return import_times
+
+    @staticmethod
+    def get_top_level_imports(import_times: dict[str, tuple[int, int]], module: str, top: int) -> list[tuple[str, int]]:
+        """
+        Method get_top_level_imports finds modules of the repository which take the most time to import
+        :param import_times: self and cumulative import times by module names
+        :type import_times: dict[str, tuple[int, int]]
+        :param module: name of imported module
+        :type module: str
+        :param top: number of returned modules
+        :type top: int
+        :return: names of modules and their cumulative import time in microseconds
+        :rtype: list[tuple[str, int]]
+        """
+        own_modules: list[tuple[str, int]] = [(name, cumulative_us) for name, (_, cumulative_us) in import_times.items()
+                                              if name.startswith("utils") or name == module]
+        return sorted(own_modules, key=lambda item: item[1], reverse=True)[:top]
+
+
+def main() -> int:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Benchmark of cold start of the script")
+    parser.add_argument("--module", default="main", help="name of module which import is measured")
+    parser.add_argument("--runs", type=int, default=5, help="number of measured imports, median is checked")
+    parser.add_argument("--budget-ms", type=float, default=StartupBenchmark.budget_ms, help="max median import time in milliseconds")
+    parser.add_argument("--top", type=int, default=10, help="number of the slowest modules in report")
+    args: argparse.Namespace = parser.parse_args()
+
+    # the first import compiles bytecode, so it isn't measured
+    StartupBenchmark.measure_import(args.module)
+    runs: list[dict[str, tuple[int, int]]] = [StartupBenchmark.measure_import(args.module) for _ in range(args.runs)]
+    median_ms: float = statistics.median(run[args.module][1] for run in runs) / 1000
+    print(f"import of '{args.module}': median {median_ms:.1f} ms of {args.runs} runs, budget {args.budget_ms:.1f} ms")
+    for name, cumulative_us in StartupBenchmark.get_top_level_imports(runs[-1], args.module, args.top):
+        print(f"{name:<48}{cumulative_us / 1000:>10.1f} ms")
+
+    failures: list[str] = []
+    if median_ms > args.budget_ms:
+        failures.append(f"import time {median_ms:.1f} ms is over budget {args.budget_ms:.1f} ms")
+    loaded: list[str] = [name for name in StartupBenchmark.lazy_packages if name in runs[-1]]
+    if len(loaded) > 0:
+        failures.append(f"packages {loaded} are loaded at import, they must be imported by stages which need them")
+    for failure in failures:
+        print(f"FAILED {failure}")
+    return 1 if len(failures) > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
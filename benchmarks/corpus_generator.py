@@ -0,0 +1,74 @@
+"""
+Module of corpus_generator. Class CorpusGenerator is represented in this module.
+"""
+import os
+import random
+
+
+class CorpusGenerator:
+    """
+    Class CorpusGenerator generates synthetic csv files for benchmarks. Files of the same parameters and seed are the
+    same byte by byte, so results of different runs are comparable. Some text values are quoted and contain delimiters
+    and line breaks, as real exports do.
+    """
+    @staticmethod
+    def generate_row(rng: random.Random, column_count: int) -> str:
+        """
+        Method generate_row generates one csv row with integer, float and text columns one after another
+        :param rng: random generator
+        :type rng: random.Random
+        :param column_count: number of columns
+        :type column_count: int
+        :return: csv row with line break at the end
+        :rtype: str
+        """
+        values: list[str] = []
+        for column in range(column_count):
+            if column % 3 == 0:
+                values.append(str(rng.randrange(10 ** 9)))
+            elif column % 3 == 1:
+                values.append(f"{rng.uniform(-1e6, 1e6):.4f}")
+            elif rng.random() < 0.1:
+                values.append(f'"text, {rng.randrange(10 ** 6)}\nnext line"')
+            else:
+                values.append(f"text_{rng.randrange(10 ** 6)}")
+        return ",".join(values) + "\n"
+
+    @staticmethod
+    def generate_corpus(directory: str, file_count: int, file_size_bytes: int, column_count: int,
+                        seed: int = 0) -> list[str]:
+        """
+        Method generate_corpus generates csv files of about file_size_bytes bytes each (files end on row boundary)
+        :param directory: directory where files are generated
+        :type directory: str
+        :param file_count: number of files
+        :type file_count: int
+        :param file_size_bytes: approximate size of every file in bytes
+        :type file_size_bytes: int
+        :param column_count: number of columns
+        :type column_count: int
+        :param seed: seed of random generator
+        :type seed: int
+        :return: paths to generated files
+        :rtype: list[str]
+        """
+        os.makedirs(directory, exist_ok=True)
+        header: str = ",".join(f"column_{column}" for column in range(column_count)) + "\n"
+        paths: list[str] = []
+        for file_number in range(file_count):
+            rng: random.Random = random.Random(f"{seed}_{file_number}")
+            path: str = os.path.join(directory, f"source_{file_number:05d}.csv")
+            with open(path, "w", encoding="utf-8", newline="") as csv_file:
+                csv_file.write(header)
+                written: int = len(header)
+                rows: list[str] = []
+                while written < file_size_bytes:
+                    row: str = CorpusGenerator.generate_row(rng, column_count)
+                    rows.append(row)
+                    written += len(row)
+                    if len(rows) == 10000:
+                        csv_file.write("".join(rows))
+                        rows.clear()
+                csv_file.write("".join(rows))
+            paths.append(path)
+        return paths
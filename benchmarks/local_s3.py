@@ -0,0 +1,258 @@
+"""
+Module of local_s3. Class LocalS3Client is represented in this module.
+"""
+from botocore.exceptions import ClientError
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator, Optional, Union
+import base64
+import hashlib
+import os
+import random
+import shutil
+import threading
+import time
+import uuid
+
+
+class LocalS3Client:
+    """
+    Class LocalS3Client is a filesystem-backed stand-in for S3 client. It implements only the part of S3 API which is
+    used by the script (single and multipart uploads, listings, waiter and copy), so the whole pipeline can be run and
+    measured without network. Objects are stored as files in '<root>/<bucket>/<key>', ETags are counted the same way as
+    S3 does (MD5 of object or MD5 of MD5s of parts with '-<number of parts>' suffix).
+    Public methods have the same names, parameters and responses as methods of boto3 S3 client.
+    Throttling of S3 can be injected: PutObject and UploadPart requests fail with 503 SlowDown with 'throttle_rate'
+    probability or when more than 'max_concurrent_requests' of them are in flight, and every such request takes at
+    least 'latency_seconds'.
+    """
+    page_size: int = 1000
+
+    def __init__(self, root: str, throttle_rate: float = 0.0, max_concurrent_requests: int = 0,
+                 latency_seconds: float = 0.0, seed: Optional[int] = None):
+        """
+        :param root: directory where buckets are stored
+        :type root: str
+        :param throttle_rate: probability of 503 SlowDown response to upload request
+        :type throttle_rate: float
+        :param max_concurrent_requests: upload requests over this number are throttled, 0 means no limit
+        :type max_concurrent_requests: int
+        :param latency_seconds: min duration of upload request
+        :type latency_seconds: float
+        :param seed: seed of random throttling
+        :type seed: Optional[int]
+        """
+        self.__root: str = os.path.normpath(root)
+        self.__lock: threading.Lock = threading.Lock()
+        self.__etags: dict[tuple[str, str], str] = {}
+        self.__uploads: dict[str, dict] = {}
+        self.__throttle_rate: float = throttle_rate
+        self.__max_concurrent_requests: int = max_concurrent_requests
+        self.__latency_seconds: float = latency_seconds
+        self.__random: random.Random = random.Random(seed)
+        self.__requests_in_flight: int = 0
+        self.throttled_requests: int = 0
+
+    def create_bucket(self, Bucket: str, **kwargs) -> dict:
+        os.makedirs(os.path.join(self.__root, Bucket), exist_ok=True)
+        return self.__response({})
+
+    def put_object(self, Bucket: str, Key: str, Body: Union[bytes, bytearray], ContentMD5: Optional[str] = None,
+                   **kwargs) -> dict:
+        with self.__upload_request("PutObject"):
+            body: Union[bytes, bytearray] = Body if isinstance(Body, (bytes, bytearray)) else Body.read()
+            digest: bytes = self.__check_content_md5(body, ContentMD5, "PutObject")
+            etag: str = f'"{digest.hex()}"'
+            self.__write_object(Bucket, Key, [body], etag)
+            return self.__response({"ETag": etag})
+
+    def create_multipart_upload(self, Bucket: str, Key: str, **kwargs) -> dict:
+        upload_id: str = uuid.uuid4().hex
+        os.makedirs(self.__get_upload_dir(upload_id))
+        with self.__lock:
+            self.__uploads[upload_id] = {"Bucket": Bucket, "Key": Key, "Initiated": datetime.now(timezone.utc),
+                                         "Parts": {}}
+        return self.__response({"Bucket": Bucket, "Key": Key, "UploadId": upload_id})
+
+    def upload_part(self, Bucket: str, Key: str, UploadId: str, PartNumber: int, Body: Union[bytes, bytearray],
+                    ContentMD5: Optional[str] = None, **kwargs) -> dict:
+        upload: dict = self.__get_upload(UploadId, "UploadPart")
+        with self.__upload_request("UploadPart"):
+            body: Union[bytes, bytearray] = Body if isinstance(Body, (bytes, bytearray)) else Body.read()
+            digest: bytes = self.__check_content_md5(body, ContentMD5, "UploadPart")
+            with open(os.path.join(self.__get_upload_dir(UploadId), str(PartNumber)), "wb") as part_file:
+                part_file.write(body)
+            etag: str = f'"{digest.hex()}"'
+            with self.__lock:
+                upload["Parts"][PartNumber] = {"PartNumber": PartNumber, "ETag": etag, "Size": len(body),
+                                               "Digest": digest}
+            return self.__response({"ETag": etag})
+
+    def complete_multipart_upload(self, Bucket: str, Key: str, UploadId: str, MultipartUpload: dict,
+                                  **kwargs) -> dict:
+        upload: dict = self.__get_upload(UploadId, "CompleteMultipartUpload")
+        part_numbers: list[int] = [part['PartNumber'] for part in MultipartUpload['Parts']]
+        for part in MultipartUpload['Parts']:
+            if upload["Parts"].get(part['PartNumber'], {}).get("ETag") != part['ETag']:
+                raise self.__error("InvalidPart", 400, "CompleteMultipartUpload")
+        digests: bytes = b"".join(upload["Parts"][number]["Digest"] for number in part_numbers)
+        etag: str = f'"{hashlib.md5(digests).hexdigest()}-{len(part_numbers)}"'
+        upload_dir: str = self.__get_upload_dir(UploadId)
+        self.__write_object(Bucket, Key, [os.path.join(upload_dir, str(number)) for number in part_numbers], etag)
+        with self.__lock:
+            self.__uploads.pop(UploadId, None)
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        return self.__response({"Bucket": Bucket, "Key": Key, "ETag": etag})
+
+    def abort_multipart_upload(self, Bucket: str, Key: str, UploadId: str, **kwargs) -> dict:
+        self.__get_upload(UploadId, "AbortMultipartUpload")
+        with self.__lock:
+            self.__uploads.pop(UploadId, None)
+        shutil.rmtree(self.__get_upload_dir(UploadId), ignore_errors=True)
+        return self.__response({})
+
+    def head_object(self, Bucket: str, Key: str, **kwargs) -> dict:
+        path: str = self.__get_object_path(Bucket, Key)
+        with self.__lock:
+            etag: Optional[str] = self.__etags.get((Bucket, Key))
+        if etag is None or not os.path.isfile(path):
+            raise self.__error("404", 404, "HeadObject")
+        return self.__response({"ETag": etag, "ContentLength": os.path.getsize(path)})
+
+    def copy(self, CopySource: dict, Bucket: str, Key: str, **kwargs):
+        source_etag: str = self.head_object(Bucket=CopySource['Bucket'], Key=CopySource['Key'])['ETag']
+        self.__write_object(Bucket, Key, [self.__get_object_path(CopySource['Bucket'], CopySource['Key'])],
+                            source_etag)
+
+    def get_paginator(self, operation_name: str) -> "LocalPaginator":
+        operations: dict = {"list_objects_v2": self.__list_objects_v2, "list_parts": self.__list_parts,
+                            "list_multipart_uploads": self.__list_multipart_uploads}
+        if operation_name not in operations:
+            raise NotImplementedError(operation_name)
+        return LocalPaginator(operations[operation_name])
+
+    def get_waiter(self, waiter_name: str) -> "LocalObjectExistsWaiter":
+        if waiter_name != "object_exists":
+            raise NotImplementedError(waiter_name)
+        return LocalObjectExistsWaiter(self)
+
+    def __list_objects_v2(self, Bucket: str, Prefix: str = "", **kwargs) -> Iterator[dict]:
+        with self.__lock:
+            keys: list[str] = sorted(key for bucket, key in self.__etags if bucket == Bucket and key.startswith(Prefix))
+        for start in range(0, max(len(keys), 1), self.page_size):
+            yield self.__response({"Contents": [
+                {"Key": key, "ETag": self.__etags[(Bucket, key)],
+                 "Size": os.path.getsize(self.__get_object_path(Bucket, key))}
+                for key in keys[start:start + self.page_size]
+            ], "KeyCount": len(keys[start:start + self.page_size])})
+
+    def __list_parts(self, Bucket: str, Key: str, UploadId: str, **kwargs) -> Iterator[dict]:
+        upload: dict = self.__get_upload(UploadId, "ListParts")
+        with self.__lock:
+            parts: list[dict] = [{"PartNumber": part["PartNumber"], "ETag": part["ETag"], "Size": part["Size"]}
+                                 for _, part in sorted(upload["Parts"].items())]
+        yield self.__response({"Parts": parts})
+
+    def __list_multipart_uploads(self, Bucket: str, Prefix: str = "", **kwargs) -> Iterator[dict]:
+        with self.__lock:
+            uploads: list[dict] = [{"Key": upload["Key"], "UploadId": upload_id, "Initiated": upload["Initiated"]}
+                                   for upload_id, upload in self.__uploads.items()
+                                   if upload["Bucket"] == Bucket and upload["Key"].startswith(Prefix)]
+        yield self.__response({"Uploads": uploads})
+
+    def __write_object(self, bucket: str, key: str, sources: list[Union[bytes, bytearray, str]], etag: str):
+        """
+        Private method for writing object from buffers or files. Object is replaced atomically, so listings never see
+        half-written objects.
+        :return: Nothing
+        """
+        path: str = self.__get_object_path(bucket, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path: str = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as object_file:
+            for source in sources:
+                if isinstance(source, str):
+                    with open(source, "rb") as source_file:
+                        shutil.copyfileobj(source_file, object_file, 1024 * 1024)
+                else:
+                    object_file.write(source)
+        os.replace(tmp_path, path)
+        with self.__lock:
+            self.__etags[(bucket, key)] = etag
+
+    @contextmanager
+    def __upload_request(self, operation_name: str) -> Iterator[None]:
+        start: float = time.perf_counter()
+        with self.__lock:
+            self.__requests_in_flight += 1
+            throttled: bool = self.__random.random() < self.__throttle_rate or \
+                0 < self.__max_concurrent_requests < self.__requests_in_flight
+            if throttled:
+                self.throttled_requests += 1
+        try:
+            if throttled:
+                raise self.__error("SlowDown", 503, operation_name)
+            yield
+            time.sleep(max(self.__latency_seconds - (time.perf_counter() - start), 0))
+        finally:
+            with self.__lock:
+                self.__requests_in_flight -= 1
+
+    def __get_upload(self, upload_id: str, operation_name: str) -> dict:
+        with self.__lock:
+            upload: Optional[dict] = self.__uploads.get(upload_id)
+        if upload is None:
+            raise self.__error("NoSuchUpload", 404, operation_name)
+        return upload
+
+    def __get_object_path(self, bucket: str, key: str) -> str:
+        return os.path.join(self.__root, bucket, *key.split("/"))
+
+    def __get_upload_dir(self, upload_id: str) -> str:
+        return os.path.join(self.__root, ".multipart", upload_id)
+
+    def __check_content_md5(self, body: Union[bytes, bytearray], content_md5: Optional[str],
+                            operation_name: str) -> bytes:
+        digest: bytes = hashlib.md5(body).digest()
+        if content_md5 is not None and base64.b64decode(content_md5) != digest:
+            raise self.__error("BadDigest", 400, operation_name)
+        return digest
+
+    @staticmethod
+    def __response(body: dict) -> dict:
+        body["ResponseMetadata"] = {"HTTPStatusCode": 200, "RetryAttempts": 0}
+        return body
+
+    @staticmethod
+    def __error(code: str, status_code: int, operation_name: str) -> ClientError:
+        return ClientError({"Error": {"Code": code, "Message": code},
+                            "ResponseMetadata": {"HTTPStatusCode": status_code, "RetryAttempts": 0}}, operation_name)
+
+
+class LocalPaginator:
+    """
+    Class LocalPaginator returns pages of listing of LocalS3Client the same way as boto3 paginator does
+    """
+    def __init__(self, operation):
+        self.__operation = operation
+
+    def paginate(self, **kwargs) -> Iterator[dict]:
+        return self.__operation(**kwargs)
+
+
+class LocalObjectExistsWaiter:
+    """
+    Class LocalObjectExistsWaiter waits until object exists in LocalS3Client the same way as 'object_exists' waiter
+    """
+    def __init__(self, s3_client: LocalS3Client):
+        self.__s3_client: LocalS3Client = s3_client
+
+    def wait(self, Bucket: str, Key: str, WaiterConfig: Optional[dict] = None, **kwargs):
+        waiter_config: dict = WaiterConfig or {}
+        for attempt in range(waiter_config.get("MaxAttempts", 20)):
+            try:
+                self.__s3_client.head_object(Bucket=Bucket, Key=Key)
+                return
+            except ClientError:
+                time.sleep(waiter_config.get("Delay", 5))
+        raise ClientError({"Error": {"Code": "WaiterError", "Message": "Max attempts exceeded"}}, "HeadObject")
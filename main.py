@@ -12,14 +12,36 @@ from utils.file_manager_utils.file_manager import FileManager
 from utils.file_manager_utils.file_writer import FileWriter
 from utils.file_manager_utils.file_reader import FileReader
 from utils.file_manager_utils.file_name_manager import FileNameManager
+from utils.file_manager_utils.directory_watcher import DirectoryWatcher
+from utils.file_manager_utils.file_claimer import FileClaimer
 from utils.aws_utils.s3_uploader import S3Uploader
+from utils.aws_utils.s3_client_manager import S3ClientManager
+from utils.aws_utils.multipart_uploader import MultipartUploader
+from utils.aws_utils.aws_waiter_manager import WaiterManager
 from utils.time_manager import TimeManager
-from utils.logger_manager import Logger
-from utils.dataset_reader import DatasetReader
-from boto3_type_annotations.s3 import Client
+from utils.logger_manager import Logger, LogSummary
+from utils.file_packer import FilePacker
+from utils.file_profiler import FileProfiler
+from utils.file_splitter import FileSplitter
+from utils.ingest_run import DataFile, IngestRun
+from utils.compression_manager import CompressionManager
+from utils.csv_sniffer import CsvSniffer
+from utils.parquet_converter import ParquetConverter
+from utils.manifest_index import ManifestIndex
+from utils.run_journal import RunJournal
+from utils.run_report import RunReport
+from utils.worker_pool import WorkerPool
 from dotenv import load_dotenv
-import boto3
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Mapping, Optional
 import os
+import threading
+import time
+
+if TYPE_CHECKING:
+    from boto3_type_annotations.s3 import Client
 
 
 class MainScript:
@@ -29,88 +51,894 @@ class MainScript:
     @staticmethod
     def run_main_script():
         """
-        main method which runs the whole script
+        main method which runs the whole script. Every pipeline from 'pipelines' of main configs (or main configs
+        themselves if there are no pipelines) is run in the same process with shared S3 client, pool of workers and
+        logger. If 'enabled' in 'watch_config' is 'True', script runs in watch mode (journal of every pipeline must be
+        enabled), otherwise it ingests files that are in 'raw_data_dir' of every pipeline and stops.
         :return: Nothing
         """
         load_dotenv(dotenv_path='config_data/AWS_creds.env')
-        configs: dict = ConfigReader.get_main_config()
-        timestamp_mark: str = TimeManager.get_current_datetime(configs["time_format"])
-        Logger().get_logger().info(f"Starting process of ingesting data to S3 with timestamp '{timestamp_mark}'")
+        configs: Mapping = ConfigReader.get_main_config()
+        RunReport().start_profiling()
+        pipeline_configs: list[Mapping] = ConfigReader.get_pipeline_configs()
+        raw_data_dirs: list[str] = [os.path.normpath(pipeline_config["raw_data_dir"])
+                                    for pipeline_config in pipeline_configs]
+        if len(set(raw_data_dirs)) != len(raw_data_dirs):
+            Logger().get_logger().error(f"Pipelines can't share 'raw_data_dir': {raw_data_dirs}")
+            raise ValueError
+        # failed batch is resumed from the journal, without it files of the batch would be renamed again by next batch
+        pipelines_without_journal: list[str] = [MainScript.get_pipeline_name(pipeline_config)
+                                                for pipeline_config in pipeline_configs
+                                                if pipeline_config["journal_config"]["enabled"] != "True"]
+        if configs["watch_config"]["enabled"] == "True" and len(pipelines_without_journal) > 0:
+            Logger().get_logger().error(f"Watch mode requires 'enabled' of 'journal_config' to be 'True', it isn't "
+                                        f"for pipelines {pipelines_without_journal}")
+            raise ValueError
 
         # start of AWS session and S3 client setting process
-        aws_access_key_id: str = os.environ.get('AWS_ACCESS_KEY_ID')
-        aws_secret_access_key: str = os.environ.get('AWS_SECRET_ACCESS_KEY')
-        region_name: str = os.environ.get('REGION_NAME')
-        aws_session = boto3.Session(
-            aws_access_key_id=aws_access_key_id,
-            aws_secret_access_key=aws_secret_access_key,
-            region_name=region_name
-        )
-        s3_client: Client = aws_session.client("s3")
+        s3_client: "Client" = S3ClientManager().get_s3_client()
         # end of AWS session and S3 client setting process
 
-        # start of naming management of raw data files
-        file_type: str = configs["data_files_name_pattern"]["file_type"]
-        raw_data_dir: str = configs["raw_data_dir"]
-        raw_data_file_names_list_src: list[str] = FileManager.get_list_of_raw_data_files(raw_data_dir, file_type)
-        raw_data_file_paths_list_src: list[str] = FileNameManager\
-            .generate_path_to_files(raw_data_dir, raw_data_file_names_list_src.copy())
-        ingest_raw_data_file_names_list: list[str] = FileNameManager\
-            .generate_data_file_names(len(raw_data_file_paths_list_src.copy()), timestamp_mark)
-        ingest_raw_data_file_paths_list = FileNameManager\
-            .generate_path_to_files(raw_data_dir, ingest_raw_data_file_names_list.copy())
-        FileManager.rename_multiple_files(raw_data_file_paths_list_src, ingest_raw_data_file_paths_list)
-        # end of naming management of raw data files
-
-        # start of counting row in raw datasets
-        row_count_list: list[int] = []
-        for file_path in ingest_raw_data_file_paths_list:
-            row_count_list.append(len(DatasetReader.read_dataset_from_csv(file_path)))
-        # end of counting row in raw datasets
-
-        # start of naming management and creating of ingest metadata file
+        if configs["watch_config"]["enabled"] == "True":
+            MainScript.run_watch_mode(s3_client, pipeline_configs)
+        else:
+            try:
+                MainScript.run_pipelines(s3_client, pipeline_configs,
+                                         configs["pipeline_runner_config"]["max_parallel_pipelines"])
+            finally:
+                RunReport().write_report()
+
+    @staticmethod
+    def get_pipeline_name(configs: Mapping) -> str:
+        """
+        get_pipeline_name method returns name of pipeline for logs
+        :param configs: configs of pipeline
+        :type configs: Mapping
+        :return: '<source_name>/<table_name>' of pipeline
+        :rtype: str
+        """
+        naming_pattern: Mapping = configs["data_files_name_pattern"]
+        return f"{naming_pattern['source_name']}/{naming_pattern['table_name']}"
+
+    @staticmethod
+    def run_pipelines(s3_client: "Client", pipeline_configs: list[Mapping], max_parallel_pipelines: int):
+        """
+        run_pipelines method ingests files of every pipeline, up to 'max_parallel_pipelines' pipelines at the same
+        time. Failure of one pipeline doesn't stop the others, all failures are logged per pipeline and raised together
+        at the end.
+        :param s3_client: S3 client
+        :type s3_client: Client
+        :param pipeline_configs: configs of pipelines
+        :type pipeline_configs: list[Mapping]
+        :param max_parallel_pipelines: max number of pipelines that are run at the same time
+        :type max_parallel_pipelines: int
+        :return: Nothing
+        """
+        failed_pipelines: list[str] = []
+        with ThreadPoolExecutor(max_workers=max(min(max_parallel_pipelines, len(pipeline_configs)), 1),
+                                thread_name_prefix="pipeline") as executor:
+            futures: list[Future] = [executor.submit(MainScript.run_pipeline, s3_client, pipeline_config)
+                                     for pipeline_config in pipeline_configs]
+            for pipeline_config, future in zip(pipeline_configs, futures):
+                error: BaseException = future.exception()
+                if error is not None:
+                    failed_pipelines.append(MainScript.get_pipeline_name(pipeline_config))
+                    Logger().get_logger().error(f"Pipeline '{MainScript.get_pipeline_name(pipeline_config)}' failed "
+                                                f"with the next error: '{error!r}'")
+        if len(failed_pipelines) > 0:
+            raise RuntimeError(f"{len(failed_pipelines)} of {len(pipeline_configs)} pipelines failed: "
+                               f"{failed_pipelines}")
+
+    @staticmethod
+    def run_pipeline(s3_client: "Client", configs: Mapping):
+        """
+        run_pipeline method ingests files that are in 'raw_data_dir' of pipeline. If the previous run of pipeline
+        failed, it's resumed instead, and files which landed after the failure are ingested by the next run.
+        :param s3_client: S3 client
+        :type s3_client: Client
+        :param configs: configs of pipeline
+        :type configs: Mapping
+        :return: Nothing
+        """
+        Logger().get_logger().info(f"Starting pipeline '{MainScript.get_pipeline_name(configs)}'")
+        if configs["claim_config"]["enabled"] == "True":
+            MainScript.run_claimed_pipeline(s3_client, configs)
+            return
+        journal: RunJournal = RunJournal(configs)
+        raw_data_file_stats: Optional[dict[str, os.stat_result]] = None
+        if journal.has_unfinished_run():
+            raw_data_file_names_list_src: list[str] = journal.get_source_file_names()
+        else:
+            with RunReport().span("scan") as scan_span:
+                raw_data_file_stats = FileManager.scan_raw_data_files(
+                    configs["raw_data_dir"], configs["data_files_name_pattern"]["file_type"],
+                    configs["scan_config"]["pattern"], configs["scan_config"]["recursive"] == "True",
+                    MainScript.get_excluded_folder_names()
+                )
+                scan_span["files"] = len(raw_data_file_stats)
+                scan_span["bytes"] = sum(file_stat.st_size for file_stat in raw_data_file_stats.values())
+            raw_data_file_names_list_src = list(raw_data_file_stats)
+        with RunReport().span("ingest", pipeline=MainScript.get_pipeline_name(configs),
+                              files=len(raw_data_file_names_list_src)):
+            MainScript.ingest_files(s3_client, configs, raw_data_file_names_list_src, journal, raw_data_file_stats)
+
+    @staticmethod
+    def get_excluded_folder_names() -> tuple[str, ...]:
+        """
+        get_excluded_folder_names method returns names of folders which are created by the script in 'raw_data_dir'
+        and must not be scanned for raw data files
+        :return: names of folders
+        :rtype: tuple[str, ...]
+        """
+        return FilePacker.packed_folder_name, FileSplitter.split_folder_name, FileClaimer.claims_folder_name
+
+    @staticmethod
+    def generate_batch_id(configs: Mapping) -> str:
+        """
+        generate_batch_id method generates timestamp mark of the new run. If files are claimed by several workers, id
+        of the worker is added to the timestamp, so batches of workers which start at the same second don't share
+        file names and S3 prefix.
+        :param configs: configs of pipeline
+        :type configs: Mapping
+        :return: timestamp mark of the run
+        :rtype: str
+        """
+        timestamp_mark: str = TimeManager.get_current_datetime(configs["time_format"])
+        if configs["claim_config"]["enabled"] == "True":
+            timestamp_mark += "-" + FileClaimer.get_worker_id(configs["claim_config"])
+        return timestamp_mark
+
+    @staticmethod
+    def run_claimed_pipeline(s3_client: "Client", configs: Mapping):
+        """
+        run_claimed_pipeline method ingests files of 'raw_data_dir' which is shared by several workers. Claim
+        directories of crashed workers which leases expired are finished first. Then the worker claims batches of up to
+        'batch_max_files' files (but not more than 'batch_max_bytes') from 'raw_data_dir' and ingests them until there
+        are no files left, so files are shared between workers which run at the same time.
+        :param s3_client: S3 client
+        :type s3_client: Client
+        :param configs: configs of pipeline
+        :type configs: Mapping
+        :return: Nothing
+        """
+        claim_config: Mapping = configs["claim_config"]
+        claimer: FileClaimer = FileClaimer(configs)
+        last_timestamp_mark: str = ""
+        try:
+            for claim_dir in claimer.take_over_expired_claims():
+                last_timestamp_mark = MainScript.ingest_claim(s3_client, configs, claimer, claim_dir,
+                                                              last_timestamp_mark)
+                claimer.release(claim_dir)
+            own_claim_dir: str = claimer.acquire_own_claim_dir()
+            # files which were claimed by the previous process of the worker (if 'worker_id' is set) are ingested first
+            last_timestamp_mark = MainScript.ingest_claim(s3_client, configs, claimer, own_claim_dir,
+                                                          last_timestamp_mark)
+            while True:
+                with RunReport().span("scan") as scan_span:
+                    raw_data_file_stats: dict[str, os.stat_result] = FileManager.scan_directory(
+                        configs["raw_data_dir"],
+                        configs["scan_config"]["pattern"] or "*." + configs["data_files_name_pattern"]["file_type"],
+                        configs["scan_config"]["recursive"] == "True", MainScript.get_excluded_folder_names()
+                    )
+                    scan_span["files"] = len(raw_data_file_stats)
+                if len(raw_data_file_stats) == 0:
+                    break
+                if len(claimer.claim_files(raw_data_file_stats, claim_config["batch_max_files"],
+                                           claim_config["batch_max_bytes"])) == 0:
+                    continue
+                last_timestamp_mark = MainScript.ingest_claim(s3_client, configs, claimer, own_claim_dir,
+                                                              last_timestamp_mark)
+            claimer.release(own_claim_dir)
+        finally:
+            claimer.stop()
+
+    @staticmethod
+    def ingest_claim(s3_client: "Client", configs: Mapping, claimer: FileClaimer, claim_dir: str,
+                     last_timestamp_mark: str = "") -> str:
+        """
+        ingest_claim method ingests files of claim directory. Unfinished run of the claim directory is resumed from
+        its journal, otherwise all raw data files of the directory are ingested as the new run, which is started when
+        its timestamp mark differs from the previous one of the worker.
+        :param s3_client: S3 client
+        :type s3_client: Client
+        :param configs: configs of pipeline
+        :type configs: Mapping
+        :param claimer: claimer of files of pipeline
+        :type claimer: FileClaimer
+        :param claim_dir: path to claim directory
+        :type claim_dir: str
+        :param last_timestamp_mark: timestamp mark of the previous run of the worker
+        :type last_timestamp_mark: str
+        :return: timestamp mark of ingested files or last_timestamp_mark if there were no files
+        :rtype: str
+        """
+        claim_configs: Mapping = claimer.get_claim_configs(configs, claim_dir)
+        journal: RunJournal = RunJournal(claim_configs)
+        raw_data_file_stats: Optional[dict[str, os.stat_result]] = None
+        if journal.has_unfinished_run():
+            raw_data_file_names_list_src: list[str] = journal.get_source_file_names()
+        else:
+            raw_data_file_stats = claimer.get_claimed_files(
+                claim_dir, configs["data_files_name_pattern"]["file_type"], configs["scan_config"]["pattern"],
+                configs["scan_config"]["recursive"] == "True", MainScript.get_excluded_folder_names()
+            )
+            if len(raw_data_file_stats) == 0:
+                return last_timestamp_mark
+            raw_data_file_names_list_src = list(raw_data_file_stats)
+            # timestamp is a part of file names and S3 prefix, so two batches can't share it
+            while MainScript.generate_batch_id(configs) == last_timestamp_mark:
+                time.sleep(0.1)
+        with RunReport().span("ingest", pipeline=MainScript.get_pipeline_name(configs),
+                              files=len(raw_data_file_names_list_src)):
+            return MainScript.ingest_files(s3_client, claim_configs, raw_data_file_names_list_src, journal,
+                                           raw_data_file_stats)
+
+    @staticmethod
+    def run_watch_mode(s3_client: "Client", pipeline_configs: list[Mapping]):
+        """
+        run_watch_mode method watches 'raw_data_dir' of every pipeline in separate thread until script is interrupted
+        :param s3_client: S3 client
+        :type s3_client: Client
+        :param pipeline_configs: configs of pipelines
+        :type pipeline_configs: list[Mapping]
+        :return: Nothing
+        """
+        watch_threads: list[threading.Thread] = [
+            threading.Thread(target=MainScript.watch_pipeline, args=(s3_client, pipeline_config), daemon=True,
+                             name=f"watch-{MainScript.get_pipeline_name(pipeline_config)}")
+            for pipeline_config in pipeline_configs
+        ]
+        for watch_thread in watch_threads:
+            watch_thread.start()
+        try:
+            for watch_thread in watch_threads:
+                while watch_thread.is_alive():
+                    watch_thread.join(timeout=1)
+        except KeyboardInterrupt:
+            Logger().get_logger().info("Watch mode is stopped")
+
+    @staticmethod
+    def watch_pipeline(s3_client: "Client", configs: Mapping):
+        """
+        watch_pipeline method watches 'raw_data_dir' of pipeline and ingests files as they land there by
+        micro-batches. Process, S3 client and pool of workers stay alive between batches. Failed batch is logged and
+        resumed before the next batch is taken.
+        :param s3_client: S3 client
+        :type s3_client: Client
+        :param configs: configs of pipeline
+        :type configs: Mapping
+        :return: Nothing
+        """
+        Logger().get_logger().info(f"Watching files of pipeline '{MainScript.get_pipeline_name(configs)}'")
+        # pipelines write reports per batch independently, so every pipeline collects its own report
+        RunReport().use_report(MainScript.get_pipeline_name(configs))
+        # if files are claimed by several workers, they are ingested from claim directory of the worker
+        claimer: Optional[FileClaimer] = None
+        ingest_configs: Mapping = configs
+        if configs["claim_config"]["enabled"] == "True":
+            claimer = FileClaimer(configs)
+            ingest_configs = claimer.get_claim_configs(configs, claimer.acquire_own_claim_dir())
+        journal: RunJournal = RunJournal(ingest_configs)
+        watcher: DirectoryWatcher = DirectoryWatcher(configs["raw_data_dir"],
+                                                     configs["data_files_name_pattern"]["file_type"],
+                                                     configs["watch_config"], configs["scan_config"]["pattern"])
+        last_timestamp_mark: str = ""
+        while True:
+            raw_data_file_stats: Optional[dict[str, os.stat_result]] = None
+            # files of unfinished batch are already renamed, so they must not be taken by the next batch
+            if journal.has_unfinished_run():
+                raw_data_file_names_list_src: list[str] = journal.get_source_file_names()
+            else:
+                raw_data_file_stats = watcher.wait_for_batch()
+                if claimer is not None:
+                    for claim_dir in claimer.take_over_expired_claims():
+                        try:
+                            last_timestamp_mark = MainScript.ingest_claim(s3_client, configs, claimer, claim_dir,
+                                                                          last_timestamp_mark)
+                            claimer.release(claim_dir)
+                        except Exception as e:
+                            Logger().get_logger().error(f"Claim directory '{claim_dir}' which was taken over "
+                                                        f"failed with the next error: {e}")
+                    claimer.claim_files(raw_data_file_stats, configs["claim_config"]["batch_max_files"],
+                                        configs["claim_config"]["batch_max_bytes"])
+                    # files which were claimed before, but weren't started because of failure, are taken too
+                    raw_data_file_stats = claimer.get_claimed_files(
+                        ingest_configs["raw_data_dir"], configs["data_files_name_pattern"]["file_type"],
+                        configs["scan_config"]["pattern"], False
+                    )
+                    if len(raw_data_file_stats) == 0:
+                        continue
+                raw_data_file_names_list_src = list(raw_data_file_stats)
+                # timestamp is a part of file names and S3 prefix, so two batches can't share it
+                while MainScript.generate_batch_id(configs) == last_timestamp_mark:
+                    time.sleep(0.1)
+            try:
+                with RunReport().span("ingest", pipeline=MainScript.get_pipeline_name(configs),
+                                      files=len(raw_data_file_names_list_src)):
+                    last_timestamp_mark = MainScript.ingest_files(s3_client, ingest_configs,
+                                                                  raw_data_file_names_list_src, journal,
+                                                                  raw_data_file_stats)
+            except Exception as e:
+                Logger().get_logger().error(f"Batch of files of pipeline '{MainScript.get_pipeline_name(configs)}' "
+                                            f"failed with the next error: {e}")
+                last_timestamp_mark = MainScript.generate_batch_id(configs)
+                if journal.has_unfinished_run():
+                    time.sleep(configs["watch_config"]["poll_interval_seconds"])
+            RunReport().write_report()
+
+    @staticmethod
+    def ingest_files(s3_client: "Client", configs: Mapping, raw_data_file_names_list_src: list[str],
+                     journal: RunJournal, raw_data_file_stats: Optional[Mapping[str, os.stat_result]] = None) -> str:
+        """
+        ingest_files method ingests raw data files from 'raw_data_dir' of pipeline to S3. Files are passed from stage
+        to stage as DataFile records. Finished steps are recorded to the journal of pipeline, so if journal contains
+        unfinished run, the run is resumed under the same timestamp and finished steps (renaming, counting, uploading,
+        moving of files) are skipped.
+        Stat results of raw data files which were got by scan of 'raw_data_dir' are used instead of stat'ing files
+        again, files without them (e.g. files of resumed run) are stat'ed when their sizes are required.
+        :param s3_client: S3 client
+        :type s3_client: Client
+        :param configs: configs of pipeline
+        :type configs: Mapping
+        :param raw_data_file_names_list_src: names of raw data files in 'raw_data_dir'
+        :type raw_data_file_names_list_src: list[str]
+        :param journal: journal of pipeline
+        :type journal: RunJournal
+        :param raw_data_file_stats: stat results of raw data files by their names
+        :type raw_data_file_stats: Optional[Mapping[str, os.stat_result]]
+        :return: timestamp mark of ingested files
+        :rtype: str
+        """
+        resumed: bool = journal.has_unfinished_run()
+        if resumed:
+            timestamp_mark: str = journal.get_timestamp_mark()
+            Logger().get_logger().info(f"Resuming unfinished process of ingesting data to S3 with timestamp "
+                                       f"'{timestamp_mark}'")
+        else:
+            timestamp_mark = MainScript.generate_batch_id(configs)
+            Logger().get_logger().info(f"Starting process of ingesting data to S3 with timestamp '{timestamp_mark}'")
+            csv_summary: Optional[dict] = None
+            if CsvSniffer.get_sniff_config(configs)["enabled"] == "True":
+                raw_data_file_names_list_src, csv_summary = MainScript\
+                    .sniff_raw_data_files(configs, raw_data_file_names_list_src, timestamp_mark)
+                if len(raw_data_file_names_list_src) == 0:
+                    Logger().get_logger().info("End of process of ingesting data to S3, all files were rejected")
+                    return timestamp_mark
+            journal.start(timestamp_mark, raw_data_file_names_list_src)
+            if csv_summary is not None:
+                journal.record("sniff", value=csv_summary)
+        if journal.is_done("metadata_upload"):
+            # everything except moving or deleting of files was finished before the failure
+            with RunReport().span("move_or_delete"):
+                MainScript.move_or_delete_files(configs, journal.get_value("metadata_upload"), timestamp_mark,
+                                                resumed)
+            journal.finish()
+            Logger().get_logger().info("End of process of ingesting data to S3")
+            return timestamp_mark
+
         json_ingest_metadata: dict = FileReader.get_data_from_json("config_data/JSON_ingest_metadata_template.json")
-        json_ingest_metadata["row_count"]: int = row_count_list[0]
-        json_ingest_metadata_file_name: str = FileNameManager.generate_json_metadata_file_name(timestamp_mark)
-        json_ingest_metadata_file_path_src: str = FileNameManager\
-            .generate_path_to_files(raw_data_dir, json_ingest_metadata_file_name)
-        FileWriter.create_json_ingest_metadata_file(json_ingest_metadata, json_ingest_metadata_file_path_src)
-        # end of naming management and creating of ingest metadata file
-
-        # start of naming management of S3 objects
-        configs["s3_raw_obj_prefix"] = configs["s3_raw_obj_prefix"] + f"time={timestamp_mark}/"
+        run: IngestRun = IngestRun(configs, journal, timestamp_mark, resumed, json_ingest_metadata)
+        data_files: list[DataFile] = MainScript.rename_raw_data_files(run, raw_data_file_names_list_src,
+                                                                      raw_data_file_stats)
+        data_files = MainScript.pack_data_files(run, data_files)
+        data_files = MainScript.split_data_files(run, data_files)
+        MainScript.name_s3_objects(run, data_files)
+        MainScript.profile_data_files(run, data_files)
+        MainScript.find_duplicates(s3_client, run, data_files)
+        MainScript.convert_data_files(run, data_files)
+        MainScript.upload_data_files(s3_client, run, data_files)
+        data_files_list: list[str] = MainScript.upload_ingest_metadata(s3_client, run, data_files)
+        with RunReport().span("move_or_delete"):
+            MainScript.move_or_delete_files(configs, data_files_list, timestamp_mark, resumed)
+        journal.finish()
+        Logger().get_logger().info("End of process of ingesting data to S3")
+        return timestamp_mark
+
+    @staticmethod
+    def rename_raw_data_files(run: IngestRun, raw_data_file_names_list_src: list[str],
+                              raw_data_file_stats: Optional[Mapping[str, os.stat_result]]) -> list[DataFile]:
+        """
+        rename_raw_data_files method renames raw data files by naming pattern of pipeline and timestamp of the run
+        :param run: state of ingest run
+        :type run: IngestRun
+        :param raw_data_file_names_list_src: names of raw data files in 'raw_data_dir'
+        :type raw_data_file_names_list_src: list[str]
+        :param raw_data_file_stats: stat results of raw data files by their names
+        :type raw_data_file_stats: Optional[Mapping[str, os.stat_result]]
+        :return: records of renamed raw data files
+        :rtype: list[DataFile]
+        """
+        with RunReport().span("rename", files=len(raw_data_file_names_list_src)):
+            raw_data_dir: str = run.configs["raw_data_dir"]
+            raw_data_file_paths_list_src: list[str] = FileNameManager\
+                .generate_path_to_files(raw_data_dir, raw_data_file_names_list_src.copy())
+            ingest_raw_data_file_names_list: list[str] = FileNameManager\
+                .generate_data_file_names(len(raw_data_file_paths_list_src), run.timestamp_mark,
+                                          naming_pattern=run.configs["data_files_name_pattern"])
+            run.raw_file_paths = FileNameManager\
+                .generate_path_to_files(raw_data_dir, ingest_raw_data_file_names_list.copy())
+            if not run.journal.is_done("rename"):
+                # files which were renamed before the failure don't exist under their source names
+                rename_indexes: list[int] = [i for i, path in enumerate(raw_data_file_paths_list_src)
+                                             if not run.resumed or os.path.isfile(path)]
+                FileManager.rename_multiple_files([raw_data_file_paths_list_src[i] for i in rename_indexes],
+                                                  [run.raw_file_paths[i] for i in rename_indexes])
+                run.journal.record("rename")
+            # renaming keeps stat results of files, so they are taken by new paths of files
+            stats_by_src_path: dict[str, os.stat_result] = {
+                os.path.normpath(os.path.join(raw_data_dir, name)): file_stat
+                for name, file_stat in (raw_data_file_stats or {}).items()
+            }
+            run.file_stats = {
+                ingest_path: stats_by_src_path[src_path]
+                for src_path, ingest_path in zip(raw_data_file_paths_list_src, run.raw_file_paths)
+                if src_path in stats_by_src_path
+            }
+        # paths to raw data files are sorted, so source names are taken from them to keep the same order
+        return [DataFile(ingest_path, os.path.basename(src_path))
+                for src_path, ingest_path in zip(raw_data_file_paths_list_src, run.raw_file_paths)]
+
+    @staticmethod
+    def pack_data_files(run: IngestRun, raw_data_files: list[DataFile]) -> list[DataFile]:
+        """
+        pack_data_files method packs small raw data files into bigger files if packing is enabled
+        :param run: state of ingest run
+        :type run: IngestRun
+        :param raw_data_files: records of raw data files
+        :type raw_data_files: list[DataFile]
+        :return: records of data files, every one of them is either raw data file or packed file of small ones
+        :rtype: list[DataFile]
+        """
+        with RunReport().span("pack") as pack_span:
+            data_files: list[DataFile] = raw_data_files
+            packing_config: Mapping = FilePacker.get_packing_config(run.configs)
+            if packing_config["enabled"] == "True":
+                pack_groups: Optional[list[list[int]]] = run.journal.get_value("pack")
+                if pack_groups is None:
+                    pack_groups = FilePacker.plan_packs(run.raw_file_paths,
+                                                        packing_config["small_file_bytes"],
+                                                        packing_config["target_size_bytes"],
+                                                        FileManager.get_file_sizes(run.raw_file_paths,
+                                                                                   run.file_stats))
+                    run.journal.record("pack", value=pack_groups)
+                packed_file_names_list: list[str] = FileNameManager\
+                    .generate_data_file_names(len(pack_groups), run.timestamp_mark,
+                                              naming_pattern=run.configs["data_files_name_pattern"])
+                if any(len(group) > 1 for group in pack_groups):
+                    packed_folder: str = FileManager.create_folder(run.configs["raw_data_dir"],
+                                                                   FilePacker.packed_folder_name)
+                data_files = []
+                packed_files_count: int = 0
+                for group, packed_file_name in zip(pack_groups, packed_file_names_list):
+                    if len(group) == 1:
+                        data_files.append(raw_data_files[group[0]])
+                        continue
+                    packed_file_path: str = os.path.join(packed_folder, "packed_" + packed_file_name)
+                    if not run.journal.is_done("packed", packed_file_name):
+                        run.journal.record("packed", packed_file_name, FilePacker.pack_files(
+                            [raw_data_files[i].path for i in group],
+                            [raw_data_files[i].source_name for i in group], packed_file_path, run.text_qualifier
+                        ))
+                    data_files.append(DataFile(packed_file_path, os.path.basename(packed_file_path),
+                                               sources=run.journal.get_value("packed", packed_file_name)))
+                    run.derived_file_paths.append(packed_file_path)
+                    packed_files_count += 1
+                Logger().get_logger().info(f"{len(raw_data_files)} raw data files are ingested as "
+                                           f"{len(data_files)} data files, {packed_files_count} of them are packed")
+            pack_span["files"] = sum(len(data_file.sources) for data_file in data_files
+                                     if data_file.sources is not None)
+            pack_span["bytes"] = sum(source["size_bytes"] for data_file in data_files if data_file.sources is not None
+                                     for source in data_file.sources)
+        return data_files
+
+    @staticmethod
+    def split_data_files(run: IngestRun, data_files: list[DataFile]) -> list[DataFile]:
+        """
+        split_data_files method splits data files which are bigger than 'threshold' into chunks if splitting is enabled
+        :param run: state of ingest run
+        :type run: IngestRun
+        :param data_files: records of data files
+        :type data_files: list[DataFile]
+        :return: records of data files where chunks take place of split files
+        :rtype: list[DataFile]
+        """
+        with RunReport().span("split") as split_span:
+            split_config: Mapping = FileSplitter.get_split_config(run.configs)
+            if split_config["enabled"] != "True":
+                return data_files
+            data_file_sizes: list[int] = FileManager.get_file_sizes([data_file.path for data_file in data_files],
+                                                                    run.file_stats)
+            split_indexes: list[int] = [i for i, size in enumerate(data_file_sizes) if size > split_config["threshold"]]
+            if len(split_indexes) > 0:
+                split_folder: str = FileManager.create_folder(run.configs["raw_data_dir"],
+                                                              FileSplitter.split_folder_name)
+            for i in split_indexes:
+                split_file_name: str = os.path.basename(data_files[i].path)
+                if not run.journal.is_done("split", split_file_name):
+                    run.journal.record("split", split_file_name, FileSplitter.split_file(
+                        data_files[i].path, split_folder, run.text_qualifier, split_config
+                    ))
+            split_span["files"] = len(split_indexes)
+            split_span["bytes"] = sum(data_file_sizes[i] for i in split_indexes)
+            # chunks take place of split file, so they are numbered one after another by S3 object names
+            split_data_files: list[DataFile] = []
+            for data_file in data_files:
+                chunk_paths: list[str] = run.journal.get_value("split", os.path.basename(data_file.path)) \
+                    or [data_file.path]
+                if chunk_paths == [data_file.path]:
+                    split_data_files.append(data_file)
+                    continue
+                run.derived_file_paths.extend(chunk_paths)
+                split_data_files.extend(DataFile(chunk_path, os.path.basename(chunk_path),
+                                                 split_of=data_file.source_name) for chunk_path in chunk_paths)
+        return split_data_files
+
+    @staticmethod
+    def name_s3_objects(run: IngestRun, data_files: list[DataFile]):
+        """
+        name_s3_objects method sets names of S3 objects of data files and finds files which were uploaded before the
+        failure of resumed run
+        :param run: state of ingest run
+        :type run: IngestRun
+        :param data_files: records of data files
+        :type data_files: list[DataFile]
+        :return: Nothing
+        """
+        run.upload_file_type = run.configs["data_files_name_pattern"]["file_type"]
+        run.codec = CompressionManager.get_compression_config(run.configs)["codec"]
+        if run.configs["parquet_config"]["enabled"] == "True":
+            run.upload_file_type = "parquet"
+            run.codec = "none"
+        run.stored_format = run.upload_file_type + CompressionManager.get_file_extension(run.codec)
+        s3_raw_data_file_names_list: list[str] = FileNameManager\
+            .generate_data_file_names(len(data_files), run.timestamp_mark, run.codec, run.upload_file_type,
+                                      run.configs["data_files_name_pattern"])
+        s3_raw_obj_prefix: str = run.configs["s3_raw_obj_prefix"] + f"time={run.timestamp_mark}/"
+        # objects can be spread between hash sub-prefixes, so requests of the run aren't limited by one S3 prefix
+        key_layout_config: Mapping = run.configs["key_layout_config"]
         s3_raw_data_object_names_list: list[str] = FileNameManager\
-            .generate_path_to_files(configs["s3_raw_obj_prefix"], ingest_raw_data_file_names_list.copy(), s3=True)
-        s3_json_metadata_object_name: str = FileNameManager\
-            .generate_path_to_files(configs["s3_metadata_obj_prefix"], json_ingest_metadata_file_name, s3=True)
-        # end of naming management of S3 objects
-
-        # start of uploading files to AWS S3 buckets
-        S3Uploader.sent_multiple_files_to_s3_bucket_and_wait_for_them_being_uploaded(
-            s3_client,
-            ingest_raw_data_file_paths_list,
-            configs["s3_raw_bucket"],
-            s3_raw_data_object_names_list
-        )
-        S3Uploader.sent_file_to_s3_bucket_and_wait_for_it_being_uploaded(
-            s3_client,
-            json_ingest_metadata_file_path_src,
-            configs["s3_metadata_bucket"],
-            s3_json_metadata_object_name
-        )
-        # end of uploading files to AWS S3 buckets
-
-        # start of managing files data and metadata files on local machine
-        data_files_list: list[str] = ingest_raw_data_file_paths_list.copy()
-        data_files_list.append(json_ingest_metadata_file_path_src)
-        Logger().get_logger().error(data_files_list)
+            .generate_s3_object_names(s3_raw_obj_prefix, s3_raw_data_file_names_list,
+                                      key_layout_config["sub_prefix_count"]
+                                      if key_layout_config["hash_spread"] == "True" else 0)
+        for data_file, file_name, object_name in zip(data_files, s3_raw_data_file_names_list,
+                                                     s3_raw_data_object_names_list):
+            data_file.file_name = file_name
+            data_file.object_name = object_name
+            data_file.uploaded = run.journal.is_done("upload", object_name)
+
+    @staticmethod
+    def profile_data_files(run: IngestRun, data_files: list[DataFile]):
+        """
+        profile_data_files method counts rows, size and checksum of data files which were uploaded before the failure
+        and of files which can be duplicates. The other files are profiled while they are uploaded if 'read_once' is
+        'True', or here otherwise.
+        :param run: state of ingest run
+        :type run: IngestRun
+        :param data_files: records of data files
+        :type data_files: list[DataFile]
+        :return: Nothing
+        """
+        with RunReport().span("profile") as profile_span:
+            if run.configs["dedup_config"]["enabled"] == "True":
+                run.manifest_index = ManifestIndex(run.configs["dedup_config"]["manifest_path"])
+            # raw files are profiled while they are uploaded, unless parquet files are uploaded instead of them
+            run.read_once = run.configs["profiling_config"]["read_once"] == "True" \
+                and run.upload_file_type != "parquet"
+            if run.read_once:
+                # only files which can be duplicates are required to be profiled before upload
+                file_sizes: list[int] = FileManager.get_file_sizes([data_file.path for data_file in data_files],
+                                                                   run.file_stats)
+                size_counts: Counter = Counter(file_sizes)
+                for data_file, size in zip(data_files, file_sizes):
+                    data_file.can_be_duplicate = run.manifest_index is not None and not data_file.uploaded and (
+                        size_counts[size] > 1 or run.manifest_index.has_size(size, run.stored_format))
+            else:
+                for data_file in data_files:
+                    data_file.can_be_duplicate = not data_file.uploaded
+            # profiles which were counted before the failure
+            for data_file in data_files:
+                data_file.profile = run.journal.get_value("profile", os.path.basename(data_file.path))
+                if data_file.uploaded and data_file.profile is None:
+                    data_file.profile = run.journal.get_value("upload", data_file.object_name).get("Profile")
+            count_files: list[DataFile] = [data_file for data_file in data_files if data_file.profile is None
+                                           and (data_file.uploaded or data_file.can_be_duplicate)]
+            for data_file, profile in zip(count_files, FileProfiler.profile_multiple_files(
+                    [data_file.path for data_file in count_files], run.text_qualifier)):
+                data_file.profile = profile
+            run.journal.record_many("profile", {os.path.basename(data_file.path): data_file.profile
+                                                for data_file in count_files})
+            profile_span["files"] = len(count_files)
+            profile_span["bytes"] = sum(data_file.profile["size_bytes"] for data_file in count_files)
+
+    @staticmethod
+    def find_duplicates(s3_client: "Client", run: IngestRun, data_files: list[DataFile]):
+        """
+        find_duplicates method finds data files which content is the same as content of files of the run or of
+        manifest index if deduplication is enabled. Such files aren't uploaded again.
+        :param s3_client: S3 client
+        :type s3_client: Client
+        :param run: state of ingest run
+        :type run: IngestRun
+        :param data_files: records of data files
+        :type data_files: list[DataFile]
+        :return: Nothing
+        """
+        with RunReport().span("dedup"):
+            if run.manifest_index is None:
+                return
+            batch_objects: dict[tuple[str, int], dict] = {
+                (data_file.profile["sha256"], data_file.profile["size_bytes"]): {
+                    "bucket": run.configs["s3_raw_bucket"], "object_name": data_file.object_name
+                } for data_file in data_files if data_file.uploaded
+            }
+            candidate_files: list[DataFile] = [data_file for data_file in data_files if data_file.can_be_duplicate]
+            manifest_objects: dict[tuple[str, int], dict] = {}
+            for data_file in candidate_files:
+                content_key: tuple[str, int] = (data_file.profile["sha256"], data_file.profile["size_bytes"])
+                if content_key not in batch_objects and content_key not in manifest_objects:
+                    manifest_object: Optional[dict] = run.manifest_index.find_object(*content_key, run.stored_format)
+                    if manifest_object is not None:
+                        manifest_objects[content_key] = manifest_object
+            # objects of the index could be deleted from S3 after they were uploaded, so they are checked first
+            manifest_objects_exist: list[bool] = list(WorkerPool().get_executor().map(
+                lambda manifest_object: WaiterManager.object_exists_in_S3(
+                    s3_client, manifest_object["bucket"], manifest_object["object_name"]),
+                manifest_objects.values()
+            ))
+            for content_key, exists in zip(list(manifest_objects), manifest_objects_exist):
+                if not exists:
+                    stale_object: dict = manifest_objects.pop(content_key)
+                    Logger().get_logger().warning(f"Object '{stale_object['object_name']}' of manifest index "
+                                                  f"doesn't exist in bucket '{stale_object['bucket']}' anymore, "
+                                                  f"it's removed from the index")
+                    run.manifest_index.remove_object(*content_key, run.stored_format, stale_object["bucket"],
+                                                     stale_object["object_name"])
+            for data_file in candidate_files:
+                content_key = (data_file.profile["sha256"], data_file.profile["size_bytes"])
+                data_file.duplicate_of = batch_objects.get(content_key) or manifest_objects.get(content_key)
+                if data_file.duplicate_of is not None:
+                    Logger().get_logger().info(f"File '{data_file.path}' is the same as already uploaded object "
+                                               f"'{data_file.duplicate_of['object_name']}' in bucket "
+                                               f"'{data_file.duplicate_of['bucket']}', it won't be uploaded again")
+                else:
+                    batch_objects[content_key] = {"bucket": run.configs["s3_raw_bucket"],
+                                                  "object_name": data_file.object_name}
+
+    @staticmethod
+    def convert_data_files(run: IngestRun, data_files: list[DataFile]):
+        """
+        convert_data_files method sets paths to files which are uploaded, data files are converted to parquet files if
+        conversion is enabled
+        :param run: state of ingest run
+        :type run: IngestRun
+        :param data_files: records of data files
+        :type data_files: list[DataFile]
+        :return: Nothing
+        """
+        with RunReport().span("convert"):
+            parquet_config: Mapping = ParquetConverter.get_parquet_config(run.configs)
+            if parquet_config["enabled"] != "True":
+                for data_file in data_files:
+                    data_file.upload_path = data_file.path
+                return
+            parquet_file_names_list: list[str] = FileNameManager\
+                .generate_data_file_names(len(data_files), run.timestamp_mark, file_type="parquet",
+                                          naming_pattern=run.configs["data_files_name_pattern"])
+            parquet_file_paths_list: list[str] = FileNameManager\
+                .generate_path_to_files(run.configs["raw_data_dir"], parquet_file_names_list.copy())
+            for data_file, parquet_file_path in zip(data_files, parquet_file_paths_list):
+                data_file.upload_path = parquet_file_path
+                if data_file.duplicate_of is not None:
+                    continue
+                if not data_file.uploaded:
+                    ParquetConverter.convert_csv_to_parquet(data_file.path,
+                                                            data_file.upload_path,
+                                                            run.json_ingest_metadata["csv_config"]["delimiter"],
+                                                            run.text_qualifier,
+                                                            parquet_config)
+                run.derived_file_paths.append(data_file.upload_path)
+
+    @staticmethod
+    def upload_data_files(s3_client: "Client", run: IngestRun, data_files: list[DataFile]):
+        """
+        upload_data_files method uploads data files which weren't uploaded before and aren't duplicates, verifies
+        objects which were uploaded before the failure, copies duplicates if 'mode' of 'dedup_config' is 'copy' and
+        adds uploaded objects to manifest index
+        :param s3_client: S3 client
+        :type s3_client: Client
+        :param run: state of ingest run
+        :type run: IngestRun
+        :param data_files: records of data files
+        :type data_files: list[DataFile]
+        :return: Nothing
+        """
+        with RunReport().span("upload") as upload_span:
+            pending_files: list[DataFile] = [data_file for data_file in data_files
+                                             if data_file.duplicate_of is None and not data_file.uploaded]
+            MultipartUploader.abort_stale_uploads(s3_client, run.configs["s3_raw_bucket"],
+                                                  run.configs["s3_raw_obj_prefix"])
+            uploaded_objects: dict[str, dict] = S3Uploader\
+                .sent_multiple_files_to_s3_bucket_and_wait_for_them_being_uploaded(
+                    s3_client,
+                    [data_file.upload_path for data_file in pending_files],
+                    run.configs["s3_raw_bucket"],
+                    [data_file.object_name for data_file in pending_files],
+                    run.codec,
+                    run.text_qualifier if run.read_once else None,
+                    partial(run.journal.record, "upload"),
+                    CompressionManager.get_compression_config(run.configs)["level"]
+                )
+            previously_uploaded_objects: dict[str, dict] = {
+                data_file.object_name: run.journal.get_value("upload", data_file.object_name)
+                for data_file in data_files if data_file.uploaded
+            }
+            if len(previously_uploaded_objects) > 0:
+                Logger().get_logger().info(f"{len(previously_uploaded_objects)} files were uploaded before the "
+                                           f"failure, they won't be uploaded again")
+                WaiterManager.verify_objects_exist_in_S3(s3_client, run.configs["s3_raw_bucket"],
+                                                         previously_uploaded_objects)
+            for data_file in pending_files:
+                if data_file.profile is None:
+                    data_file.profile = uploaded_objects[data_file.object_name]["Profile"]
+            upload_span["files"] = len(pending_files)
+            upload_span["bytes"] = sum(data_file.profile["size_bytes"] for data_file in pending_files)
+            if run.manifest_index is not None:
+                copied_objects: dict[str, dict] = {}
+                for data_file in data_files:
+                    if data_file.duplicate_of is not None and run.configs["dedup_config"]["mode"] == "copy":
+                        copied_objects[data_file.object_name] = S3Uploader.copy_object_in_s3(
+                            s3_client, data_file.duplicate_of["bucket"], data_file.duplicate_of["object_name"],
+                            run.configs["s3_raw_bucket"], data_file.object_name
+                        )
+                WaiterManager.verify_objects_exist_in_S3(s3_client, run.configs["s3_raw_bucket"], copied_objects)
+                run.manifest_index.add_objects([{
+                    "sha256": data_file.profile["sha256"],
+                    "size_bytes": data_file.profile["size_bytes"],
+                    "stored_format": run.stored_format,
+                    "source_name": data_file.source_name,
+                    "bucket": run.configs["s3_raw_bucket"],
+                    "object_name": data_file.object_name
+                } for data_file in data_files if data_file.duplicate_of is None])
+                run.manifest_index.close()
+
+    @staticmethod
+    def upload_ingest_metadata(s3_client: "Client", run: IngestRun, data_files: list[DataFile]) -> list[str]:
+        """
+        upload_ingest_metadata method creates ingest metadata file of the run from profiles of data files and uploads
+        it to S3 bucket of metadata
+        :param s3_client: S3 client
+        :type s3_client: Client
+        :param run: state of ingest run
+        :type run: IngestRun
+        :param data_files: records of data files
+        :type data_files: list[DataFile]
+        :return: paths to data and metadata files of the run which are moved or deleted after ingesting
+        :rtype: list[str]
+        """
+        configs: Mapping = run.configs
+        json_ingest_metadata: dict = run.json_ingest_metadata
+        with RunReport().span("metadata"):
+            for data_file in data_files:
+                if data_file.sources is not None:
+                    data_file.profile["sources"] = data_file.sources
+                if data_file.split_of is not None:
+                    data_file.profile["split_of"] = data_file.split_of
+                if run.manifest_index is None:
+                    continue
+                if data_file.duplicate_of is None:
+                    data_file.profile["dedup_action"] = "uploaded"
+                    continue
+                data_file.profile["dedup_action"] = "copied" if configs["dedup_config"]["mode"] == "copy" \
+                    else "skipped"
+                data_file.profile["duplicate_of"] = \
+                    f"s3://{data_file.duplicate_of['bucket']}/{data_file.duplicate_of['object_name']}"
+            json_ingest_metadata["file_type"] = run.upload_file_type
+            json_ingest_metadata["row_count"]: int = sum(data_file.profile["row_count"] for data_file in data_files)
+            json_ingest_metadata["file_count"] = len(data_files)
+            json_ingest_metadata["total_size_bytes"] = sum(data_file.profile["size_bytes"]
+                                                           for data_file in data_files)
+            json_ingest_metadata["files"] = {data_file.file_name: data_file.profile for data_file in data_files}
+            # data of every file is listed by its object, so loaders don't have to list the bucket
+            json_ingest_metadata["objects"] = [
+                f"s3://{configs['s3_raw_bucket']}/{data_file.object_name}"
+                if data_file.duplicate_of is None or configs["dedup_config"]["mode"] == "copy"
+                else f"s3://{data_file.duplicate_of['bucket']}/{data_file.duplicate_of['object_name']}"
+                for data_file in data_files
+            ]
+            json_ingest_metadata["csv_config"]["compression"] = CompressionManager.get_metadata_compression(run.codec)
+            # dialect and schema which were sniffed from samples of raw data files
+            csv_summary: Optional[dict] = run.journal.get_value("sniff")
+            if csv_summary is not None:
+                json_ingest_metadata["csv_config"]["encoding"] = csv_summary["encoding"]
+                json_ingest_metadata["csv_config"]["has_header"] = csv_summary["has_header"]
+                json_ingest_metadata["columns"] = csv_summary["columns"]
+            json_ingest_metadata_file_name: str = FileNameManager\
+                .generate_json_metadata_file_name(run.timestamp_mark, configs["data_files_name_pattern"])
+            json_ingest_metadata_file_path_src: str = FileNameManager\
+                .generate_path_to_files(configs["raw_data_dir"], json_ingest_metadata_file_name)
+            FileWriter.create_json_ingest_metadata_file(json_ingest_metadata, json_ingest_metadata_file_path_src)
+            s3_json_metadata_object_name: str = FileNameManager\
+                .generate_path_to_files(configs["s3_metadata_obj_prefix"], json_ingest_metadata_file_name, s3=True)
+
+        with RunReport().span("metadata_upload"):
+            S3Uploader.sent_file_to_s3_bucket_and_wait_for_it_being_uploaded(
+                s3_client,
+                json_ingest_metadata_file_path_src,
+                configs["s3_metadata_bucket"],
+                s3_json_metadata_object_name
+            )
+            data_files_list: list[str] = run.raw_file_paths + run.derived_file_paths
+            data_files_list.append(json_ingest_metadata_file_path_src)
+            run.journal.record("metadata_upload", value=data_files_list)
+        return data_files_list
+
+    @staticmethod
+    def sniff_raw_data_files(configs: Mapping, raw_data_file_names_list_src: list[str],
+                             timestamp_mark: str) -> tuple[list[str], Optional[dict]]:
+        """
+        sniff_raw_data_files method sniffs dialect and schema of raw data files by samples before they are ingested.
+        Files which encoding, delimiter, text qualifier or columns differ from the expected ones ('encoding' of
+        'sniff_config', 'csv_config' of metadata template, columns of the most of files) are rejected: they are moved
+        to the folder 'rejected_<timestamp>' in 'dir_to_move' and aren't uploaded.
+        :param configs: configs of pipeline
+        :type configs: Mapping
+        :param raw_data_file_names_list_src: names of raw data files in 'raw_data_dir'
+        :type raw_data_file_names_list_src: list[str]
+        :param timestamp_mark: timestamp mark of the run
+        :type timestamp_mark: str
+        :return: names of accepted files and summary of their dialect and schema (None if there are no such files)
+        :rtype: tuple[list[str], Optional[dict]]
+        """
+        csv_config: dict = FileReader\
+            .get_data_from_json("config_data/JSON_ingest_metadata_template.json")["csv_config"]
+        with RunReport().span("sniff", files=len(raw_data_file_names_list_src)) as sniff_span:
+            raw_data_file_paths_list_src: list[str] = [os.path.normpath(os.path.join(configs["raw_data_dir"], name))
+                                                       for name in raw_data_file_names_list_src]
+            sniff_results: list[dict] = CsvSniffer.sniff_multiple_files(
+                raw_data_file_paths_list_src, csv_config["delimiter"], csv_config["text_qualifier"],
+                CsvSniffer.get_sniff_config(configs)
+            )
+            rejected_indexes: list[int] = [i for i, sniff_result in enumerate(sniff_results)
+                                           if len(sniff_result["mismatches"]) > 0]
+            sniff_span["bytes"] = sum(sniff_result["sampled_bytes"] for sniff_result in sniff_results)
+            sniff_span["rejected_files"] = len(rejected_indexes)
+            if len(rejected_indexes) > 0:
+                for i in rejected_indexes:
+                    Logger().get_logger().error(f"File '{raw_data_file_paths_list_src[i]}' is rejected: "
+                                                f"{'; '.join(sniff_results[i]['mismatches'])}")
+                rejected_folder: str = FileManager.create_folder(configs["dir_to_move"], f"rejected_{timestamp_mark}")
+                FileManager.move_files_to_folder([raw_data_file_paths_list_src[i] for i in rejected_indexes],
+                                                 rejected_folder)
+        accepted_indexes: list[int] = sorted(set(range(len(sniff_results))) - set(rejected_indexes))
+        if len(accepted_indexes) == 0:
+            return [], None
+        return [raw_data_file_names_list_src[i] for i in accepted_indexes], \
+            CsvSniffer.summarize([sniff_results[i] for i in accepted_indexes])
+
+    @staticmethod
+    def move_or_delete_files(configs: Mapping, data_files_list: list[str], timestamp_mark: str, resumed: bool):
+        """
+        move_or_delete_files method deletes ingested files if 'delete_flag' is 'True', otherwise moves them to the
+        folder of the timestamp in 'dir_to_move'
+        :param configs: configs of pipeline
+        :type configs: Mapping
+        :param data_files_list: paths to data and metadata files
+        :type data_files_list: list[str]
+        :param timestamp_mark: timestamp mark of ingested files
+        :type timestamp_mark: str
+        :param resumed: True if the run is resumed, files which were moved or deleted before the failure are skipped
+        :type resumed: bool
+        :return: Nothing
+        """
+        if resumed:
+            data_files_list = [path for path in data_files_list if os.path.isfile(path)]
+        Logger().get_logger().error("%s", LogSummary(data_files_list))
         if configs["delete_flag"] == "True":
             FileManager.remove_multiple_files(data_files_list)
         else:
-            new_folder_to_move_files: str = FileManager.create_folder(configs["dir_to_move"], timestamp_mark)
+            new_folder_to_move_files: str = FileManager\
+                .create_folder(configs["dir_to_move"], timestamp_mark)
             FileManager.move_files_to_folder(data_files_list, new_folder_to_move_files)
-        # end of managing files data and metadata files on local machine
-        Logger().get_logger().info("End of process of ingesting data to S3")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,15 @@
+"""
+Common fixtures of tests
+"""
+import os
+import pytest
+
+repo_root: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def run_in_repo_root(monkeypatch: pytest.MonkeyPatch):
+    """
+    Configs are read by paths relative to the root of repository, so tests are run from it
+    """
+    monkeypatch.chdir(repo_root)
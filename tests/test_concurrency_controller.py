@@ -0,0 +1,130 @@
+"""
+Tests of adaptive limit of parallel upload requests against local S3 stand-in which injects 503 SlowDown responses
+"""
+import pytest
+import random
+from benchmarks.local_s3 import LocalS3Client
+from botocore.exceptions import ClientError
+from typing import Callable
+from utils.aws_utils import concurrency_controller
+from utils.aws_utils.concurrency_controller import ConcurrencyController
+from utils.singleton_util import Singleton
+
+body: bytes = b"x" * 1024
+
+
+@pytest.fixture
+def concurrency_config() -> dict:
+    return {"enabled": "True", "initial_limit": 8, "min_limit": 1, "max_limit": 16, "additive_increase": 1,
+            "decrease_factor": 0.5, "max_retries": 3, "base_backoff_seconds": 0.1, "max_backoff_seconds": 0.5}
+
+
+@pytest.fixture
+def sleeps(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """
+    Backoff isn't waited for, durations of sleeps are collected instead
+    """
+    durations: list[float] = []
+    monkeypatch.setattr(concurrency_controller.time, "sleep", durations.append)
+    return durations
+
+
+@pytest.fixture
+def controller(monkeypatch: pytest.MonkeyPatch, concurrency_config: dict) -> ConcurrencyController:
+    """
+    Controller is a singleton, so every test gets a new instance with its own config
+    """
+    monkeypatch.setattr(ConcurrencyController, "get_concurrency_config", staticmethod(lambda: concurrency_config))
+    monkeypatch.delitem(Singleton._instances, ConcurrencyController, raising=False)
+    return ConcurrencyController()
+
+
+def make_client(tmp_path, throttle_rate: float) -> LocalS3Client:
+    s3_client: LocalS3Client = LocalS3Client(str(tmp_path), throttle_rate=throttle_rate, seed=0)
+    s3_client.create_bucket(Bucket="bucket")
+    return s3_client
+
+
+def put(controller: ConcurrencyController, s3_client: LocalS3Client, key: str = "key") -> dict:
+    return controller.call(s3_client.put_object, size_bytes=len(body), Bucket="bucket", Key=key, Body=body)
+
+
+def throttle_once(controller: ConcurrencyController, tmp_path, concurrency_config: dict):
+    concurrency_config["max_retries"] = 1
+    with pytest.raises(ClientError):
+        put(controller, make_client(tmp_path, throttle_rate=1.0))
+
+
+def test_limit_is_multiplied_by_decrease_factor(tmp_path, controller: ConcurrencyController,
+                                                concurrency_config: dict, sleeps: list[float]):
+    throttle_once(controller, tmp_path, concurrency_config)
+    assert controller.get_limit() == 8 * concurrency_config["decrease_factor"]
+
+
+def test_limit_is_not_lower_than_min_limit(tmp_path, controller: ConcurrencyController, concurrency_config: dict,
+                                           sleeps: list[float]):
+    concurrency_config["max_retries"] = 10
+    with pytest.raises(ClientError):
+        put(controller, make_client(tmp_path, throttle_rate=1.0))
+    assert controller.get_limit() == concurrency_config["min_limit"]
+
+
+def test_retries_are_capped_by_max_retries(tmp_path, controller: ConcurrencyController, concurrency_config: dict,
+                                           sleeps: list[float]):
+    s3_client: LocalS3Client = make_client(tmp_path, throttle_rate=1.0)
+    with pytest.raises(ClientError) as error:
+        put(controller, s3_client)
+    assert error.value.response["Error"]["Code"] == "SlowDown"
+    assert s3_client.throttled_requests == concurrency_config["max_retries"] + 1
+    assert len(sleeps) == concurrency_config["max_retries"]
+
+
+def test_retried_request_reports_retry_attempts(tmp_path, controller: ConcurrencyController, sleeps: list[float]):
+    s3_client: LocalS3Client = make_client(tmp_path, throttle_rate=0.5)
+    responses: list[dict] = [put(controller, s3_client, key=f"key_{i}") for i in range(20)]
+    retry_attempts: int = sum(response["ResponseMetadata"].get("RetryAttempts", 0) for response in responses)
+    assert retry_attempts == s3_client.throttled_requests > 0
+
+
+def test_jittered_backoff_is_within_max_backoff_seconds(tmp_path, monkeypatch: pytest.MonkeyPatch,
+                                                        controller: ConcurrencyController, concurrency_config: dict,
+                                                        sleeps: list[float]):
+    concurrency_config["max_retries"] = 6
+    upper_bounds: list[float] = []
+    uniform: Callable[[float, float], float] = random.uniform
+
+    def record_uniform(a: float, b: float) -> float:
+        upper_bounds.append(b)
+        return uniform(a, b)
+
+    monkeypatch.setattr(concurrency_controller.random, "uniform", record_uniform)
+    with pytest.raises(ClientError):
+        put(controller, make_client(tmp_path, throttle_rate=1.0))
+    assert upper_bounds == pytest.approx([0.2, 0.4, 0.5, 0.5, 0.5, 0.5])
+    assert all(0 <= sleep <= concurrency_config["max_backoff_seconds"] for sleep in sleeps)
+
+
+def test_limit_recovers_additively_after_successes(tmp_path, controller: ConcurrencyController,
+                                                  concurrency_config: dict, sleeps: list[float]):
+    throttle_once(controller, tmp_path, concurrency_config)
+    s3_client: LocalS3Client = make_client(tmp_path, throttle_rate=0.0)
+    expected_limit: float = 4.0
+    for i in range(12):
+        put(controller, s3_client, key=f"key_{i}")
+        expected_limit += concurrency_config["additive_increase"] / expected_limit
+        assert controller.get_limit() == int(expected_limit)
+    assert controller.get_limit() > 4
+    for i in range(200):
+        put(controller, s3_client, key=f"key_{i}")
+    assert controller.get_limit() == concurrency_config["max_limit"]
+
+
+def test_limit_is_not_adapted_if_disabled(tmp_path, controller: ConcurrencyController, concurrency_config: dict,
+                                          sleeps: list[float]):
+    concurrency_config["enabled"] = "False"
+    s3_client: LocalS3Client = make_client(tmp_path, throttle_rate=1.0)
+    with pytest.raises(ClientError):
+        put(controller, s3_client)
+    assert s3_client.throttled_requests == concurrency_config["max_retries"] + 1
+    put(controller, make_client(tmp_path, throttle_rate=0.0))
+    assert controller.get_limit() == concurrency_config["initial_limit"]
@@ -0,0 +1,20 @@
+"""
+Tests of names of data files and S3 objects
+"""
+import os
+from utils.file_manager_utils.file_name_manager import FileNameManager
+
+
+def test_local_paths_and_object_names_are_in_the_same_order():
+    names: list[str] = FileNameManager.generate_data_file_names(1200, "20240101T000000")
+    assert names[99].split("_")[-2] == "0100"
+    assert names[999].split("_")[-2] == "1000"
+    paths: list[str] = FileNameManager.generate_path_to_files("raw_data", names.copy())
+    object_names: list[str] = FileNameManager.generate_s3_object_names("raw/", names, sub_prefix_count=16)
+    assert [os.path.basename(path) for path in paths] == names
+    assert [object_name.rsplit("/", 1)[-1] for object_name in object_names] == names
+
+
+def test_order_numbers_have_at_least_three_digits():
+    names: list[str] = FileNameManager.generate_data_file_names(2, "20240101T000000")
+    assert [name.split("_")[-2] for name in names] == ["001", "002"]
@@ -0,0 +1,49 @@
+"""
+Tests of rendering of log messages
+"""
+import logging
+import pytest
+import queue
+from utils.file_manager_utils.file_writer import FileWriter
+from utils.logger_manager import DeferredFormattingQueueHandler, Logger, LogSummary
+
+
+def test_log_summary_is_rendered_inside_of_collections():
+    summary: LogSummary = LogSummary(range(25), limit=3)
+    assert str(summary) == "[0, 1, 2] ... (25 items in total)"
+    assert repr({"files": summary}) == "{'files': [0, 1, 2] ... (25 items in total)}"
+
+
+def test_metadata_log_line_shows_summarized_files(tmp_path, caplog: pytest.LogCaptureFixture):
+    Logger().get_logger()
+    files: dict = {f"file_{i:03d}.csv": {"row_count": i} for i in range(50)}
+    with caplog.at_level(logging.INFO, logger="Logger"):
+        FileWriter.create_json_ingest_metadata_file({"file_type": "csv", "files": files},
+                                                    str(tmp_path / "metadata.json"))
+    message: str = next(record.getMessage() for record in caplog.records
+                        if record.getMessage().startswith("Creating json metadata file"))
+    assert "LogSummary object" not in message
+    assert "'file_type': 'csv'" in message
+    assert "'files': ['file_000.csv', 'file_001.csv'" in message
+    assert "(50 items in total)" in message
+
+
+def make_record(msg, *args) -> logging.LogRecord:
+    return logging.LogRecord("Logger", logging.INFO, __file__, 0, msg, args, None)
+
+
+def test_message_with_mutable_arguments_is_formatted_right_away():
+    files: list[str] = ["a.csv"]
+    record: logging.LogRecord = DeferredFormattingQueueHandler(queue.Queue()).prepare(make_record("Files %s", files))
+    files.append("b.csv")
+    assert record.getMessage() == "Files ['a.csv']"
+    assert record.args is None
+
+
+def test_message_with_immutable_arguments_is_deferred():
+    summary: LogSummary = LogSummary(["a.csv", "b.csv"], limit=1)
+    record: logging.LogRecord = DeferredFormattingQueueHandler(queue.Queue()).prepare(
+        make_record("%s files: %s", 2, summary)
+    )
+    assert record.args == (2, summary)
+    assert record.getMessage() == "2 files: ['a.csv'] ... (2 items in total)"
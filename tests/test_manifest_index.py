@@ -0,0 +1,27 @@
+"""
+Tests of persistent index of uploaded files
+"""
+from utils.manifest_index import ManifestIndex
+
+
+def make_object(sha256: str, object_name: str) -> dict:
+    return {"sha256": sha256, "size_bytes": 10, "stored_format": "csv", "source_name": "source.csv",
+            "bucket": "bucket", "object_name": object_name}
+
+
+def test_removed_object_is_not_found(tmp_path):
+    manifest_index: ManifestIndex = ManifestIndex(str(tmp_path / "manifest.sqlite3"))
+    manifest_index.add_objects([make_object("a", "raw/a.csv"), make_object("b", "raw/b.csv")])
+    manifest_index.remove_object("a", 10, "csv", "bucket", "raw/a.csv")
+    assert manifest_index.find_object("a", 10, "csv") is None
+    assert manifest_index.find_object("b", 10, "csv")["object_name"] == "raw/b.csv"
+    manifest_index.close()
+
+
+def test_entry_of_other_object_is_kept(tmp_path):
+    manifest_index: ManifestIndex = ManifestIndex(str(tmp_path / "manifest.sqlite3"))
+    manifest_index.add_objects([make_object("a", "raw/a.csv")])
+    manifest_index.add_objects([make_object("a", "raw/new_a.csv")])
+    manifest_index.remove_object("a", 10, "csv", "bucket", "raw/a.csv")
+    assert manifest_index.find_object("a", 10, "csv")["object_name"] == "raw/new_a.csv"
+    manifest_index.close()
@@ -0,0 +1,41 @@
+"""
+Tests of conversion of csv files to parquet
+"""
+import pytest
+from utils.parquet_converter import ParquetConverter
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def make_parquet_config(infer_types: str = "False") -> dict:
+    return {"enabled": "True", "row_group_size": 2, "infer_types": infer_types, "use_dictionary": "True",
+            "compression": "snappy"}
+
+
+def test_values_are_kept_as_they_are_written(tmp_path):
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text("code,amount,comment\n007,12345678901234567890,NA\n010,1.50,\n,2,text\n")
+    ParquetConverter.convert_csv_to_parquet(str(csv_path), str(tmp_path / "data.parquet"),
+                                            parquet_config=make_parquet_config())
+    table = pq.read_table(tmp_path / "data.parquet")
+    assert table.to_pydict() == {"code": ["007", "010", ""], "amount": ["12345678901234567890", "1.50", "2"],
+                                 "comment": ["NA", "", "text"]}
+
+
+def test_file_without_rows_has_string_columns(tmp_path):
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text("code,amount\n")
+    ParquetConverter.convert_csv_to_parquet(str(csv_path), str(tmp_path / "data.parquet"),
+                                            parquet_config=make_parquet_config())
+    schema = pq.read_schema(tmp_path / "data.parquet")
+    assert [str(field.type) for field in schema] == ["string", "string"]
+
+
+def test_inferred_types_are_widened_between_chunks(tmp_path):
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text("id,value\n1,\n2,\n3,a\n4,b\n")
+    ParquetConverter.convert_csv_to_parquet(str(csv_path), str(tmp_path / "data.parquet"),
+                                            parquet_config=make_parquet_config(infer_types="True"))
+    table = pq.read_table(tmp_path / "data.parquet")
+    assert table.column("id").to_pylist() == [1, 2, 3, 4]
+    assert table.column("value").to_pylist()[2:] == ["a", "b"]
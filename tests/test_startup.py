@@ -0,0 +1,20 @@
+"""
+Tests of cold start of the script measured by 'python -X importtime' in fresh interpreters
+"""
+import statistics
+from benchmarks.benchmark_startup import StartupBenchmark
+
+
+def test_heavy_packages_are_not_imported_at_startup():
+    import_times: dict[str, tuple[int, int]] = StartupBenchmark.measure_import("main")
+    loaded: list[str] = [name for name in StartupBenchmark.lazy_packages if name in import_times]
+    assert loaded == [], f"packages {loaded} are loaded at import of main module"
+
+
+def test_import_time_is_within_budget():
+    # the first import compiles bytecode, so it isn't measured
+    StartupBenchmark.measure_import("main")
+    median_ms: float = statistics.median(StartupBenchmark.measure_import("main")["main"][1]
+                                         for _ in range(3)) / 1000
+    assert median_ms <= StartupBenchmark.budget_ms, \
+        f"import of main module takes {median_ms:.1f} ms, budget is {StartupBenchmark.budget_ms:.1f} ms"
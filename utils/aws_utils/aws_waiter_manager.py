@@ -1,10 +1,15 @@
 """
 Module is required for managing waiter
 """
-from boto3_type_annotations.s3 import Client
 from botocore.exceptions import ClientError, ParamValidationError
+from typing import TYPE_CHECKING
 from utils.config_manager import ConfigReader
 from utils.logger_manager import Logger
+from utils.run_report import RunReport
+import os
+
+if TYPE_CHECKING:
+    from boto3_type_annotations.s3 import Client
 
 
 class WaiterManager:
@@ -12,14 +17,84 @@ class WaiterManager:
     Class WaiterManager is required for managing waiters
     """
     @staticmethod
-    def wait_for_object_exists_in_S3(s3_client: Client, bucket: str, object_name: str):
+    def wait_for_object_exists_in_S3(s3_client: "Client", bucket: str, object_name: str):
         Logger().get_logger().info(f"Waiting for object '{object_name}' to appear in bucket '{bucket}'")
-        waiter_config: dict = ConfigReader.get_main_config()['WaiterConfig']
+        waiter_config: dict = dict(ConfigReader.get_main_config()['WaiterConfig'])
         try:
             s3_client.get_waiter('object_exists').wait(Bucket=bucket, Key=object_name, WaiterConfig=waiter_config)
         except ClientError as e:
             Logger().get_logger().error(f"ClientError happened while waiting for object to appear: '{e}'")
-            raise ClientError
+            raise
         except ParamValidationError as e:
             Logger().get_logger().error(f"The parameters that were provided are incorrect: '{e}'")
             raise ValueError
+
+    @staticmethod
+    def object_exists_in_S3(s3_client: "Client", bucket: str, object_name: str) -> bool:
+        """
+        Method object_exists_in_S3 checks by HEAD request that object exists in the bucket now
+        :param s3_client: S3 client
+        :type s3_client: Client
+        :param bucket: bucket of the object
+        :type bucket: str
+        :param object_name: key of the object
+        :type object_name: str
+        :return: True if object exists
+        :rtype: bool
+        """
+        try:
+            s3_client.head_object(Bucket=bucket, Key=object_name)
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ("404", "NoSuchKey", "NotFound"):
+                return False
+            Logger().get_logger().error(f"ClientError happened while checking object '{object_name}' in bucket "
+                                        f"'{bucket}': '{e}'")
+            raise
+
+    @staticmethod
+    def verify_objects_exist_in_S3(s3_client: "Client", bucket: str, uploaded_objects: dict[str, dict]):
+        """
+        Method verify_objects_exist_in_S3 checks that all uploaded objects exist in the bucket with the same ETag and
+        Size as upload responses have. Objects are checked in bulk by one paginated listing of their common prefix
+        (e.g. 'time=<timestamp>/' of the run). Only objects that are missing in the listing are waited for one by one.
+        :param s3_client: S3 client
+        :type s3_client: Client
+        :param bucket: bucket where objects were uploaded to
+        :type bucket: str
+        :param uploaded_objects: upload responses with ETag and Size of uploaded objects by their keys
+        :type uploaded_objects: dict[str, dict]
+        :return: Nothing
+        """
+        if len(uploaded_objects) == 0:
+            return
+        prefix: str = os.path.commonprefix(list(uploaded_objects))
+        Logger().get_logger().info(f"Verifying {len(uploaded_objects)} objects with prefix '{prefix}' "
+                                   f"in bucket '{bucket}'")
+        with RunReport().span("waiter_manager.verify_objects", files=len(uploaded_objects)):
+            listed_objects: dict[str, dict] = {}
+            try:
+                paginator = s3_client.get_paginator('list_objects_v2')
+                for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+                    for listed_object in page.get('Contents', []):
+                        if listed_object['Key'] in uploaded_objects:
+                            listed_objects[listed_object['Key']] = {"ETag": listed_object['ETag'],
+                                                                    "Size": listed_object['Size']}
+            except ClientError as e:
+                Logger().get_logger().error(f"ClientError happened while listing objects with prefix '{prefix}': "
+                                            f"'{e}'")
+                raise
+
+            for object_name in uploaded_objects:
+                if object_name not in listed_objects:
+                    WaiterManager.wait_for_object_exists_in_S3(s3_client, bucket, object_name)
+                    head: dict = s3_client.head_object(Bucket=bucket, Key=object_name)
+                    listed_objects[object_name] = {"ETag": head['ETag'], "Size": head['ContentLength']}
+
+        mismatched_objects: list[str] = [object_name for object_name, uploaded_object in uploaded_objects.items()
+                                         if listed_objects[object_name] != {"ETag": uploaded_object['ETag'],
+                                                                            "Size": uploaded_object['Size']}]
+        if len(mismatched_objects) > 0:
+            Logger().get_logger().error(f"ETag or Size of the next objects in bucket '{bucket}' don't match "
+                                        f"uploaded files: '{mismatched_objects}'")
+            raise ValueError
@@ -0,0 +1,186 @@
+"""
+Module for adaptive control of number of parallel requests to S3
+"""
+from botocore.exceptions import ClientError
+from typing import Callable, Mapping
+from utils.config_manager import ConfigReader
+from utils.logger_manager import Logger
+from utils.run_report import RunReport
+from utils.singleton_util import Singleton
+import random
+import threading
+import time
+
+
+class ConcurrencyController(metaclass=Singleton):
+    """
+    Class ConcurrencyController keeps the only one limit of parallel upload requests to S3 per process and adapts it by
+    additive-increase/multiplicative-decrease (AIMD), the same way as TCP congestion window:
+    - every successful request with body increases limit by 'additive_increase' per limit requests, so limit grows by
+    about 'additive_increase' per round of requests and bandwidth of quiet link is used up;
+    - throttle response (SlowDown, 503) multiplies limit by 'decrease_factor', at most once per round of requests.
+    Latency isn't used as a signal of congestion, because it depends on size of request as much as on load of the link.
+    Limit stays between 'min_limit' and 'max_limit' of 'concurrency_config'. Throttled requests are retried after
+    backoff with full jitter (random time up to 'base_backoff_seconds' * 2 ** attempt, but not more than
+    'max_backoff_seconds') up to 'max_retries' times, even if adaptive limit isn't 'enabled', but then the limit is
+    neither applied nor adapted.
+    Current limit, number of throttle responses and number of decreases are written to measures of run report.
+    """
+    throttle_error_codes: frozenset = frozenset({"SlowDown", "ServiceUnavailable", "503", "Throttling",
+                                                 "ThrottlingException", "RequestLimitExceeded", "TooManyRequests"})
+
+    def __init__(self):
+        config: Mapping = self.get_concurrency_config()
+        self.__condition: threading.Condition = threading.Condition()
+        self.__limit: float = float(config['initial_limit'])
+        self.__in_flight: int = 0
+        self.__average_latency: float = 0.0
+        self.__last_decrease_time: float = 0.0
+        self.__throttles: int = 0
+        self.__decreases: int = 0
+
+    @staticmethod
+    def get_concurrency_config() -> Mapping:
+        """
+        Method get_concurrency_config returns 'concurrency_config' from main config
+        :return: concurrency configs as read-only dict
+        :rtype: Mapping
+        """
+        return ConfigReader.get_main_config()['concurrency_config']
+
+    @staticmethod
+    def is_throttle_error(error: ClientError) -> bool:
+        """
+        Method is_throttle_error checks if S3 asked to reduce request rate
+        :param error: error of request
+        :type error: ClientError
+        :return: True if error is throttle response
+        :rtype: bool
+        """
+        return error.response.get('Error', {}).get('Code') in ConcurrencyController.throttle_error_codes \
+            or error.response.get('ResponseMetadata', {}).get('HTTPStatusCode') == 503
+
+    def get_limit(self) -> int:
+        """
+        Method get_limit returns current number of requests which can be sent at the same time
+        :return: current limit
+        :rtype: int
+        """
+        with self.__condition:
+            return int(self.__limit)
+
+    def call(self, operation: Callable[..., dict], size_bytes: int = 0, **kwargs) -> dict:
+        """
+        Method call sends request when number of requests in flight is under the limit, measures it and adapts the
+        limit. Throttled request is retried after jittered backoff, number of such retries is added to 'RetryAttempts'
+        of the response.
+        :param operation: method of S3 client, e.g. put_object
+        :type operation: Callable[..., dict]
+        :param size_bytes: size of body of request, limit isn't adapted by requests without body
+        :type size_bytes: int
+        :param kwargs: parameters of request
+        :return: response of request
+        :rtype: dict
+        """
+        config: Mapping = self.get_concurrency_config()
+        adaptive: bool = config['enabled'] == "True"
+        attempt: int = 0
+        while True:
+            self.__acquire(config)
+            start: float = time.perf_counter()
+            try:
+                response: dict = operation(**kwargs)
+            except ClientError as e:
+                self.__release()
+                if not self.is_throttle_error(e) or attempt >= config['max_retries']:
+                    raise
+                attempt += 1
+                backoff: float = random.uniform(0, min(config['max_backoff_seconds'],
+                                                       config['base_backoff_seconds'] * 2 ** attempt))
+                message: str = f"Request was throttled by S3 ('{e}'), retry {attempt} of {config['max_retries']} " \
+                               f"in {backoff:.2f} seconds"
+                if adaptive:
+                    self.__on_throttle(config)
+                    message += f" with {self.get_limit()} parallel requests"
+                Logger().get_logger().warning(message)
+                time.sleep(backoff)
+                continue
+            except BaseException:
+                self.__release()
+                raise
+            self.__release()
+            if adaptive:
+                self.__on_success(config, time.perf_counter() - start, size_bytes)
+            if attempt > 0:
+                response_metadata: dict = response.setdefault('ResponseMetadata', {})
+                response_metadata['RetryAttempts'] = response_metadata.get('RetryAttempts', 0) + attempt
+            return response
+
+    def __acquire(self, config: Mapping):
+        """
+        Private method for waiting until number of requests in flight is under the limit
+        :return: Nothing
+        """
+        if config['enabled'] != "True":
+            return
+        with self.__condition:
+            while self.__in_flight >= int(self.__limit):
+                self.__condition.wait()
+            self.__in_flight += 1
+
+    def __release(self):
+        """
+        Private method for finishing request in flight and waking up requests which wait for the limit
+        :return: Nothing
+        """
+        with self.__condition:
+            if self.__in_flight > 0:
+                self.__in_flight -= 1
+            self.__condition.notify_all()
+
+    def __on_success(self, config: Mapping, latency: float, size_bytes: int):
+        """
+        Private method for additive increase of the limit after successful request
+        :return: Nothing
+        """
+        # requests without body (e.g. completion of multipart upload) don't show that the link can carry more data
+        if size_bytes == 0:
+            return
+        with self.__condition:
+            self.__average_latency = latency if self.__average_latency == 0 \
+                else 0.8 * self.__average_latency + 0.2 * latency
+            self.__limit = min(self.__limit + config['additive_increase'] / self.__limit, config['max_limit'])
+            self.__condition.notify_all()
+            limit: int = int(self.__limit)
+        RunReport().set_measure("upload_concurrency.limit", limit)
+        RunReport().set_measure("upload_concurrency.peak_limit", limit, keep_max=True)
+
+    def __on_throttle(self, config: Mapping):
+        """
+        Private method for decreasing the limit after throttle response
+        :return: Nothing
+        """
+        with self.__condition:
+            self.__throttles += 1
+            self.__decrease(config)
+            throttles: int = self.__throttles
+            limit: int = int(self.__limit)
+        RunReport().set_measure("upload_concurrency.throttles", throttles)
+        RunReport().set_measure("upload_concurrency.limit", limit)
+
+    def __decrease(self, config: Mapping):
+        """
+        Private method for multiplicative decrease of the limit. Requests which were sent before the previous decrease
+        report the same congestion, so the limit is decreased at most once per average latency of request.
+        Must be called under the lock.
+        :return: Nothing
+        """
+        now: float = time.perf_counter()
+        if now - self.__last_decrease_time < self.__average_latency:
+            return
+        self.__last_decrease_time = now
+        self.__decreases += 1
+        self.__limit = max(self.__limit * config['decrease_factor'], config['min_limit'])
+        RunReport().set_measure("upload_concurrency.decreases", self.__decreases)
+        Logger().get_logger().info(f"Limit of parallel upload requests is decreased to {int(self.__limit)} "
+                                   "because of throttling")
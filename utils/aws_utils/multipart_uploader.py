@@ -0,0 +1,337 @@
+"""
+Module for needs of resumable multipart uploading of big files to S3
+"""
+from botocore.exceptions import ClientError
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Mapping, Optional, Union
+from utils.aws_utils.concurrency_controller import ConcurrencyController
+from utils.compression_manager import CompressingReader, CompressionManager
+from utils.config_manager import ConfigReader
+from utils.file_profiler import ProfilingReader
+from utils.logger_manager import Logger
+from utils.memory_budget import MemoryBudget
+from utils.worker_pool import ContextThreadPoolExecutor
+import base64
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+
+if TYPE_CHECKING:
+    from boto3_type_annotations.s3 import Client
+
+
+class MultipartUploader:
+    """
+    Class MultipartUploader uploads big files to S3 by parts. Completed parts are saved to local checkpoint file,
+    so upload which failed in the middle is resumed from the last completed part on the next run.
+    """
+    min_part_size: int = 5 * 1024 * 1024
+    max_parts_count: int = 10000
+
+    @staticmethod
+    def get_multipart_config() -> Mapping:
+        """
+        Method get_multipart_config returns 'multipart_config' from main config
+        :return: multipart upload configs as read-only dict
+        :rtype: Mapping
+        """
+        return ConfigReader.get_main_config()['multipart_config']
+
+    @staticmethod
+    def calculate_part_size(file_size: int, part_size: int) -> int:
+        """
+        Method calculate_part_size adapts configured part size to file size, so number of parts doesn't exceed
+        S3 limit of 10000 parts. Result is rounded up to whole MiB and is never less than S3 minimum of 5 MiB.
+        :param file_size: size of file in bytes
+        :type file_size: int
+        :param part_size: configured part size in bytes
+        :type part_size: int
+        :return: part size in bytes
+        :rtype: int
+        """
+        required_part_size: int = math.ceil(file_size / MultipartUploader.max_parts_count)
+        mib: int = 1024 * 1024
+        required_part_size = math.ceil(required_part_size / mib) * mib
+        return max(part_size, required_part_size, MultipartUploader.min_part_size)
+
+    @staticmethod
+    def __get_checkpoint_path(bucket: str, object_name: str) -> str:
+        """
+        Private method for generating path to checkpoint file of the object
+        :param bucket: bucket where file is uploaded to
+        :type bucket: str
+        :param object_name: key of the object in the bucket
+        :type object_name: str
+        :return: path to checkpoint file
+        :rtype: str
+        """
+        checkpoint_dir: str = os.path.normpath(MultipartUploader.get_multipart_config()['checkpoint_dir'])
+        if not os.path.isdir(checkpoint_dir):
+            os.makedirs(checkpoint_dir, exist_ok=True)
+        checkpoint_name: str = hashlib.sha1(f"{bucket}/{object_name}".encode()).hexdigest() + ".json"
+        return os.path.join(checkpoint_dir, checkpoint_name)
+
+    @staticmethod
+    def __read_checkpoint(checkpoint_path: str) -> Optional[dict]:
+        """
+        Private method for reading checkpoint file
+        :param checkpoint_path: path to checkpoint file
+        :type checkpoint_path: str
+        :return: checkpoint as dict or None if checkpoint doesn't exist or is broken
+        :rtype: Optional[dict]
+        """
+        try:
+            with open(checkpoint_path, encoding='utf-8') as checkpoint_file:
+                return json.load(checkpoint_file)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            Logger().get_logger().warning(f"Checkpoint '{checkpoint_path}' is broken and will be ignored")
+            return None
+
+    @staticmethod
+    def __write_checkpoint(checkpoint: dict, checkpoint_path: str):
+        """
+        Private method for writing checkpoint file. File is replaced atomically, so it's never left half-written.
+        :param checkpoint: checkpoint data
+        :type checkpoint: dict
+        :param checkpoint_path: path to checkpoint file
+        :type checkpoint_path: str
+        :return: Nothing
+        """
+        tmp_path: str = checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding='utf-8') as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(tmp_path, checkpoint_path)
+
+    @staticmethod
+    def __list_uploaded_parts(s3_client: "Client", bucket: str, object_name: str, upload_id: str) -> dict[int, dict]:
+        """
+        Private method for getting parts which were already uploaded to S3 for the multipart upload
+        :param s3_client: S3 client
+        :type s3_client: Client
+        :param bucket: bucket where file is uploaded to
+        :type bucket: str
+        :param object_name: key of the object in the bucket
+        :type object_name: str
+        :param upload_id: id of multipart upload
+        :type upload_id: str
+        :return: uploaded parts by their numbers
+        :rtype: dict[int, dict]
+        """
+        parts: dict[int, dict] = {}
+        paginator = s3_client.get_paginator('list_parts')
+        for page in paginator.paginate(Bucket=bucket, Key=object_name, UploadId=upload_id):
+            for part in page.get('Parts', []):
+                parts[part['PartNumber']] = part
+        return parts
+
+    @staticmethod
+    def __resume_or_create_upload(s3_client: "Client", file_name: str, bucket: str, object_name: str,
+                                  file_stat: os.stat_result, part_size: int, codec: str, checkpoint_path: str) -> dict:
+        """
+        Private method for resuming multipart upload from checkpoint. If there is no valid checkpoint for the same
+        file, new multipart upload is created. Uploaded parts are checked later, when file is read, by comparing their
+        ETags with MD5 of the same parts of data.
+        :return: checkpoint of the upload
+        :rtype: dict
+        """
+        checkpoint: Optional[dict] = MultipartUploader.__read_checkpoint(checkpoint_path)
+        if checkpoint is not None and checkpoint['file_size'] == file_stat.st_size \
+                and checkpoint['file_mtime_ns'] == file_stat.st_mtime_ns and checkpoint['part_size'] == part_size \
+                and checkpoint.get('codec', "none") == codec:
+            try:
+                uploaded_parts: dict[int, dict] = MultipartUploader.__list_uploaded_parts(
+                    s3_client, bucket, object_name, checkpoint['upload_id']
+                )
+                checkpoint['parts'] = {str(number): part['ETag'] for number, part in uploaded_parts.items()}
+                Logger().get_logger().info(f"Resuming upload of file '{file_name}' to '{bucket}' as '{object_name}', "
+                                           f"{len(checkpoint['parts'])} parts are already uploaded")
+                return checkpoint
+            except ClientError as e:
+                Logger().get_logger().warning(f"Multipart upload from checkpoint '{checkpoint_path}' can't be resumed "
+                                              f"and will be started again: '{e}'")
+
+        upload_id: str = ConcurrencyController().call(s3_client.create_multipart_upload, Bucket=bucket,
+                                                      Key=object_name)['UploadId']
+        checkpoint = {
+            "file_name": file_name,
+            "file_size": file_stat.st_size,
+            "file_mtime_ns": file_stat.st_mtime_ns,
+            "bucket": bucket,
+            "object_name": object_name,
+            "part_size": part_size,
+            "codec": codec,
+            "upload_id": upload_id,
+            "parts": {}
+        }
+        MultipartUploader.__write_checkpoint(checkpoint, checkpoint_path)
+        return checkpoint
+
+    @staticmethod
+    def __upload_part(s3_client: "Client", checkpoint: dict, checkpoint_path: str, checkpoint_lock: threading.Lock,
+                      part_number: int, body: Union[bytearray, bytes], content_md5: str):
+        """
+        Private method for uploading one part with Content-MD5 header and saving its ETag to checkpoint
+        :return: number of retried requests
+        :rtype: int
+        """
+        response: dict = ConcurrencyController().call(s3_client.upload_part, len(body), Bucket=checkpoint['bucket'],
+                                                      Key=checkpoint['object_name'], UploadId=checkpoint['upload_id'],
+                                                      PartNumber=part_number, Body=body, ContentMD5=content_md5)
+        with checkpoint_lock:
+            checkpoint['parts'][str(part_number)] = response['ETag']
+            MultipartUploader.__write_checkpoint(checkpoint, checkpoint_path)
+        return response['ResponseMetadata'].get('RetryAttempts', 0)
+
+    @staticmethod
+    def upload_file(s3_client: "Client", file_name: str, bucket: str, object_name: str, codec: str = "none",
+                    text_qualifier: Optional[str] = None, compression_level: Optional[int] = None) -> dict:
+        """
+        Method upload_file uploads file to S3 by parts. File is read only once, sequentially by parts, and parts are
+        uploaded in parallel as soon as they are read. Each completed part is saved to checkpoint file. If upload of
+        the same file to the same key was interrupted before, it's resumed.
+        If codec is not 'none', file is compressed while it's read, so compressed copy of the file is never written to
+        disk. If text_qualifier is given, rows, size and SHA-256 of the file are counted from the same buffers.
+        :param s3_client: S3 client
+        :type s3_client: Client
+        :param file_name: path to file that is required to be uploaded
+        :type file_name: str
+        :param bucket: bucket where file is required to be uploaded to
+        :type bucket: str
+        :param object_name: key / object name / path inside the bucket where file is required to be uploaded to
+        :type object_name: str
+        :param codec: compression codec: 'none', 'gzip' or 'zstd'
+        :type codec: str
+        :param text_qualifier: quote character of csv file, if it's given file is profiled while it's uploaded
+        :type text_qualifier: Optional[str]
+        :param compression_level: compression level of pipeline, 'level' from 'compression_config' of main config is
+        used if it isn't given
+        :type compression_level: Optional[int]
+        :return: ETag and Size of uploaded object, number of retried requests (RetryAttempts), and Profile of file if
+        text_qualifier is given
+        :rtype: dict
+        """
+        multipart_config: Mapping = MultipartUploader.get_multipart_config()
+        file_name = os.path.normpath(file_name)
+        file_stat: os.stat_result = os.stat(file_name)
+        part_size: int = MultipartUploader.calculate_part_size(file_stat.st_size, multipart_config['part_size'])
+        checkpoint_path: str = MultipartUploader.__get_checkpoint_path(bucket, object_name)
+        checkpoint: dict = MultipartUploader.__resume_or_create_upload(
+            s3_client, file_name, bucket, object_name, file_stat, part_size, codec, checkpoint_path
+        )
+        checkpoint_lock: threading.Lock = threading.Lock()
+
+        Logger().get_logger().info(f"Uploading file '{file_name}' to '{bucket}' as '{object_name}' by parts of "
+                                   f"{part_size} bytes with compression codec '{codec}'")
+        reader: ProfilingReader = ProfilingReader(file_name, text_qualifier)
+        stream: Union[ProfilingReader, CompressingReader] = reader
+        if codec != "none":
+            if compression_level is None:
+                compression_level = CompressionManager.get_compression_config()['level']
+            stream = CompressingReader(reader, codec, compression_level)
+        with stream:
+            parts_count, object_size, retries = MultipartUploader.__upload_parts_from_stream(
+                s3_client, stream, part_size, checkpoint, checkpoint_path, checkpoint_lock
+            )
+
+        response: dict = ConcurrencyController().call(
+            s3_client.complete_multipart_upload, Bucket=bucket, Key=object_name, UploadId=checkpoint['upload_id'],
+            MultipartUpload={'Parts': [{'PartNumber': number, 'ETag': checkpoint['parts'][str(number)]}
+                                       for number in range(1, parts_count + 1)]}
+        )
+        os.remove(checkpoint_path)
+        uploaded_object: dict = {"ETag": response['ETag'], "Size": object_size,
+                                 "RetryAttempts": retries + response['ResponseMetadata'].get('RetryAttempts', 0)}
+        if text_qualifier is not None:
+            uploaded_object["Profile"] = reader.get_profile()
+        return uploaded_object
+
+    @staticmethod
+    def __upload_parts_from_stream(s3_client: "Client", stream: Union[ProfilingReader, CompressingReader],
+                                   part_size: int, checkpoint: dict, checkpoint_path: str,
+                                   checkpoint_lock: threading.Lock) -> tuple[int, int, int]:
+        """
+        Private method for uploading data from stream by parts. Parts are read one by one and at most
+        'max_concurrency' parts are uploaded (and kept in memory) at the same time. Every part is reserved in memory
+        budget before it's read and released when it's uploaded, so reading blocks while budget is used up.
+        MD5 of every part is counted once and used both as Content-MD5 header and for skipping parts which were uploaded
+        before with the same ETag. As soon as upload of some part fails, no more parts are read and submitted, and the
+        error is raised when parts in flight are finished.
+        :return: number of parts, size of uploaded data and number of retried requests
+        :rtype: tuple[int, int, int]
+        """
+        max_concurrency: int = MultipartUploader.get_multipart_config()['max_concurrency']
+        parts_in_flight: threading.BoundedSemaphore = threading.BoundedSemaphore(max_concurrency)
+        futures: list = []
+        part_failed: threading.Event = threading.Event()
+        part_number: int = 0
+        object_size: int = 0
+        with ContextThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            while not part_failed.is_set():
+                MemoryBudget().acquire(part_size)
+                if part_failed.is_set():
+                    MemoryBudget().release(part_size)
+                    break
+                try:
+                    body: Union[bytearray, bytes] = stream.read(part_size)
+                except BaseException:
+                    MemoryBudget().release(part_size)
+                    raise
+                if len(body) == 0 and part_number > 0:
+                    MemoryBudget().release(part_size)
+                    break
+                part_number += 1
+                object_size += len(body)
+                md5_digest: bytes = hashlib.md5(body).digest()
+                uploaded_etag: Optional[str] = checkpoint['parts'].get(str(part_number))
+                if uploaded_etag is not None and uploaded_etag.strip('"') == md5_digest.hex():
+                    MemoryBudget().release(part_size)
+                    continue
+                parts_in_flight.acquire()
+                if part_failed.is_set():
+                    parts_in_flight.release()
+                    MemoryBudget().release(part_size)
+                    break
+                future = executor.submit(MultipartUploader.__upload_part, s3_client, checkpoint, checkpoint_path,
+                                         checkpoint_lock, part_number, body, base64.b64encode(md5_digest).decode())
+                future.add_done_callback(lambda done_future: MemoryBudget().release(part_size))
+                future.add_done_callback(lambda done_future: parts_in_flight.release())
+                future.add_done_callback(lambda done_future: part_failed.set() if done_future.exception() else None)
+                futures.append(future)
+        retries: int = sum(future.result() for future in futures)
+        return part_number, object_size, retries
+
+    @staticmethod
+    def abort_stale_uploads(s3_client: "Client", bucket: str, prefix: str):
+        """
+        Method abort_stale_uploads aborts incomplete multipart uploads under the prefix which were started earlier than
+        'stale_upload_hours' ago and removes local checkpoints of such age, so unfinished parts aren't kept in S3
+        :param s3_client: S3 client
+        :type s3_client: Client
+        :param bucket: bucket where incomplete uploads are searched
+        :type bucket: str
+        :param prefix: prefix of keys of incomplete uploads
+        :type prefix: str
+        :return: Nothing
+        """
+        stale_upload_hours: float = MultipartUploader.get_multipart_config()['stale_upload_hours']
+        stale_time: datetime = datetime.now(timezone.utc) - timedelta(hours=stale_upload_hours)
+        paginator = s3_client.get_paginator('list_multipart_uploads')
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            for upload in page.get('Uploads', []):
+                if upload['Initiated'] < stale_time:
+                    Logger().get_logger().info(f"Aborting stale multipart upload of '{upload['Key']}' "
+                                               f"started at '{upload['Initiated']}'")
+                    s3_client.abort_multipart_upload(Bucket=bucket, Key=upload['Key'], UploadId=upload['UploadId'])
+
+        checkpoint_dir: str = os.path.normpath(MultipartUploader.get_multipart_config()['checkpoint_dir'])
+        if os.path.isdir(checkpoint_dir):
+            for entry in os.scandir(checkpoint_dir):
+                if entry.is_file() and entry.stat().st_mtime < time.time() - stale_upload_hours * 3600:
+                    os.remove(entry.path)
@@ -0,0 +1,56 @@
+"""
+Module is required for creating and sharing S3 client
+"""
+from typing import TYPE_CHECKING, Mapping, Optional
+from utils.config_manager import ConfigReader
+from utils.logger_manager import Logger
+from utils.singleton_util import Singleton
+import os
+
+if TYPE_CHECKING:
+    from boto3_type_annotations.s3 import Client
+
+
+class S3ClientManager(metaclass=Singleton):
+    """
+    Class S3ClientManager creates the only one S3 client per process. Client is backed by connection pool which size is
+    taken from 'upload_config' in main config (at least 'max_limit' of 'concurrency_config' if adaptive limit is
+    'enabled'), so the same client can be shared between all upload workers.
+    Package 'boto3' is imported only when client is created, so it isn't loaded if client is replaced by stand-in.
+    """
+    __s3_client: Optional["Client"] = None
+
+    def get_s3_client(self) -> "Client":
+        """
+        Method get_s3_client creates S3 client on the first call and returns the same client on the next calls.
+        AWS credentials (AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, REGION_NAME) are taken from environmental variables.
+        :return: S3 client
+        :rtype: Client
+        """
+        if self.__s3_client is None:
+            import boto3
+            from botocore.config import Config
+            main_config: Mapping = ConfigReader.get_main_config()
+            max_pool_connections: int = main_config['upload_config']['max_pool_connections']
+            if main_config['concurrency_config']['enabled'] == "True":
+                max_pool_connections = max(max_pool_connections, main_config['concurrency_config']['max_limit'])
+            Logger().get_logger().info(f"Creating S3 client with connection pool of {max_pool_connections} connections")
+            aws_session = boto3.Session(
+                aws_access_key_id=os.environ.get('AWS_ACCESS_KEY_ID'),
+                aws_secret_access_key=os.environ.get('AWS_SECRET_ACCESS_KEY'),
+                region_name=os.environ.get('REGION_NAME')
+            )
+            self.__s3_client = aws_session.client(
+                "s3",
+                config=Config(max_pool_connections=max_pool_connections)
+            )
+        return self.__s3_client
+
+    def set_s3_client(self, s3_client: "Client"):
+        """
+        Method set_s3_client replaces shared S3 client, e.g. by local S3 stand-in in benchmarks
+        :param s3_client: S3 client
+        :type s3_client: Client
+        :return: Nothing
+        """
+        self.__s3_client = s3_client
@@ -1,10 +1,25 @@
 """
 Module for needs of file uploading to S3
 """
-from boto3_type_annotations.s3 import Client
 from botocore.exceptions import ClientError, ParamValidationError
+from concurrent.futures import Future
 from utils.aws_utils.aws_waiter_manager import WaiterManager
+from utils.aws_utils.concurrency_controller import ConcurrencyController
+from utils.aws_utils.multipart_uploader import MultipartUploader
+from utils.compression_manager import CompressingReader, CompressionManager
+from utils.file_profiler import ProfilingReader
 from utils.logger_manager import Logger
+from utils.memory_budget import MemoryBudget
+from utils.run_report import RunReport
+from utils.worker_pool import WorkerPool
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
+import base64
+import hashlib
+import os
+import time
+
+if TYPE_CHECKING:
+    from boto3_type_annotations.s3 import Client
 
 
 class S3Uploader:
@@ -12,9 +27,15 @@ class S3Uploader:
     Class S3Uploader for needs of file uploading to S3
     """
     @staticmethod
-    def upload_file_to_s3_bucket(s3_client: Client,  file_name: str, bucket: str, object_name: str):
+    def upload_file_to_s3_bucket(s3_client: "Client",  file_name: str, bucket: str, object_name: str,
+                                 codec: str = "none", text_qualifier: Optional[str] = None,
+                                 compression_level: Optional[int] = None) -> dict:
         """
-        Method upload_file_to_s3_bucket is required to start uploading file to s3 bucket
+        Method upload_file_to_s3_bucket is required to start uploading file to s3 bucket.
+        Files which are not smaller than 'threshold' from 'multipart_config' are uploaded by resumable multipart upload,
+        the other files are uploaded by single request. If codec is not 'none', file is compressed while it's uploaded.
+        File is read only once: the same buffers are used for Content-MD5 header, body of request and, if
+        text_qualifier is given, for counting rows, size and SHA-256 of the file.
         :param s3_client: S3 client
         :type s3_client: Client
         :param file_name: path to file that is required to be uploaded
@@ -23,20 +44,104 @@ class S3Uploader:
         :type bucket: str
         :param object_name: key / object name / path inside the bucket where file is required to be uploaded to
         :type object_name: str
-        :return: doesn't return anything
+        :param codec: compression codec: 'none', 'gzip' or 'zstd'
+        :type codec: str
+        :param text_qualifier: quote character of csv file, if it's given file is profiled while it's uploaded
+        :type text_qualifier: Optional[str]
+        :param compression_level: compression level of pipeline, 'level' from 'compression_config' of main config is
+        used if it isn't given
+        :type compression_level: Optional[int]
+        :return: ETag and Size of uploaded object, number of retried requests (RetryAttempts), and Profile of file if
+        text_qualifier is given
+        :rtype: dict
         """
         Logger().get_logger().info(f"Uploading file '{file_name}' to '{bucket}' as '{object_name}'")
         try:
-            s3_client.upload_file(file_name, bucket, object_name)
+            start: float = time.perf_counter()
+            file_size: int = os.path.getsize(file_name)
+            with RunReport().span("s3_uploader.upload_file", bytes=file_size, files=1):
+                if file_size >= MultipartUploader.get_multipart_config()['threshold']:
+                    uploaded_object: dict = MultipartUploader.upload_file(s3_client, file_name, bucket, object_name,
+                                                                          codec, text_qualifier, compression_level)
+                else:
+                    # file is kept in memory as body of the request
+                    with MemoryBudget().reserve(file_size):
+                        uploaded_object = S3Uploader.__put_file(s3_client, file_name, file_size, bucket, object_name,
+                                                                codec, text_qualifier, compression_level)
+            RunReport().add_file("upload", file_name, file_size, time.perf_counter() - start,
+                                 uploaded_object['RetryAttempts'], object_name=object_name,
+                                 uploaded_bytes=uploaded_object['Size'])
+            return uploaded_object
         except ClientError as e:
             Logger().get_logger().error(f"ClientError happened while uploading file: '{e}'")
-            raise ClientError
+            raise
         except ParamValidationError as e:
             Logger().get_logger().error(f"The parameters that were provided are incorrect: '{e}'")
             raise ValueError
 
     @staticmethod
-    def sent_file_to_s3_bucket_and_wait_for_it_being_uploaded(s3_client: Client,  file_name: str,
+    def __put_file(s3_client: "Client", file_name: str, file_size: int, bucket: str, object_name: str, codec: str,
+                   text_qualifier: Optional[str], compression_level: Optional[int]) -> dict:
+        """
+        Private method for uploading file by single request. File is read once to the buffer which is used for
+        Content-MD5 header, body of request and profiling of file.
+        :return: ETag and Size of uploaded object, number of retried requests, and Profile of file if text_qualifier
+        is given
+        :rtype: dict
+        """
+        with ProfilingReader(file_name, text_qualifier) as reader:
+            if codec != "none":
+                if compression_level is None:
+                    compression_level = CompressionManager.get_compression_config()['level']
+                with CompressingReader(reader, codec, compression_level) as stream:
+                    body: Union[bytearray, bytes] = stream.read()
+            else:
+                body = reader.read(file_size)
+        content_md5: str = base64.b64encode(hashlib.md5(body).digest()).decode()
+        response: dict = ConcurrencyController().call(s3_client.put_object, len(body), Bucket=bucket, Key=object_name,
+                                                      Body=body, ContentMD5=content_md5)
+        uploaded_object: dict = {"ETag": response['ETag'], "Size": len(body),
+                                 "RetryAttempts": response['ResponseMetadata'].get('RetryAttempts', 0)}
+        if text_qualifier is not None:
+            uploaded_object["Profile"] = reader.get_profile()
+        return uploaded_object
+
+    @staticmethod
+    def copy_object_in_s3(s3_client: "Client", source_bucket: str, source_object_name: str, bucket: str,
+                          object_name: str) -> dict:
+        """
+        Method copy_object_in_s3 copies object inside S3 without downloading and uploading it again
+        :param s3_client: S3 client
+        :type s3_client: Client
+        :param source_bucket: bucket of the object that is copied
+        :type source_bucket: str
+        :param source_object_name: key of the object that is copied
+        :type source_object_name: str
+        :param bucket: bucket where object is required to be copied to
+        :type bucket: str
+        :param object_name: key where object is required to be copied to
+        :type object_name: str
+        :return: ETag and Size of the copy
+        :rtype: dict
+        """
+        Logger().get_logger().info(f"Copying object '{source_object_name}' from '{source_bucket}' "
+                                   f"to '{bucket}' as '{object_name}'")
+        copy_source: dict = {'Bucket': source_bucket, 'Key': source_object_name}
+        try:
+            with RunReport().span("s3_uploader.copy_object", files=1):
+                # managed copy switches to multipart copy for objects bigger than single CopyObject request allows
+                s3_client.copy(copy_source, bucket, object_name)
+                head: dict = s3_client.head_object(Bucket=bucket, Key=object_name)
+            return {"ETag": head['ETag'], "Size": head['ContentLength']}
+        except ClientError as e:
+            Logger().get_logger().error(f"ClientError happened while copying object: '{e}'")
+            raise
+        except ParamValidationError as e:
+            Logger().get_logger().error(f"The parameters that were provided are incorrect: '{e}'")
+            raise ValueError
+
+    @staticmethod
+    def sent_file_to_s3_bucket_and_wait_for_it_being_uploaded(s3_client: "Client",  file_name: str,
                                                               bucket: str, object_name: str):
         """
         Method sent_file_to_s3_bucket_and_wait_for_it_being_uploaded is required to start uploading file to s3 bucket
@@ -51,15 +156,19 @@ class S3Uploader:
         :type object_name: str
         :return: doesn't return anything
         """
-        S3Uploader.upload_file_to_s3_bucket(s3_client, file_name, bucket, object_name)
-        WaiterManager.wait_for_object_exists_in_S3(s3_client, bucket, object_name)
+        uploaded_object: dict = S3Uploader.upload_file_to_s3_bucket(s3_client, file_name, bucket, object_name)
+        WaiterManager.verify_objects_exist_in_S3(s3_client, bucket, {object_name: uploaded_object})
 
     @staticmethod
-    def sent_multiple_files_to_s3_bucket_and_wait_for_them_being_uploaded(s3_client: Client,  file_name_list: list[str],
-                                                                          bucket: str, object_name_list: list[str]):
+    def upload_multiple_files_to_s3_bucket(s3_client: "Client",  file_name_list: list[str], bucket: str,
+                                           object_name_list: list[str], codec: str = "none",
+                                           text_qualifier: Optional[str] = None,
+                                           on_uploaded: Optional[Callable[[str, dict], Any]] = None,
+                                           compression_level: Optional[int] = None) -> dict[str, dict]:
         """
-        Method sent_multiple_files_to_s3_bucket_and_wait_for_them_being_uploaded is required to start uploading files
-        from the list to s3 bucket and then wait until their upload will be ended
+        Method upload_multiple_files_to_s3_bucket is required to upload files from the list to s3 bucket.
+        If 'max_workers' in 'upload_config' is greater than 1, files are uploaded concurrently by the pool of workers.
+        Failure of one file doesn't stop the others, all failures are logged per file and raised together at the end.
         :param s3_client: S3 client
         :type s3_client: Client
         :param file_name_list: paths to files that are required to be uploaded
@@ -68,7 +177,98 @@ class S3Uploader:
         :type bucket: str
         :param object_name_list: key / object name / path inside the bucket where files are required to be uploaded to
         :type object_name_list: list[str]
-        :return: doesn't return anything
+        :param codec: compression codec: 'none', 'gzip' or 'zstd'
+        :type codec: str
+        :param text_qualifier: quote character of csv files, if it's given files are profiled while they are uploaded
+        :type text_qualifier: Optional[str]
+        :param on_uploaded: function which is called with key and result of upload as soon as each file is uploaded
+        :type on_uploaded: Optional[Callable[[str, dict], Any]]
+        :param compression_level: compression level of pipeline, 'level' from 'compression_config' of main config is
+        used if it isn't given
+        :type compression_level: Optional[int]
+        :return: ETag and Size of uploaded objects (and Profile of files if text_qualifier is given) by their keys
+        :rtype: dict[str, dict]
         """
+        uploaded_objects: dict[str, dict] = {}
+        if WorkerPool().get_max_workers() <= 1:
+            for file_name, object_name in zip(file_name_list, object_name_list):
+                uploaded_objects[object_name] = S3Uploader.__upload_file_and_notify(
+                    s3_client, file_name, bucket, object_name, codec, text_qualifier, on_uploaded, compression_level
+                )
+            return uploaded_objects
+
+        Logger().get_logger().info(f"Uploading {len(file_name_list)} files to '{bucket}' "
+                                   f"with {WorkerPool().get_max_workers()} workers")
+        futures: dict[str, Future] = {}
+        for file_name, object_name in zip(file_name_list, object_name_list):
+            futures[file_name] = WorkerPool().get_executor().submit(
+                S3Uploader.__upload_file_and_notify, s3_client, file_name, bucket, object_name, codec,
+                text_qualifier, on_uploaded, compression_level
+            )
+
+        failed_files: dict[str, BaseException] = {}
         for file_name, object_name in zip(file_name_list, object_name_list):
-            S3Uploader.sent_file_to_s3_bucket_and_wait_for_it_being_uploaded(s3_client, file_name, bucket, object_name)
+            future: Future = futures[file_name]
+            error: BaseException = future.exception()
+            if error is not None:
+                failed_files[file_name] = error
+                Logger().get_logger().error(f"Upload of file '{file_name}' failed with the next error: '{error!r}'")
+            else:
+                uploaded_objects[object_name] = future.result()
+        if len(failed_files) > 0:
+            raise RuntimeError(f"{len(failed_files)} of {len(file_name_list)} files were not uploaded "
+                               f"to '{bucket}': {list(failed_files)}")
+        return uploaded_objects
+
+    @staticmethod
+    def __upload_file_and_notify(s3_client: "Client", file_name: str, bucket: str, object_name: str, codec: str,
+                                 text_qualifier: Optional[str],
+                                 on_uploaded: Optional[Callable[[str, dict], Any]],
+                                 compression_level: Optional[int]) -> dict:
+        """
+        Private method for uploading one file and calling on_uploaded (if it's given) with its result
+        :return: ETag and Size of uploaded object, number of retried requests, and Profile of file if text_qualifier
+        is given
+        :rtype: dict
+        """
+        uploaded_object: dict = S3Uploader.upload_file_to_s3_bucket(s3_client, file_name, bucket, object_name, codec,
+                                                                    text_qualifier, compression_level)
+        if on_uploaded is not None:
+            on_uploaded(object_name, uploaded_object)
+        return uploaded_object
+
+    @staticmethod
+    def sent_multiple_files_to_s3_bucket_and_wait_for_them_being_uploaded(
+            s3_client: "Client", file_name_list: list[str], bucket: str, object_name_list: list[str],
+            codec: str = "none", text_qualifier: Optional[str] = None,
+            on_uploaded: Optional[Callable[[str, dict], Any]] = None,
+            compression_level: Optional[int] = None) -> dict[str, dict]:
+        """
+        Method sent_multiple_files_to_s3_bucket_and_wait_for_them_being_uploaded is required to start uploading files
+        from the list to s3 bucket and then wait until their upload will be ended.
+        All files are uploaded first and then verified together by one listing of their common prefix.
+        :param s3_client: S3 client
+        :type s3_client: Client
+        :param file_name_list: paths to files that are required to be uploaded
+        :type file_name_list: list[str]
+        :param bucket: bucket where files are required to be uploaded to
+        :type bucket: str
+        :param object_name_list: key / object name / path inside the bucket where files are required to be uploaded to
+        :type object_name_list: list[str]
+        :param codec: compression codec: 'none', 'gzip' or 'zstd'
+        :type codec: str
+        :param text_qualifier: quote character of csv files, if it's given files are profiled while they are uploaded
+        :type text_qualifier: Optional[str]
+        :param on_uploaded: function which is called with key and result of upload as soon as each file is uploaded
+        :type on_uploaded: Optional[Callable[[str, dict], Any]]
+        :param compression_level: compression level of pipeline, 'level' from 'compression_config' of main config is
+        used if it isn't given
+        :type compression_level: Optional[int]
+        :return: ETag and Size of uploaded objects (and Profile of files if text_qualifier is given) by their keys
+        :rtype: dict[str, dict]
+        """
+        uploaded_objects: dict[str, dict] = S3Uploader.upload_multiple_files_to_s3_bucket(
+            s3_client, file_name_list, bucket, object_name_list, codec, text_qualifier, on_uploaded, compression_level
+        )
+        WaiterManager.verify_objects_exist_in_S3(s3_client, bucket, uploaded_objects)
+        return uploaded_objects
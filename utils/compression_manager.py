@@ -0,0 +1,138 @@
+"""
+Module for compressing data files while they are read for uploading
+"""
+from typing import BinaryIO, Mapping, Optional
+from utils.config_manager import ConfigReader
+from utils.logger_manager import Logger
+import zlib
+
+
+class CompressingReader:
+    """
+    Class CompressingReader is a file-like object which reads source file by chunks and returns compressed data.
+    Only one chunk of source file and compressed data that hasn't been read yet are kept in memory.
+    Output is deterministic for the same file, codec and level, so interrupted upload can be compared with it by parts.
+    """
+    chunk_size: int = 1024 * 1024
+
+    def __init__(self, source: BinaryIO, codec: str, level: int):
+        """
+        :param source: source file opened in binary mode
+        :type source: BinaryIO
+        :param codec: 'gzip' or 'zstd'
+        :type codec: str
+        :param level: compression level
+        :type level: int
+        """
+        self.__source: BinaryIO = source
+        self.__compressor = CompressionManager.create_compressor(codec, level)
+        self.__buffer: bytearray = bytearray()
+        self.__eof: bool = False
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Method read returns next part of compressed data
+        :param size: max number of bytes to return, all remaining data is returned if it's negative
+        :type size: int
+        :return: compressed data, empty bytes at the end of data
+        :rtype: bytes
+        """
+        while not self.__eof and (size < 0 or len(self.__buffer) < size):
+            chunk: bytes = self.__source.read(self.chunk_size)
+            if chunk:
+                self.__buffer += self.__compressor.compress(chunk)
+            else:
+                self.__buffer += self.__compressor.flush()
+                self.__eof = True
+        if size < 0 or size >= len(self.__buffer):
+            data: bytes = bytes(self.__buffer)
+            self.__buffer.clear()
+        else:
+            data = bytes(self.__buffer[:size])
+            del self.__buffer[:size]
+        return data
+
+    def readable(self) -> bool:
+        return True
+
+    def close(self):
+        """
+        Method close closes source file
+        :return: Nothing
+        """
+        self.__source.close()
+
+    def __enter__(self) -> "CompressingReader":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class CompressionManager:
+    """
+    Class CompressionManager for managing compression of data files that are uploaded to S3
+    """
+    __extensions: dict[str, str] = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+    @staticmethod
+    def get_compression_config(configs: Optional[Mapping] = None) -> Mapping:
+        """
+        Method get_compression_config returns 'compression_config' of pipeline or from main config if configs of
+        pipeline aren't given
+        :param configs: configs of pipeline
+        :type configs: Optional[Mapping]
+        :return: compression configs as read-only dict
+        :rtype: Mapping
+        """
+        return (configs or ConfigReader.get_main_config())['compression_config']
+
+    @staticmethod
+    def get_file_extension(codec: str) -> str:
+        """
+        Method get_file_extension returns extension which is added to names of files compressed by codec
+        :param codec: 'none', 'gzip' or 'zstd'
+        :type codec: str
+        :return: file extension with '.' prefix or empty string if codec is 'none'
+        :rtype: str
+        """
+        if codec not in CompressionManager.__extensions:
+            Logger().get_logger().error(f"Compression codec '{codec}' isn't supported")
+            raise ValueError
+        return CompressionManager.__extensions[codec]
+
+    @staticmethod
+    def get_metadata_compression(codec: str) -> str:
+        """
+        Method get_metadata_compression returns name of compression for ingest metadata, it's the same as value of
+        COMPRESSION option of Snowflake file format
+        :param codec: 'none', 'gzip' or 'zstd'
+        :type codec: str
+        :return: 'NONE', 'GZIP' or 'ZSTD'
+        :rtype: str
+        """
+        CompressionManager.get_file_extension(codec)
+        return codec.upper()
+
+    @staticmethod
+    def create_compressor(codec: str, level: int):
+        """
+        Method create_compressor creates streaming compressor with compress() and flush() methods
+        :param codec: 'gzip' or 'zstd'
+        :type codec: str
+        :param level: compression level
+        :type level: int
+        :return: compressor object
+        """
+        if codec == "gzip":
+            return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        if codec == "zstd":
+            try:
+                import zstandard
+            except ImportError:
+                Logger().get_logger().error("Package 'zstandard' is required for 'zstd' compression")
+                raise ImportError
+            return zstandard.ZstdCompressor(level=level).compressobj()
+        Logger().get_logger().error(f"Compression codec '{codec}' isn't supported")
+        raise ValueError
+
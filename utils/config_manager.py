@@ -1,28 +1,96 @@
 """
 Module for providing configs to application
 """
+from types import MappingProxyType
+from typing import Any, Mapping
 from utils.file_manager_utils.file_reader import FileReader
+import os
+import threading
 
 
 class ConfigReader(FileReader):
     """
-    ConfigManager class for getting configs for different applications modules
+    ConfigManager class for getting configs for different applications modules.
+    Configs are parsed once per process and are parsed again only when modification time of config file changes.
+    Configs are returned as read-only views, so changes made by the caller can't corrupt cached configs.
     """
     __main_config_path: str = "config_data/main_config.json"
     __logger_config_path: str = "config_data/logger_config.json"
+    __cache: dict[str, tuple[int, Mapping]] = {}
+    __cache_lock: threading.Lock = threading.Lock()
 
     @staticmethod
-    def get_main_config() -> dict:
+    def get_main_config() -> Mapping:
         """
         get_main_config - method for getting main configs
-        :return: main configs as dict
+        :return: main configs as read-only dict
         """
-        return ConfigReader.get_data_from_json(ConfigReader.__main_config_path)
+        return ConfigReader.get_cached_data_from_json(ConfigReader.__main_config_path)
 
     @staticmethod
-    def get_logger_config() -> dict:
+    def get_pipeline_configs() -> list[Mapping]:
+        """
+        get_pipeline_configs - method for getting configs of every pipeline from 'pipelines' of main configs.
+        Config of pipeline is main configs where keys of pipeline replace top-level keys, and keys of sections (e.g.
+        'compression_config') replace keys of the same sections. If there are no 'pipelines', main configs are the
+        only pipeline.
+        :return: configs of pipelines as read-only dicts
+        :rtype: list[Mapping]
+        """
+        main_config: Mapping = ConfigReader.get_main_config()
+        pipelines: tuple = main_config.get("pipelines") or ()
+        if len(pipelines) == 0:
+            return [main_config]
+        pipeline_configs: list[Mapping] = []
+        for pipeline in pipelines:
+            pipeline_config: dict = {key: value for key, value in main_config.items() if key != "pipelines"}
+            for key, value in pipeline.items():
+                if isinstance(value, Mapping) and isinstance(pipeline_config.get(key), Mapping):
+                    value = MappingProxyType({**pipeline_config[key], **value})
+                pipeline_config[key] = value
+            pipeline_configs.append(MappingProxyType(pipeline_config))
+        return pipeline_configs
+
+    @staticmethod
+    def get_logger_config() -> Mapping:
         """
         get_logger_config - method for getting logger configs
-        :return: logger configs as dict
+        :return: logger configs as read-only dict
+        """
+        return ConfigReader.get_cached_data_from_json(ConfigReader.__logger_config_path)
+
+    @staticmethod
+    def get_cached_data_from_json(path: str) -> Mapping:
+        """
+        get_cached_data_from_json method gets data from json file and caches it until modification time of the file
+        changes
+        :param path: input file path
+        :type path: str
+        :return: data from json file as read-only dict
+        :rtype: Mapping
+        """
+        modification_time: int = os.stat(path).st_mtime_ns
+        with ConfigReader.__cache_lock:
+            cached_config: tuple[int, Mapping] = ConfigReader.__cache.get(path)
+        if cached_config is not None and cached_config[0] == modification_time:
+            return cached_config[1]
+
+        config: Mapping = ConfigReader.freeze(ConfigReader.get_data_from_json(path))
+        with ConfigReader.__cache_lock:
+            ConfigReader.__cache[path] = (modification_time, config)
+        return config
+
+    @staticmethod
+    def freeze(data: Any) -> Any:
+        """
+        freeze method converts data to read-only view: dicts are converted to read-only dicts and lists to tuples
+        :param data: data from json file
+        :type data: Any
+        :return: read-only data
+        :rtype: Any
         """
-        return ConfigReader.get_data_from_json(ConfigReader.__logger_config_path)
+        if isinstance(data, dict):
+            return MappingProxyType({key: ConfigReader.freeze(value) for key, value in data.items()})
+        if isinstance(data, list):
+            return tuple(ConfigReader.freeze(value) for value in data)
+        return data
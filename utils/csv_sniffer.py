@@ -0,0 +1,259 @@
+"""
+Module for sniffing dialect and schema of csv files by samples
+"""
+from typing import Mapping, Optional
+from utils.config_manager import ConfigReader
+from utils.logger_manager import Logger
+from utils.worker_pool import WorkerPool
+import codecs
+import csv
+import io
+import os
+import random
+import re
+
+
+class CsvSniffer:
+    """
+    Class CsvSniffer infers encoding, delimiter, quote character, header and approximate column types of csv file from
+    a few samples instead of parsing the whole file: 'sample_bytes' from the head of file and the same number of bytes
+    from 'random_samples' random offsets. Random samples are cut to whole lines, and rows which don't have the same
+    number of fields as the header (e.g. rows cut in the middle of quoted line break) are ignored. So cost of sniffing
+    doesn't depend on file size.
+    Offsets are taken from random generator seeded by name and size of file, so the same file gets the same samples.
+    Settings are taken from 'sniff_config' of pipeline or from main config.
+    """
+    type_patterns: dict[str, re.Pattern] = {
+        "boolean": re.compile(r"(?i)true|false"),
+        "integer": re.compile(r"[+-]?\d+"),
+        "float": re.compile(r"[+-]?(\d+\.\d*|\.\d+|\d+)([eE][+-]?\d+)?|(?i:nan|[+-]?inf)"),
+        "date": re.compile(r"\d{4}-\d{2}-\d{2}"),
+        "timestamp": re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?")
+    }
+
+    @staticmethod
+    def get_sniff_config(configs: Optional[Mapping] = None) -> Mapping:
+        """
+        Method get_sniff_config returns 'sniff_config' of pipeline or from main config if configs of pipeline aren't
+        given
+        :param configs: configs of pipeline
+        :type configs: Optional[Mapping]
+        :return: sniffing configs as read-only dict
+        :rtype: Mapping
+        """
+        return (configs or ConfigReader.get_main_config())['sniff_config']
+
+    @staticmethod
+    def read_samples(path: str, sample_bytes: int, random_samples: int) -> list[bytes]:
+        """
+        Method read_samples reads head of file and samples from random offsets of file. The whole file is returned as
+        one sample if it isn't bigger than all samples together.
+        :param path: path to file
+        :type path: str
+        :param sample_bytes: size of every sample
+        :type sample_bytes: int
+        :param random_samples: number of samples from random offsets
+        :type random_samples: int
+        :return: head of file and random samples cut to whole lines
+        :rtype: list[bytes]
+        """
+        path = os.path.normpath(path)
+        size: int = os.path.getsize(path)
+        with open(path, "rb") as csv_file:
+            if size <= sample_bytes * (random_samples + 1):
+                return [csv_file.read()]
+            head: bytes = csv_file.read(sample_bytes)
+            samples: list[bytes] = [head[:head.rfind(b"\n") + 1] or head]
+            generator: random.Random = random.Random(f"{os.path.basename(path)}:{size}")
+            for offset in sorted(generator.randrange(sample_bytes, size - sample_bytes)
+                                 for _ in range(random_samples)):
+                csv_file.seek(offset)
+                sample: bytes = csv_file.read(sample_bytes)
+                # line break byte never is a part of multibyte character, so samples are cut by it
+                samples.append(sample[sample.find(b"\n") + 1:sample.rfind(b"\n") + 1])
+        return samples
+
+    @staticmethod
+    def detect_encoding(samples: list[bytes], encodings: list[str]) -> Optional[str]:
+        """
+        Method detect_encoding finds the first encoding from the list which decodes all samples
+        :param samples: samples of file
+        :type samples: list[bytes]
+        :param encodings: names of encodings in order of preference
+        :type encodings: list[str]
+        :return: name of encoding ('utf-8-sig' if file starts with UTF-8 BOM) or None if no encoding fits
+        :rtype: Optional[str]
+        """
+        has_bom: bool = samples[0].startswith(codecs.BOM_UTF8)
+        for encoding in ["utf-8"] if has_bom else encodings:
+            try:
+                for sample in samples:
+                    sample.decode(encoding)
+            except (UnicodeDecodeError, LookupError):
+                continue
+            return "utf-8-sig" if has_bom else encoding
+        return None
+
+    @staticmethod
+    def infer_type(values: list[str]) -> str:
+        """
+        Method infer_type finds the narrowest type of values. Empty values are skipped. Integers and floats give
+        'float', dates and timestamps give 'timestamp', any other combination gives 'string'.
+        :param values: values of column
+        :type values: list[str]
+        :return: 'boolean', 'integer', 'float', 'date', 'timestamp', 'string' or 'null' if all values are empty
+        :rtype: str
+        """
+        found_types: set[str] = set()
+        for value in set(values):
+            value = value.strip()
+            # most values have the type of the previous ones, so it's checked first
+            if value == "" or any(CsvSniffer.type_patterns[found_type].fullmatch(value) for found_type in found_types):
+                continue
+            found_type: str = next((type_name for type_name, pattern in CsvSniffer.type_patterns.items()
+                                    if pattern.fullmatch(value)), "string")
+            found_types.add(found_type)
+            if found_type == "string":
+                break
+        return CsvSniffer.merge_types(found_types)
+
+    @staticmethod
+    def merge_types(types: set[str]) -> str:
+        """
+        Method merge_types finds type which fits values of all the given types, 'null' (no values) fits any type
+        :param types: types of values
+        :type types: set[str]
+        :return: common type
+        :rtype: str
+        """
+        types = types - {"null"}
+        if len(types) == 0:
+            return "null"
+        if len(types) == 1:
+            return next(iter(types))
+        if types == {"integer", "float"}:
+            return "float"
+        if types == {"date", "timestamp"}:
+            return "timestamp"
+        return "string"
+
+    @staticmethod
+    def sniff_file(path: str, delimiter: str = ",", text_qualifier: str = '"',
+                   sniff_config: Optional[Mapping] = None) -> dict:
+        """
+        Method sniff_file infers dialect and schema of csv file by samples and compares dialect with the expected one
+        :param path: path to csv file
+        :type path: str
+        :param delimiter: expected delimiter
+        :type delimiter: str
+        :param text_qualifier: expected quote character
+        :type text_qualifier: str
+        :param sniff_config: 'sniff_config' of pipeline, 'sniff_config' from main config is used if it isn't given
+        :type sniff_config: Optional[Mapping]
+        :return: 'encoding', 'delimiter', 'text_qualifier', 'has_header', 'columns' with 'name' and 'type' of every
+        column, 'sampled_bytes' and 'mismatches' with reasons why file differs from the expected dialect
+        :rtype: dict
+        """
+        sniff_config = sniff_config or CsvSniffer.get_sniff_config()
+        samples: list[bytes] = CsvSniffer.read_samples(path, sniff_config['sample_bytes'],
+                                                       sniff_config['random_samples'])
+        sniff_result: dict = {"encoding": None, "delimiter": delimiter, "text_qualifier": text_qualifier,
+                              "has_header": True, "columns": [], "sampled_bytes": sum(len(s) for s in samples),
+                              "mismatches": []}
+        encoding: Optional[str] = CsvSniffer.detect_encoding(samples, list(sniff_config['encodings']))
+        sniff_result["encoding"] = encoding
+        if encoding is None:
+            sniff_result["mismatches"].append(f"encoding isn't one of {list(sniff_config['encodings'])}")
+            return sniff_result
+        if encoding.replace("-sig", "") != sniff_config['encoding']:
+            sniff_result["mismatches"].append(f"encoding '{encoding}' isn't '{sniff_config['encoding']}'")
+        texts: list[str] = [samples[0].decode(encoding)] + [sample.decode(encoding.replace("-sig", ""))
+                                                            for sample in samples[1:]]
+
+        sniffer: csv.Sniffer = csv.Sniffer()
+        try:
+            dialect: type[csv.Dialect] = sniffer.sniff(texts[0], delimiters=sniff_config['delimiters'])
+            sniff_result["delimiter"] = dialect.delimiter
+            # quote character can't be sniffed if values aren't quoted, then the expected one is kept
+            if dialect.quotechar != text_qualifier and dialect.quotechar in texts[0]:
+                sniff_result["text_qualifier"] = dialect.quotechar
+            sniff_result["has_header"] = sniffer.has_header(texts[0])
+        except csv.Error:
+            Logger().get_logger().warning(f"Dialect of csv file '{path}' can't be sniffed, the expected one is used")
+        if sniff_result["delimiter"] != delimiter:
+            sniff_result["mismatches"].append(f"delimiter '{sniff_result['delimiter']}' isn't '{delimiter}'")
+        if sniff_result["text_qualifier"] != text_qualifier:
+            sniff_result["mismatches"].append(f"text qualifier '{sniff_result['text_qualifier']}' isn't "
+                                              f"'{text_qualifier}'")
+
+        rows: list[list[str]] = []
+        for text in texts:
+            try:
+                rows.extend(csv.reader(io.StringIO(text, newline=""), delimiter=sniff_result["delimiter"],
+                                       quotechar=sniff_result["text_qualifier"]))
+            except csv.Error:
+                # random sample started inside quoted value
+                continue
+        if len(rows) == 0:
+            return sniff_result
+        header: list[str] = rows[0] if sniff_result["has_header"] else [f"column_{i + 1}"
+                                                                        for i in range(len(rows[0]))]
+        data_rows: list[list[str]] = [row for row in rows[1 if sniff_result["has_header"] else 0:]
+                                      if len(row) == len(header)]
+        sniff_result["columns"] = [{"name": name, "type": CsvSniffer.infer_type([row[i] for row in data_rows])}
+                                   for i, name in enumerate(header)]
+        return sniff_result
+
+    @staticmethod
+    def sniff_multiple_files(path_list: list[str], delimiter: str = ",", text_qualifier: str = '"',
+                             sniff_config: Optional[Mapping] = None) -> list[dict]:
+        """
+        Method sniff_multiple_files sniffs files from the list by pool of workers. Files which columns differ from the
+        columns of the most of files get mismatch too, because all files of the run are loaded as one table.
+        :param path_list: paths to csv files
+        :type path_list: list[str]
+        :param delimiter: expected delimiter
+        :type delimiter: str
+        :param text_qualifier: expected quote character
+        :type text_qualifier: str
+        :param sniff_config: 'sniff_config' of pipeline, 'sniff_config' from main config is used if it isn't given
+        :type sniff_config: Optional[Mapping]
+        :return: results of sniffing in the same order as paths
+        :rtype: list[dict]
+        """
+        sniff_config = sniff_config or CsvSniffer.get_sniff_config()
+        Logger().get_logger().info(f"Sniffing {len(path_list)} files")
+        sniff_results: list[dict] = list(WorkerPool().get_executor().map(
+            CsvSniffer.sniff_file, path_list, [delimiter] * len(path_list), [text_qualifier] * len(path_list),
+            [sniff_config] * len(path_list)
+        ))
+        column_names: list[tuple[str, ...]] = [tuple(column["name"] for column in sniff_result["columns"])
+                                               for sniff_result in sniff_results if len(sniff_result["columns"]) > 0]
+        if len(column_names) > 0:
+            expected_names: tuple[str, ...] = max(set(column_names), key=column_names.count)
+            for sniff_result in sniff_results:
+                names: tuple[str, ...] = tuple(column["name"] for column in sniff_result["columns"])
+                if len(names) > 0 and names != expected_names:
+                    sniff_result["mismatches"].append(f"columns {list(names)} aren't {list(expected_names)}")
+        return sniff_results
+
+    @staticmethod
+    def summarize(sniff_results: list[dict]) -> dict:
+        """
+        Method summarize merges results of sniffing of files of the run into one dialect and schema
+        :param sniff_results: results of sniffing of files with the same columns
+        :type sniff_results: list[dict]
+        :return: 'encoding', 'has_header' and 'columns' with types which fit values of all files
+        :rtype: dict
+        """
+        columns: list[dict] = next((sniff_result["columns"] for sniff_result in sniff_results
+                                    if len(sniff_result["columns"]) > 0), [])
+        return {
+            "encoding": next((sniff_result["encoding"] for sniff_result in sniff_results), None),
+            "has_header": all(sniff_result["has_header"] for sniff_result in sniff_results),
+            "columns": [{"name": column["name"],
+                         "type": CsvSniffer.merge_types({sniff_result["columns"][i]["type"]
+                                                         for sniff_result in sniff_results
+                                                         if len(sniff_result["columns"]) > i})}
+                        for i, column in enumerate(columns)]
+        }
@@ -2,33 +2,153 @@
 Module for reading datasets
 """
 import os.path
+import re
 from utils.logger_manager import Logger
-import pandas as pd
-from typing import Optional
+from typing import TYPE_CHECKING, Iterator, Optional, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class CsvRowCounter:
+    """
+    Class CsvRowCounter counts rows of csv file from the byte buffers which are given one by one.
+    Counter keeps only the state between buffers, so memory doesn't depend on file size.
+    Rows are counted the same way as pandas does: line breaks inside quoted values are not counted,
+    blank lines are skipped and the header row is not counted.
+    """
+    __blank_line_pattern = re.compile(rb"(?<=\n)\r?\n")
+
+    def __init__(self, text_qualifier: str = '"'):
+        """
+        :param text_qualifier: quote character of csv file
+        :type text_qualifier: str
+        """
+        self.__quote: bytes = text_qualifier.encode()
+        self.__in_quotes: bool = False
+        self.__line_is_empty: bool = True
+        self.__lines: int = 0
+
+    def update(self, buffer: Union[bytes, bytearray]):
+        """
+        Method update counts rows in the next buffer of file. Buffer is scanned in place by positions of quotes,
+        so it isn't copied and the same buffer can be given to other consumers (e.g. hasher and upload request).
+        :param buffer: next part of file
+        :type buffer: Union[bytes, bytearray]
+        :return: Nothing
+        """
+        start: int = 0
+        while True:
+            quote_position: int = buffer.find(self.__quote, start)
+            segment_end: int = len(buffer) if quote_position < 0 else quote_position
+            if not self.__in_quotes and segment_end > start:
+                self.__count_unquoted(buffer, start, segment_end)
+            if quote_position < 0:
+                return
+            self.__in_quotes = not self.__in_quotes
+            self.__line_is_empty = False
+            start = quote_position + len(self.__quote)
+
+    def __count_unquoted(self, buffer: Union[bytes, bytearray], start: int, end: int):
+        """
+        Private method for counting non-blank lines in the part of buffer which is placed outside quotes
+        :param buffer: part of file
+        :type buffer: Union[bytes, bytearray]
+        :param start: position where part of buffer outside quotes starts
+        :type start: int
+        :param end: position where part of buffer outside quotes ends
+        :type end: int
+        :return: Nothing
+        """
+        line_breaks: int = buffer.count(b"\n", start, end)
+        if line_breaks == 0:
+            if buffer.count(b"\r", start, end) != end - start:
+                self.__line_is_empty = False
+            return
+        blank_lines: int = len(self.__blank_line_pattern.findall(buffer, start, end))
+        if self.__line_is_empty and buffer.startswith((b"\n", b"\r\n"), start, end):
+            blank_lines += 1
+        self.__lines += line_breaks - blank_lines
+        self.__line_is_empty = buffer.endswith((b"\n", b"\n\r"), start, end)
+
+    def get_row_count(self) -> int:
+        """
+        Method get_row_count returns number of rows that were counted in all given buffers
+        :return: number of rows without header
+        :rtype: int
+        """
+        lines: int = self.__lines if self.__line_is_empty else self.__lines + 1
+        return max(lines - 1, 0)
 
 
 class DatasetReader:
     """
-    Class DatasetReader is required to read datasets
+    Class DatasetReader is required to read datasets. Package 'pandas' is imported only when dataset is read, so stages
+    which only count rows don't load it.
     """
+    row_count_buffer_size: int = 1024 * 1024
 
     @staticmethod
-    def read_dataset_from_csv(path: str, chunksize: Optional[int] = None) -> pd.DataFrame:
+    def read_dataset_from_csv(path: str, chunksize: Optional[int] = None, delimiter: str = ",",
+                              text_qualifier: str = '"', as_strings: bool = False) -> "pd.DataFrame":
         """
         Method reads datset from csv with required chunk size
         :param path: path where csv file is stored
         :type path: str
         :param chunksize: size of chunks of file while reading
         :type chunksize: Optional[int]
+        :param delimiter: delimiter of csv file
+        :type delimiter: str
+        :param text_qualifier: quote character of csv file
+        :type text_qualifier: str
+        :param as_strings: if True, values are read as they are written in file, without inferring of types
+        :type as_strings: bool
         :return:
         """
-        Logger().get_logger().info(f"Reading dataset from csv file '{path}'")
-
-        df_chunk: Optional[pd.TextFileReader, pd.DataFrame] = pd.read_csv(os.path.normpath(path), chunksize=chunksize)
+        import pandas as pd
         if chunksize is None:
-            return df_chunk
+            Logger().get_logger().info(f"Reading dataset from csv file '{path}'")
+            return pd.read_csv(os.path.normpath(path), sep=delimiter, quotechar=text_qualifier,
+                               **DatasetReader.__get_type_options(as_strings))
         else:
             df_list: list = []
-            for chunk in df_chunk:
+            for chunk in DatasetReader.iterate_dataset_from_csv(path, chunksize, delimiter, text_qualifier,
+                                                                as_strings):
                 df_list.append(chunk)
             return pd.concat(df_list)
+
+    @staticmethod
+    def iterate_dataset_from_csv(path: str, chunksize: int, delimiter: str = ",", text_qualifier: str = '"',
+                                 as_strings: bool = False) -> Iterator["pd.DataFrame"]:
+        """
+        Method iterate_dataset_from_csv reads dataset from csv by chunks and returns them one by one, so only one chunk
+        is kept in memory at the same time
+        :param path: path where csv file is stored
+        :type path: str
+        :param chunksize: number of rows in chunk
+        :type chunksize: int
+        :param delimiter: delimiter of csv file
+        :type delimiter: str
+        :param text_qualifier: quote character of csv file
+        :type text_qualifier: str
+        :param as_strings: if True, values are read as they are written in file, without inferring of types
+        :type as_strings: bool
+        :return: iterator of chunks of dataset
+        :rtype: Iterator[pd.DataFrame]
+        """
+        import pandas as pd
+        Logger().get_logger().info(f"Reading dataset from csv file '{path}' by chunks of {chunksize} rows")
+        with pd.read_csv(os.path.normpath(path), chunksize=chunksize, sep=delimiter, quotechar=text_qualifier,
+                         **DatasetReader.__get_type_options(as_strings)) as df_chunk:
+            for chunk in df_chunk:
+                yield chunk
+
+    @staticmethod
+    def __get_type_options(as_strings: bool) -> dict:
+        """
+        Private method for options of pandas.read_csv which keep values as strings, e.g. leading zeros of codes and
+        digits of long numbers aren't lost and empty values and 'NA' aren't turned into NaN
+        :return: keyword arguments of pandas.read_csv
+        :rtype: dict
+        """
+        return {"dtype": str, "keep_default_na": False} if as_strings else {}
@@ -0,0 +1,138 @@
+"""
+Module for watching directory with raw data files
+"""
+from typing import Mapping, Optional
+from utils.logger_manager import Logger, LogSummary
+import fnmatch
+import os
+import re
+import time
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None
+
+
+class DirectoryWatcher:
+    """
+    Class DirectoryWatcher watches directory and groups files which have been completely written there into batches.
+    File is complete when marker file (file name + 'marker_suffix') exists or, if marker suffix is empty, when its size
+    and modification time haven't changed for 'stable_seconds'. Batch is ready when it has 'batch_max_files' files or
+    'batch_max_bytes' bytes, or when 'batch_window_seconds' have passed since the first file of the batch was complete.
+    Directory events are received by inotify if 'inotify_simple' package is installed, otherwise directory is polled.
+    Files are stat'ed once per scan, and stat results of complete files are returned with the batch.
+    """
+    def __init__(self, directory: str, file_type: str, watch_config: Mapping, pattern: str = ""):
+        """
+        :param directory: path to directory that is watched
+        :type directory: str
+        :param file_type: extension of required files
+        :type file_type: str
+        :param watch_config: 'watch_config' from main config
+        :type watch_config: Mapping
+        :param pattern: glob pattern of file names, '*.<file_type>' if it's empty
+        :type pattern: str
+        """
+        self.__directory: str = os.path.normpath(directory)
+        self.__name_matches = re.compile(fnmatch.translate(pattern or "*." + file_type)).match
+        self.__config: Mapping = watch_config
+        self.__pending_files: dict[str, tuple[int, int, float]] = {}
+        self.__complete_files: dict[str, os.stat_result] = {}
+        self.__batch_start_time: Optional[float] = None
+        self.__inotify = None
+        if not os.path.isdir(self.__directory):
+            Logger().get_logger().error(f"Directory '{self.__directory}' doesn't exist")
+            raise NotADirectoryError
+        if INotify is not None:
+            self.__inotify = INotify()
+            self.__inotify.add_watch(self.__directory, flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE)
+            Logger().get_logger().info(f"Watching directory '{self.__directory}' with inotify")
+        else:
+            Logger().get_logger().info(f"Watching directory '{self.__directory}' by polling every "
+                                       f"{self.__config['poll_interval_seconds']} seconds")
+
+    def wait_for_batch(self) -> dict[str, os.stat_result]:
+        """
+        Method wait_for_batch blocks until the next batch of complete files is ready
+        :return: stat results of files of the batch by their names
+        :rtype: dict[str, os.stat_result]
+        """
+        while True:
+            self.__scan_directory()
+            if self.__is_batch_ready():
+                batch: dict[str, os.stat_result] = dict(sorted(self.__complete_files.items()))
+                Logger().get_logger().info("Batch of %s files is ready: '%s'", len(batch), LogSummary(list(batch)))
+                self.__remove_markers(list(batch))
+                self.__complete_files = {}
+                self.__batch_start_time = None
+                return batch
+            self.__wait_for_changes()
+
+    def __scan_directory(self):
+        """
+        Private method for scanning directory and updating state of pending and complete files
+        :return: Nothing
+        """
+        now: float = time.monotonic()
+        marker_suffix: str = self.__config['marker_suffix']
+        entries: dict[str, os.DirEntry] = {entry.name: entry for entry in os.scandir(self.__directory)}
+        for name, entry in entries.items():
+            if not self.__name_matches(name) or name in self.__complete_files or not entry.is_file():
+                continue
+            entry_stat: os.stat_result = entry.stat()
+            if marker_suffix != "":
+                is_complete: bool = name + marker_suffix in entries
+            else:
+                previous_state: Optional[tuple[int, int, float]] = self.__pending_files.get(name)
+                if previous_state is None or previous_state[:2] != (entry_stat.st_size, entry_stat.st_mtime_ns):
+                    self.__pending_files[name] = (entry_stat.st_size, entry_stat.st_mtime_ns, now)
+                    continue
+                is_complete = now - previous_state[2] >= self.__config['stable_seconds']
+            if is_complete:
+                self.__pending_files.pop(name, None)
+                self.__complete_files[name] = entry_stat
+                if self.__batch_start_time is None:
+                    self.__batch_start_time = now
+        for name in list(self.__pending_files):
+            if name not in entries:
+                del self.__pending_files[name]
+
+    def __is_batch_ready(self) -> bool:
+        """
+        Private method for checking that batch of complete files is ready
+        :return: True if batch is ready
+        :rtype: bool
+        """
+        if len(self.__complete_files) == 0:
+            return False
+        batch_bytes: int = sum(file_stat.st_size for file_stat in self.__complete_files.values())
+        return len(self.__complete_files) >= self.__config['batch_max_files'] \
+            or batch_bytes >= self.__config['batch_max_bytes'] \
+            or time.monotonic() - self.__batch_start_time >= self.__config['batch_window_seconds']
+
+    def __remove_markers(self, file_names: list[str]):
+        """
+        Private method for removing marker files of the files which were taken to the batch
+        :param file_names: names of files of the batch
+        :type file_names: list[str]
+        :return: Nothing
+        """
+        if self.__config['marker_suffix'] == "":
+            return
+        for name in file_names:
+            try:
+                os.remove(os.path.join(self.__directory, name + self.__config['marker_suffix']))
+            except FileNotFoundError:
+                pass
+
+    def __wait_for_changes(self):
+        """
+        Private method for waiting until something changes in directory or poll interval passes
+        :return: Nothing
+        """
+        timeout: float = self.__config['poll_interval_seconds']
+        if self.__inotify is not None:
+            self.__inotify.read(timeout=int(timeout * 1000))
+        else:
+            time.sleep(timeout)
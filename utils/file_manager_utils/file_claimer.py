@@ -0,0 +1,311 @@
+"""
+Module for claiming raw data files by one of several workers which share 'raw_data_dir'
+"""
+from typing import Iterable, Mapping, Optional
+from types import MappingProxyType
+from utils.file_manager_utils.file_manager import FileManager
+from utils.logger_manager import Logger, LogSummary
+from utils.run_report import RunReport
+import json
+import os
+import random
+import re
+import socket
+import threading
+import time
+
+
+class FileClaimer:
+    """
+    Class FileClaimer lets several workers (processes on one or several hosts) ingest files of the same 'raw_data_dir'
+    without ingesting any file twice. Worker claims file by renaming it from 'raw_data_dir' into its own claim
+    directory '<raw_data_dir>/.claims/<worker_id>/'. Rename is atomic, so only one worker gets the file and the others
+    get FileNotFoundError and skip it. Claimed files are ingested with the claim directory as 'raw_data_dir' and
+    'journal_dir', so everything which is needed to resume the batch stays in the claim directory.
+    Every claim directory has lease file which is kept fresh by the owner every 'lease_seconds' / 3. Claim directory
+    of worker which crashed isn't renewed, and when its lease is older than 'lease_seconds' another worker takes it
+    over by atomic rename of the lease file, resumes or ingests its files and removes it.
+    Settings are taken from 'claim_config' of pipeline. Worker id is 'worker_id' or '<host name>-<process id>' if
+    it's empty, so two processes never share claim directory. Clocks of hosts must be synchronized with the file
+    server, because age of lease is taken from modification time of lease file.
+    """
+    claims_folder_name: str = ".claims"
+    lease_file_name: str = ".lease"
+
+    def __init__(self, configs: Mapping):
+        """
+        :param configs: configs of pipeline with 'claim_config' and 'raw_data_dir'
+        :type configs: Mapping
+        """
+        claim_config: Mapping = configs["claim_config"]
+        self.__worker_id: str = FileClaimer.get_worker_id(claim_config)
+        self.__lease_seconds: float = claim_config["lease_seconds"]
+        self.__raw_data_dir: str = os.path.normpath(configs["raw_data_dir"])
+        self.__claims_dir: str = os.path.join(self.__raw_data_dir, FileClaimer.claims_folder_name)
+        self.__own_claim_dir: str = os.path.join(self.__claims_dir, self.__worker_id)
+        self.__held_claim_dirs: set[str] = set()
+        self.__lock: threading.Lock = threading.Lock()
+        self.__stopped: threading.Event = threading.Event()
+        self.__heartbeat_thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def get_worker_id(claim_config: Mapping) -> str:
+        """
+        Method get_worker_id returns id of the worker which is safe to use in file names and S3 object names
+        :param claim_config: 'claim_config' of pipeline
+        :type claim_config: Mapping
+        :return: 'worker_id' from config or '<host name>-<process id>'
+        :rtype: str
+        """
+        worker_id: str = claim_config["worker_id"] or f"{socket.gethostname()}-{os.getpid()}"
+        return re.sub(r"[^A-Za-z0-9.-]", "-", worker_id)
+
+    def get_claim_configs(self, configs: Mapping, claim_dir: str) -> Mapping:
+        """
+        Method get_claim_configs returns configs of pipeline for ingesting files of claim directory
+        :param configs: configs of pipeline
+        :type configs: Mapping
+        :param claim_dir: path to claim directory
+        :type claim_dir: str
+        :return: configs with claim directory as 'raw_data_dir' and 'journal_dir'
+        :rtype: Mapping
+        """
+        claim_dir_with_sep: str = os.path.join(claim_dir, "")
+        return MappingProxyType({
+            **configs,
+            "raw_data_dir": claim_dir_with_sep,
+            "journal_config": MappingProxyType({**configs["journal_config"], "journal_dir": claim_dir_with_sep})
+        })
+
+    def acquire_own_claim_dir(self) -> str:
+        """
+        Method acquire_own_claim_dir creates claim directory of the worker with lease and starts renewing of leases
+        :return: path to claim directory of the worker
+        :rtype: str
+        """
+        os.makedirs(self.__own_claim_dir, exist_ok=True)
+        self.__write_lease(os.path.join(self.__own_claim_dir, FileClaimer.lease_file_name))
+        self.__hold(self.__own_claim_dir)
+        return self.__own_claim_dir
+
+    def take_over_expired_claims(self) -> list[str]:
+        """
+        Method take_over_expired_claims takes over claim directories which leases weren't renewed for 'lease_seconds'
+        :return: paths to claim directories which were taken over
+        :rtype: list[str]
+        """
+        if not os.path.isdir(self.__claims_dir):
+            return []
+        taken_over_dirs: list[str] = []
+        with os.scandir(self.__claims_dir) as entries:
+            claim_dirs: list[str] = [entry.path for entry in entries if entry.is_dir()]
+        for claim_dir in claim_dirs:
+            if claim_dir == self.__own_claim_dir or claim_dir in self.__held_claim_dirs:
+                continue
+            lease_path: str = os.path.join(claim_dir, FileClaimer.lease_file_name)
+            stolen_lease_path: str = f"{lease_path}.{self.__worker_id}"
+            if not self.__steal_expired_lease(claim_dir, stolen_lease_path):
+                continue
+            if not self.__is_expired(os.stat(stolen_lease_path)):
+                # lease was renewed by its owner between checking and renaming, so it's given back
+                os.rename(stolen_lease_path, lease_path)
+                continue
+            previous_owner: str = self.__read_lease_owner(stolen_lease_path)
+            self.__write_lease(stolen_lease_path)
+            os.rename(stolen_lease_path, lease_path)
+            self.__hold(claim_dir)
+            taken_over_dirs.append(claim_dir)
+            Logger().get_logger().warning(f"Lease of claim directory '{claim_dir}' of worker '{previous_owner}' "
+                                          f"expired, it's taken over by worker '{self.__worker_id}'")
+        RunReport().set_measure("claims.taken_over", len(taken_over_dirs))
+        return taken_over_dirs
+
+    def claim_files(self, file_stats: Mapping[str, os.stat_result], max_files: int,
+                    max_bytes: int) -> dict[str, os.stat_result]:
+        """
+        Method claim_files moves up to max_files files (but not more than max_bytes bytes, at least one file) from
+        'raw_data_dir' into claim directory of the worker. Files are tried in random order, so workers which scanned
+        the directory at the same time rarely try the same files. Files which were claimed by other workers are
+        skipped.
+        :param file_stats: stat results of files by their paths relative to 'raw_data_dir'
+        :type file_stats: Mapping[str, os.stat_result]
+        :param max_files: max number of claimed files
+        :type max_files: int
+        :param max_bytes: max total size of claimed files
+        :type max_bytes: int
+        :return: stat results of claimed files by their paths relative to claim directory
+        :rtype: dict[str, os.stat_result]
+        """
+        claim_dir: str = self.acquire_own_claim_dir()
+        names: list[str] = list(file_stats)
+        random.shuffle(names)
+        claimed_files: dict[str, os.stat_result] = {}
+        claimed_bytes: int = 0
+        lost_files: int = 0
+        with RunReport().span("claim", worker_id=self.__worker_id) as claim_span:
+            for name in names:
+                if len(claimed_files) >= max_files or (len(claimed_files) > 0
+                                                       and claimed_bytes + file_stats[name].st_size > max_bytes):
+                    break
+                claimed_path: str = os.path.join(claim_dir, name)
+                if os.path.dirname(name) != "":
+                    os.makedirs(os.path.dirname(claimed_path), exist_ok=True)
+                try:
+                    os.rename(os.path.join(self.__raw_data_dir, name), claimed_path)
+                except FileNotFoundError:
+                    lost_files += 1
+                    continue
+                claimed_files[name] = file_stats[name]
+                claimed_bytes += file_stats[name].st_size
+            claim_span["files"] = len(claimed_files)
+            claim_span["bytes"] = claimed_bytes
+            claim_span["lost_files"] = lost_files
+        Logger().get_logger().info("Worker '%s' claimed %s files (%s files were claimed by other workers): '%s'",
+                                   self.__worker_id, len(claimed_files), lost_files, LogSummary(list(claimed_files)))
+        return claimed_files
+
+    def get_claimed_files(self, claim_dir: str, file_type: str, pattern: str = "", recursive: bool = False,
+                          exclude_dirs: Iterable[str] = ()) -> dict[str, os.stat_result]:
+        """
+        Method get_claimed_files finds raw data files in claim directory, e.g. files which were claimed by crashed
+        worker before it started their ingestion
+        :param claim_dir: path to claim directory
+        :type claim_dir: str
+        :param file_type: extension of required files, it's used if pattern is empty
+        :type file_type: str
+        :param pattern: glob pattern of file names, '*.<file_type>' if it's empty
+        :type pattern: str
+        :param recursive: if True, subdirectories are scanned too
+        :type recursive: bool
+        :param exclude_dirs: names of subdirectories which aren't scanned
+        :type exclude_dirs: Iterable[str]
+        :return: stat results of raw data files by their paths relative to claim directory
+        :rtype: dict[str, os.stat_result]
+        """
+        return FileManager.scan_directory(claim_dir, pattern or "*." + file_type, recursive, exclude_dirs)
+
+    def release(self, claim_dir: str):
+        """
+        Method release stops renewing of lease of claim directory and removes the directory if it's empty except lease
+        and empty subdirectories (e.g. folders of packed and split files)
+        :param claim_dir: path to claim directory
+        :type claim_dir: str
+        :return: Nothing
+        """
+        with self.__lock:
+            self.__held_claim_dirs.discard(claim_dir)
+        for root, dir_names, file_names in os.walk(claim_dir, topdown=False):
+            if file_names not in ([], [FileClaimer.lease_file_name]) or (root != claim_dir and len(file_names) > 0):
+                Logger().get_logger().warning(f"Claim directory '{claim_dir}' isn't removed because it contains "
+                                              f"files: '{file_names}'")
+                return
+            if root == claim_dir and len(file_names) > 0:
+                os.remove(os.path.join(root, FileClaimer.lease_file_name))
+            try:
+                os.rmdir(root)
+            except OSError:
+                Logger().get_logger().warning(f"Claim directory '{claim_dir}' isn't removed, '{root}' isn't empty")
+                return
+        Logger().get_logger().info(f"Claim directory '{claim_dir}' is released")
+
+    def stop(self):
+        """
+        Method stop stops renewing of leases, so claim directories which weren't released are taken over by other
+        workers when their leases expire
+        :return: Nothing
+        """
+        self.__stopped.set()
+        with self.__lock:
+            self.__held_claim_dirs.clear()
+
+    def __hold(self, claim_dir: str):
+        """
+        Private method for adding claim directory to the renewed ones and starting heartbeat thread
+        :return: Nothing
+        """
+        with self.__lock:
+            self.__held_claim_dirs.add(claim_dir)
+            if self.__heartbeat_thread is None:
+                self.__heartbeat_thread = threading.Thread(target=self.__renew_leases, daemon=True,
+                                                           name=f"lease-{self.__worker_id}")
+                self.__heartbeat_thread.start()
+
+    def __renew_leases(self):
+        """
+        Private method for renewing leases of held claim directories every 'lease_seconds' / 3 until worker is stopped
+        :return: Nothing
+        """
+        while not self.__stopped.wait(self.__lease_seconds / 3):
+            with self.__lock:
+                claim_dirs: list[str] = list(self.__held_claim_dirs)
+            for claim_dir in claim_dirs:
+                lease_path: str = os.path.join(claim_dir, FileClaimer.lease_file_name)
+                try:
+                    owner: str = self.__read_lease_owner(lease_path)
+                    if owner == self.__worker_id:
+                        os.utime(lease_path)
+                        continue
+                except FileNotFoundError:
+                    # lease file is being renamed by another worker which checks if it's expired
+                    continue
+                with self.__lock:
+                    self.__held_claim_dirs.discard(claim_dir)
+                Logger().get_logger().error(f"Lease of claim directory '{claim_dir}' was taken over by worker "
+                                            f"'{owner}', 'lease_seconds' must be longer than stalls of the worker")
+
+    def __steal_expired_lease(self, claim_dir: str, stolen_lease_path: str) -> bool:
+        """
+        Private method for renaming expired lease file of claim directory to the lease file of the worker. Only one
+        worker can rename the lease file, the others get FileNotFoundError. Lease which was left renamed by worker
+        that crashed in the middle of taking over is stolen the same way when it expires.
+        :return: True if lease was renamed by the worker
+        :rtype: bool
+        """
+        try:
+            with os.scandir(claim_dir) as entries:
+                lease_paths: list[str] = [entry.path for entry in entries
+                                          if entry.name == FileClaimer.lease_file_name
+                                          or (entry.name.startswith(FileClaimer.lease_file_name + ".")
+                                              and not entry.name.endswith(".tmp"))]
+        except FileNotFoundError:
+            return False
+        for lease_path in lease_paths:
+            try:
+                if self.__is_expired(os.stat(lease_path)):
+                    os.rename(lease_path, stolen_lease_path)
+                    return True
+            except FileNotFoundError:
+                continue
+        return False
+
+    def __is_expired(self, lease_stat: os.stat_result) -> bool:
+        """
+        Private method for checking that lease wasn't renewed for 'lease_seconds'
+        :return: True if lease is expired
+        :rtype: bool
+        """
+        return time.time() - lease_stat.st_mtime > self.__lease_seconds
+
+    def __write_lease(self, lease_path: str):
+        """
+        Private method for writing lease file of the worker. Lease file is written to temporary file first and
+        replaced at once, so other workers never read partially written lease.
+        :return: Nothing
+        """
+        temporary_path: str = f"{lease_path}.{self.__worker_id}.tmp"
+        with open(temporary_path, "w", encoding='utf-8') as lease_file:
+            json.dump({"worker_id": self.__worker_id, "host": socket.gethostname(), "pid": os.getpid()}, lease_file)
+        os.replace(temporary_path, lease_path)
+
+    @staticmethod
+    def __read_lease_owner(lease_path: str) -> str:
+        """
+        Private method for reading id of the worker which owns lease
+        :return: worker id or empty string if lease file is broken
+        :rtype: str
+        """
+        with open(lease_path, encoding='utf-8') as lease_file:
+            try:
+                return json.load(lease_file).get("worker_id", "")
+            except json.JSONDecodeError:
+                return ""
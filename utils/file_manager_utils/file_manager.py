@@ -1,9 +1,13 @@
 """
 Module for file managing
 """
+import fnmatch
 import os
+import re
 import shutil
-from utils.logger_manager import Logger
+from typing import Iterable, Mapping
+from utils.logger_manager import Logger, LogSummary
+from utils.run_report import RunReport
 
 
 class FileManager:
@@ -15,79 +19,74 @@ class FileManager:
     def rename_multiple_files(old_names_list: list[str], new_names_list: list[str]):
         """
         rename_multiple_files method renames names of the containing in one list to the names
-        that the other list contains
+        that the other list contains. Existence of files isn't checked before renaming: missing files are found by
+        failed renames, logged together and raised at the end.
         :param old_names_list: list with old file names (paths)
         :type old_names_list: list[str]
         :param new_names_list:  list with new file names (paths)
         :type new_names_list: list[str
         :return: Nothing
         """
-        Logger().get_logger().info(f"Renaming the following list of the files '{old_names_list}'"
-                                   f" to new names that are given in the next list '{new_names_list}'")
-        if not FileManager.all_files_exist(old_names_list):
-            raise FileNotFoundError
-        for old_name, new_name in zip(old_names_list, new_names_list):
-            os.rename(
-                os.path.normpath(old_name),
-                os.path.normpath(new_name)
-            )
+        Logger().get_logger().info("Renaming the following list of the files '%s'"
+                                   " to new names that are given in the next list '%s'",
+                                   LogSummary(old_names_list), LogSummary(new_names_list))
+        with RunReport().span("file_manager.rename_multiple_files", files=len(old_names_list)):
+            not_exist_list: list[str] = []
+            for old_name, new_name in zip(old_names_list, new_names_list):
+                try:
+                    os.rename(
+                        os.path.normpath(old_name),
+                        os.path.normpath(new_name)
+                    )
+                except FileNotFoundError:
+                    not_exist_list.append(os.path.normpath(old_name))
+            FileManager.__raise_if_not_exist(not_exist_list)
 
     @staticmethod
     def remove_multiple_files(file_name_list: list[str]):
         """
-        remove_multiple_files method removes files that are contained in the list
+        remove_multiple_files method removes files that are contained in the list. Missing files are found by failed
+        removals, logged together and raised at the end.
         :param file_name_list:  list with file names (paths)
         :type file_name_list: list[str]
         :return: Nothing
         """
-        Logger().get_logger().info(f"Removing the following list of the files '{file_name_list}'")
-        if not FileManager.all_files_exist(file_name_list):
-            raise FileNotFoundError
-        for file_name in file_name_list:
-            os.remove(os.path.normpath(file_name))
-
-    @staticmethod
-    def all_files_exist(files_path_list: list[str]) -> bool:
-        """
-        all_files_exist method checks that files by the given paths exist
-        :param files_path_list: list of paths to the files
-        :type files_path_list: list[str]
-        :return: False if any of the files is not found. If all files exist = returns True
-        :rtype: bool
-        """
-        not_exist_list: list[str] = []
-        for file_path in files_path_list:
-            path = os.path.normpath(file_path)
-            if not os.path.isfile(path):
-                not_exist_list.append(path)
-        if len(not_exist_list) == 0:
-            return True
-        else:
-            Logger().get_logger()\
-                .error(f"FileNotFoundError. The files numbered in the next list '{not_exist_list}' don't exist. ")
-            return False
+        Logger().get_logger().info("Removing the following list of the files '%s'", LogSummary(file_name_list))
+        with RunReport().span("file_manager.remove_multiple_files", files=len(file_name_list)):
+            not_exist_list: list[str] = []
+            for file_name in file_name_list:
+                try:
+                    os.remove(os.path.normpath(file_name))
+                except FileNotFoundError:
+                    not_exist_list.append(os.path.normpath(file_name))
+            FileManager.__raise_if_not_exist(not_exist_list)
 
     @staticmethod
     def move_files_to_folder(old_files_list: list[str], dest_folder: str):
         """
-        move_files_to_folder method moves files from the list to new_folder
+        move_files_to_folder method moves files from the list to new_folder. Missing files are found by failed moves,
+        logged together and raised at the end.
         :param old_files_list: list with paths to files
         :type old_files_list: list[str]
         :param dest_folder: folder where files wil be moved to
         :type dest_folder: str
         :return: Nothing
         """
-        Logger().get_logger().info(f"Moving files from list '{old_files_list} to destination folder '{dest_folder}'")
-        if not FileManager.all_files_exist(old_files_list):
-            raise FileNotFoundError
-        dest_folder: str = os.path.normpath(dest_folder)
-        if os.path.isdir(dest_folder):
+        Logger().get_logger().info("Moving files from list '%s' to destination folder '%s'",
+                                   LogSummary(old_files_list), dest_folder)
+        with RunReport().span("file_manager.move_files_to_folder", files=len(old_files_list)):
+            dest_folder: str = os.path.normpath(dest_folder)
+            if not os.path.isdir(dest_folder):
+                Logger().get_logger().error(f"Destination directory '{dest_folder}' doesn't exist")
+                raise NotADirectoryError
+            not_exist_list: list[str] = []
             for src_path in old_files_list:
                 file: str = os.path.basename(src_path)
-                shutil.move(src_path, os.path.join(dest_folder, file))
-        else:
-            Logger().get_logger().error(f"Destination directory '{dest_folder}' doesn't exist")
-            raise NotADirectoryError
+                try:
+                    shutil.move(src_path, os.path.join(dest_folder, file))
+                except FileNotFoundError:
+                    not_exist_list.append(os.path.normpath(src_path))
+            FileManager.__raise_if_not_exist(not_exist_list)
 
     @staticmethod
     def create_folder(path_prefix: str, folder_name: str) -> str:
@@ -104,35 +103,101 @@ class FileManager:
         path_prefix: str = os.path.normpath(path_prefix)
         if os.path.isdir(path_prefix):
             new_folder_path: str = os.path.join(path_prefix, folder_name)
-            os.makedirs(new_folder_path)
+            # pipelines with the same 'dir_to_move' can ingest files at the same second
+            os.makedirs(new_folder_path, exist_ok=True)
             return new_folder_path
         else:
             Logger().get_logger().error(f"Main directory (path_prefix) '{path_prefix}' doesn't exist")
             raise NotADirectoryError
 
     @staticmethod
-    def get_list_of_raw_data_files(directory: str, file_type: str) -> list[str]:
+    def scan_directory(directory: str, pattern: str, recursive: bool = False,
+                       exclude_dirs: Iterable[str] = ()) -> dict[str, os.stat_result]:
+        """
+        scan_directory method finds files which names match glob pattern by os.scandir. Every directory is read once
+        and every matching file is stat'ed once, so size and modification time of files are got together with their
+        names and don't have to be requested again.
+        :param directory: path to directory
+        :type directory: str
+        :param pattern: glob pattern of file names, e.g. '*.csv'
+        :type pattern: str
+        :param recursive: if True, subdirectories are scanned too
+        :type recursive: bool
+        :param exclude_dirs: names of subdirectories which aren't scanned
+        :type exclude_dirs: Iterable[str]
+        :return: stat results of matching files by their paths relative to directory
+        :rtype: dict[str, os.stat_result]
+        """
+        directory = os.path.normpath(directory)
+        name_matches = re.compile(fnmatch.translate(pattern)).match
+        exclude_dirs = set(exclude_dirs)
+        files: dict[str, os.stat_result] = {}
+        pending_dirs: list[str] = [""]
+        while len(pending_dirs) > 0:
+            relative_dir: str = pending_dirs.pop()
+            with os.scandir(os.path.join(directory, relative_dir)) as entries:
+                for entry in entries:
+                    relative_path: str = os.path.join(relative_dir, entry.name) if relative_dir else entry.name
+                    if name_matches(entry.name) and entry.is_file():
+                        files[relative_path] = entry.stat()
+                    elif recursive and entry.name not in exclude_dirs and entry.is_dir():
+                        pending_dirs.append(relative_path)
+        return files
+
+    @staticmethod
+    def scan_raw_data_files(directory: str, file_type: str, pattern: str = "", recursive: bool = False,
+                            exclude_dirs: Iterable[str] = ()) -> dict[str, os.stat_result]:
         """
-        get_list_of_raw_data_files method helps to get list of files with required extension in required directory
+        scan_raw_data_files method finds raw data files in directory together with their stat results
         :param directory: path to directory form which raw file names will be obtained
         :type directory: str
-        :param file_type: extension of required files. Provided for purposes of avoiding of reading non-required files
+        :param file_type: extension of required files, it's used if pattern is empty
         :type file_type: str
-        :return:  list of files with file_type extension
-        :rtype: list[str]
+        :param pattern: glob pattern of file names, '*.<file_type>' if it's empty
+        :type pattern: str
+        :param recursive: if True, subdirectories are scanned too
+        :type recursive: bool
+        :param exclude_dirs: names of subdirectories which aren't scanned
+        :type exclude_dirs: Iterable[str]
+        :return: stat results of raw data files by their paths relative to directory
+        :rtype: dict[str, os.stat_result]
         """
         directory: str = os.path.normpath(directory)
-        if os.path.isdir(directory):
-            content_list: list[str] = os.listdir(directory)
-        else:
+        if not os.path.isdir(directory):
             Logger().get_logger().error(f"Directory (path_prefix) '{directory}' doesn't exist")
             raise NotADirectoryError
-        files_list: list[str] = []
-        for item in content_list:
-            if item.endswith("." + file_type):
-                files_list.append(item)
-        if len(files_list) > 0:
-            return files_list
+        files: dict[str, os.stat_result] = FileManager.scan_directory(directory, pattern or "*." + file_type,
+                                                                      recursive, exclude_dirs)
+        if len(files) > 0:
+            return files
         else:
             Logger().get_logger().error(f"There are no files with extensiom '.{file_type}' in folder '{directory}'")
             raise ValueError
+
+    @staticmethod
+    def get_file_sizes(path_list: list[str], file_stats: Mapping[str, os.stat_result]) -> list[int]:
+        """
+        get_file_sizes method returns sizes of files. Sizes of files which were got by scan of directory are taken from
+        their stat results, other files are stat'ed
+        :param path_list: paths to files
+        :type path_list: list[str]
+        :param file_stats: stat results of files by their normalized paths
+        :type file_stats: Mapping[str, os.stat_result]
+        :return: sizes of files
+        :rtype: list[int]
+        """
+        return [file_stats[path].st_size if path in file_stats else os.path.getsize(path) for path in path_list]
+
+    @staticmethod
+    def __raise_if_not_exist(not_exist_list: list[str]):
+        """
+        Private method for logging files which weren't found and raising FileNotFoundError if there are any
+        :param not_exist_list: paths to files which weren't found
+        :type not_exist_list: list[str]
+        :return: Nothing
+        """
+        if len(not_exist_list) > 0:
+            Logger().get_logger()\
+                .error("FileNotFoundError. The files numbered in the next list '%s' don't exist. ",
+                       LogSummary(not_exist_list))
+            raise FileNotFoundError
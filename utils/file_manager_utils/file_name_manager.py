@@ -1,8 +1,10 @@
 """
 Module for managing file names purposes
 """
-from typing import Union
+from typing import Mapping, Optional, Union
+from utils.compression_manager import CompressionManager
 from utils.config_manager import ConfigReader
+import hashlib
 import os
 
 
@@ -11,47 +13,102 @@ class FileNameManager:
     Class for managing file names purposes
     """
     @staticmethod
-    def __generate_basic_file_name(file_type: str, datetime: str, order_num: str = "") -> str:
+    def __generate_basic_file_name(file_type: str, datetime: str, order_num: str = "",
+                                   naming_pattern: Optional[Mapping] = None) -> str:
         """
         Private method for generating basic file name pattern
         :param file_type: file extension
         :type file_type: str
         :param datetime: datetime of files ingestion to S3
         :param order_num: 3 digits iterate number with '_' prefix if needed (e.g. _001)
+        :param naming_pattern: 'data_files_name_pattern' of pipeline, by default it's taken from main config
+        :type naming_pattern: Optional[Mapping]
         :return: file name
         :rtype: str
         """
-        naming_pattern: dict = ConfigReader.get_main_config()['data_files_name_pattern']
+        if naming_pattern is None:
+            naming_pattern = ConfigReader.get_main_config()['data_files_name_pattern']
         return f"{naming_pattern['source_name']}_{naming_pattern['table_name']}{order_num}_{datetime}.{file_type}"
 
     @staticmethod
-    def generate_data_file_names(file_num: int, datetime: str) -> list[str]:
+    def generate_data_file_names(file_num: int, datetime: str, codec: str = "none", file_type: Optional[str] = None,
+                                 naming_pattern: Optional[Mapping] = None) -> list[str]:
         """
-        Module generate_data_file_names required to generate names of data files
+        Module generate_data_file_names required to generate names of data files. Order numbers are padded by zeros to
+        the same width (at least 3 digits), so sorted names are in the same order as generated ones.
         :param file_num: number of required file names
         :type file_num: int
         :param datetime: datetime of files ingestion to S3
         :type datetime: str
-        :return: list of names of csv files
+        :param codec: compression codec of files, its extension is added to file type (e.g. 'csv.gz' for 'gzip')
+        :type codec: str
+        :param file_type: file extension, by default it's 'file_type' from 'data_files_name_pattern' config
+        :type file_type: Optional[str]
+        :param naming_pattern: 'data_files_name_pattern' of pipeline, by default it's taken from main config
+        :type naming_pattern: Optional[Mapping]
+        :return: list of names of data files
         :rtype: list[str]
         """
-        file_type: str = ConfigReader.get_main_config()['data_files_name_pattern']['file_type']
+        if naming_pattern is None:
+            naming_pattern = ConfigReader.get_main_config()['data_files_name_pattern']
+        if file_type is None:
+            file_type = naming_pattern['file_type']
+        file_type += CompressionManager.get_file_extension(codec)
         name_list: list = []
+        # names of local files are sorted and S3 object names are not, '_1000' mustn't be sorted before '_100'
+        width: int = max(len(str(file_num)), 3)
         for i in range(file_num):
-            order_num: str = "_" + str(i + 1).zfill(3)
-            name_list.append(FileNameManager.__generate_basic_file_name(file_type, datetime, order_num))
+            order_num: str = "_" + str(i + 1).zfill(width)
+            name_list.append(FileNameManager.__generate_basic_file_name(file_type, datetime, order_num, naming_pattern))
         return name_list
 
     @staticmethod
-    def generate_json_metadata_file_name(datetime: str) -> str:
+    def generate_json_metadata_file_name(datetime: str, naming_pattern: Optional[Mapping] = None) -> str:
         """
         Method generate_json_metadata_file_name generates json metadata file name
         :param datetime: datetime of files ingestion to S3
         :type datetime: str
+        :param naming_pattern: 'data_files_name_pattern' of pipeline, by default it's taken from main config
+        :type naming_pattern: Optional[Mapping]
         :return: name of the metadata file
         :rtype: str
         """
-        return FileNameManager.__generate_basic_file_name("json", datetime)
+        return FileNameManager.__generate_basic_file_name("json", datetime, naming_pattern=naming_pattern)
+
+    @staticmethod
+    def get_hash_sub_prefix(file_name: str, sub_prefix_count: int) -> str:
+        """
+        Method get_hash_sub_prefix generates short sub-prefix of S3 object from MD5 of file name, so objects of one run
+        are spread evenly between sub_prefix_count sub-prefixes and sub-prefix of the object can be recomputed from
+        file name
+        :param file_name: name of file
+        :type file_name: str
+        :param sub_prefix_count: number of sub-prefixes, sub-prefix isn't added if it's less than 2
+        :type sub_prefix_count: int
+        :return: hex number of sub-prefix with '/' (e.g. '0a/' for 256 sub-prefixes) or empty string
+        :rtype: str
+        """
+        if sub_prefix_count < 2:
+            return ""
+        width: int = len(format(sub_prefix_count - 1, "x"))
+        sub_prefix_number: int = int(hashlib.md5(file_name.encode()).hexdigest(), 16) % sub_prefix_count
+        return format(sub_prefix_number, f"0{width}x") + "/"
+
+    @staticmethod
+    def generate_s3_object_names(prefix: str, names: list[str], sub_prefix_count: int = 0) -> list[str]:
+        """
+        Method generate_s3_object_names combines prefix, hash sub-prefix of file (if sub_prefix_count is 2 or more)
+        and file name into S3 object names. Object names are in the same order as names of files.
+        :param prefix: S3 prefix ended with '/'
+        :type prefix: str
+        :param names: names of files
+        :type names: list[str]
+        :param sub_prefix_count: number of hash sub-prefixes, 0 means that objects are placed right under prefix
+        :type sub_prefix_count: int
+        :return: S3 object names
+        :rtype: list[str]
+        """
+        return [prefix + FileNameManager.get_hash_sub_prefix(name, sub_prefix_count) + name for name in names]
 
     @staticmethod
     def generate_path_to_files(prefix: str, names: Union[list[str], str], s3: bool = False) -> Union[list[str], str]:
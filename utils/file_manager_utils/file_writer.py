@@ -2,7 +2,8 @@
 Module is required for writing data into files
 """
 import json
-from utils.logger_manager import Logger
+from utils.config_manager import ConfigReader
+from utils.logger_manager import Logger, LogSummary
 
 
 class FileWriter:
@@ -19,7 +20,11 @@ class FileWriter:
         :param path: path where file will be saved
         :return: Nothing
         """
-        Logger().get_logger().info(f"Creating json metadata file with path '{path}' and next metadata - {metadata}")
+        summary_limit: int = ConfigReader.get_logger_config()['list_summary_limit']
+        Logger().get_logger().info("Creating json metadata file with path '%s' and next metadata - %s", path, {
+            key: LogSummary(value) if isinstance(value, (dict, list)) and len(value) > summary_limit else value
+            for key, value in metadata.items()
+        })
         if len(metadata) == 0:
             raise ValueError
 
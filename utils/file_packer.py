@@ -0,0 +1,118 @@
+"""
+Module for packing small raw data files
+"""
+from typing import Mapping, Optional
+from utils.config_manager import ConfigReader
+from utils.dataset_reader import CsvRowCounter
+from utils.logger_manager import Logger
+from utils.memory_budget import MemoryBudget
+import os
+
+
+class FilePacker:
+    """
+    Class FilePacker concatenates small csv files with the same header into packed files of up to target size, so
+    thousands of tiny files are uploaded and loaded as a few objects. Header is kept only at the beginning of packed
+    file, and rows of every source file are counted while it's packed.
+    Header is the first line of file.
+    """
+    packed_folder_name: str = "packed"
+
+    @staticmethod
+    def get_packing_config(configs: Optional[Mapping] = None) -> Mapping:
+        """
+        Method get_packing_config returns 'packing_config' of pipeline or from main config if configs of pipeline
+        aren't given
+        :param configs: configs of pipeline
+        :type configs: Optional[Mapping]
+        :return: packing configs as read-only dict
+        :rtype: Mapping
+        """
+        return (configs or ConfigReader.get_main_config())['packing_config']
+
+    @staticmethod
+    def read_header(path: str) -> bytes:
+        """
+        Method read_header reads the first line of file
+        :param path: path to csv file
+        :type path: str
+        :return: the first line of file with line break
+        :rtype: bytes
+        """
+        with open(os.path.normpath(path), "rb") as csv_file:
+            return csv_file.readline()
+
+    @staticmethod
+    def plan_packs(path_list: list[str], small_file_bytes: int, target_size_bytes: int,
+                   size_list: Optional[list[int]] = None) -> list[list[int]]:
+        """
+        Method plan_packs groups files into packs. Files smaller than small_file_bytes with the same header are packed
+        together until the next file would make pack bigger than target_size_bytes, every other file is a group of
+        its own. Groups are ordered by their first files.
+        :param path_list: paths to csv files
+        :type path_list: list[str]
+        :param small_file_bytes: files of this size and bigger are not packed
+        :type small_file_bytes: int
+        :param target_size_bytes: max size of packed file
+        :type target_size_bytes: int
+        :param size_list: sizes of files, files are stat'ed if they aren't provided
+        :type size_list: Optional[list[int]]
+        :return: indexes of files of every group
+        :rtype: list[list[int]]
+        """
+        groups: list[list[int]] = []
+        open_packs: dict[bytes, tuple[list[int], int]] = {}
+        for i, path in enumerate(path_list):
+            size: int = size_list[i] if size_list is not None else os.path.getsize(os.path.normpath(path))
+            if size >= small_file_bytes:
+                groups.append([i])
+                continue
+            header: bytes = FilePacker.read_header(path)
+            pack, pack_size = open_packs.get(header, (None, 0))
+            if pack is None or pack_size + size - len(header) > target_size_bytes:
+                pack, pack_size = [], len(header)
+                groups.append(pack)
+            pack.append(i)
+            open_packs[header] = (pack, pack_size + size - len(header))
+        return groups
+
+    @staticmethod
+    def pack_files(path_list: list[str], source_name_list: list[str], packed_path: str,
+                   text_qualifier: str = '"') -> list[dict]:
+        """
+        Method pack_files writes files one after another to packed file without their headers (except the first one)
+        and counts rows of every file. Line break is added after file if it doesn't end with it. Packed file is
+        replaced atomically, so it's never left half-written. Every file is read to memory as a whole, so it's reserved
+        in memory budget while it's packed.
+        :param path_list: paths to csv files with the same header
+        :type path_list: list[str]
+        :param source_name_list: names of source files which are written to their profiles
+        :type source_name_list: list[str]
+        :param packed_path: path to packed file
+        :type packed_path: str
+        :param text_qualifier: quote character of csv files
+        :type text_qualifier: str
+        :return: 'source_name', 'row_count' and 'size_bytes' of every file
+        :rtype: list[dict]
+        """
+        Logger().get_logger().info(f"Packing {len(path_list)} files to '{packed_path}'")
+        packed_path = os.path.normpath(packed_path)
+        source_profiles: list[dict] = []
+        tmp_path: str = packed_path + ".tmp"
+        with open(tmp_path, "wb") as packed_file:
+            for path, source_name in zip(path_list, source_name_list):
+                with MemoryBudget().reserve(os.path.getsize(os.path.normpath(path))):
+                    with open(os.path.normpath(path), "rb") as csv_file:
+                        data: bytes = csv_file.read()
+                    counter: CsvRowCounter = CsvRowCounter(text_qualifier)
+                    counter.update(data)
+                    header_end: int = data.find(b"\n") + 1 if b"\n" in data else len(data)
+                    with memoryview(data) as view:
+                        packed_file.write(view if len(source_profiles) == 0 else view[header_end:])
+                    if len(data) > 0 and not data.endswith(b"\n"):
+                        packed_file.write(b"\n")
+                    source_profiles.append({"source_name": source_name, "row_count": counter.get_row_count(),
+                                            "size_bytes": len(data)})
+                    del data
+        os.replace(tmp_path, packed_path)
+        return source_profiles
@@ -0,0 +1,129 @@
+"""
+Module for profiling raw data files
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Union
+from utils.config_manager import ConfigReader
+from utils.dataset_reader import CsvRowCounter, DatasetReader
+from utils.logger_manager import Logger
+from utils.memory_budget import MemoryBudget
+import hashlib
+import os
+
+
+class ProfilingReader:
+    """
+    Class ProfilingReader reads file once by big buffers and gives every buffer to row counter and SHA-256 hasher
+    before returning it. The returned buffer is used as it is by the caller (e.g. as body of upload request), so file
+    is profiled while it's uploaded and isn't read again. Buffers are not copied between consumers.
+    """
+    def __init__(self, path: str, text_qualifier: Optional[str] = '"'):
+        """
+        :param path: path to file
+        :type path: str
+        :param text_qualifier: quote character of csv file, if it's None file is only read without profiling
+        :type text_qualifier: Optional[str]
+        """
+        self.__file = open(os.path.normpath(path), "rb")
+        self.__counter: Optional[CsvRowCounter] = CsvRowCounter(text_qualifier) if text_qualifier is not None else None
+        self.__checksum = hashlib.sha256() if text_qualifier is not None else None
+        self.__size: int = 0
+
+    def read(self, size: int = -1) -> Union[bytearray, bytes]:
+        """
+        Method read reads next buffer of file and passes it to row counter and hasher
+        :param size: max number of bytes to return, the rest of file is returned if it's negative
+        :type size: int
+        :return: next buffer of file, empty at the end of file
+        :rtype: Union[bytearray, bytes]
+        """
+        if size < 0:
+            buffer: Union[bytearray, bytes] = self.__file.read()
+        else:
+            buffer = bytearray(size)
+            with memoryview(buffer) as view:
+                filled: int = 0
+                while filled < size:
+                    read_bytes: int = self.__file.readinto(view[filled:])
+                    if not read_bytes:
+                        break
+                    filled += read_bytes
+            del buffer[filled:]
+        if self.__counter is not None:
+            self.__counter.update(buffer)
+            self.__checksum.update(buffer)
+        self.__size += len(buffer)
+        return buffer
+
+    def readable(self) -> bool:
+        return True
+
+    def get_profile(self) -> dict:
+        """
+        Method get_profile returns profile of the part of file that was read
+        :return: 'row_count', 'size_bytes' and 'sha256' of the file
+        :rtype: dict
+        """
+        if self.__counter is None:
+            Logger().get_logger().error("Profile of file can't be got from reader without text qualifier")
+            raise ValueError
+        return {"row_count": self.__counter.get_row_count(), "size_bytes": self.__size,
+                "sha256": self.__checksum.hexdigest()}
+
+    def close(self):
+        """
+        Method close closes file
+        :return: Nothing
+        """
+        self.__file.close()
+
+    def __enter__(self) -> "ProfilingReader":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class FileProfiler:
+    """
+    Class FileProfiler collects row count, size and checksum of raw data files.
+    Every file is read only once, and files are profiled in parallel by pool of processes.
+    """
+    @staticmethod
+    def profile_file(path: str, text_qualifier: str = '"') -> dict:
+        """
+        Method profile_file reads file by buffers and counts its rows, size and SHA-256 checksum in the same pass
+        :param path: path to csv file
+        :type path: str
+        :param text_qualifier: quote character of csv file
+        :type text_qualifier: str
+        :return: 'row_count', 'size_bytes' and 'sha256' of the file
+        :rtype: dict
+        """
+        with ProfilingReader(path, text_qualifier) as reader:
+            while reader.read(DatasetReader.row_count_buffer_size):
+                pass
+            return reader.get_profile()
+
+    @staticmethod
+    def profile_multiple_files(path_list: list[str], text_qualifier: str = '"') -> list[dict]:
+        """
+        Method profile_multiple_files profiles files from the list in parallel. Number of processes is set by
+        'max_processes' from 'profiling_config' (0 means number of CPUs). Every process keeps one read buffer in memory,
+        so buffers of all processes are reserved in memory budget while files are profiled.
+        :param path_list: paths to csv files
+        :type path_list: list[str]
+        :param text_qualifier: quote character of csv files
+        :type text_qualifier: str
+        :return: profiles of files in the same order as paths
+        :rtype: list[dict]
+        """
+        max_processes: Optional[int] = ConfigReader.get_main_config()['profiling_config']['max_processes'] or None
+        Logger().get_logger().info(f"Profiling {len(path_list)} files")
+        if len(path_list) <= 1 or max_processes == 1:
+            with MemoryBudget().reserve(DatasetReader.row_count_buffer_size):
+                return [FileProfiler.profile_file(path, text_qualifier) for path in path_list]
+        processes: int = min(max_processes or os.cpu_count() or 1, len(path_list))
+        with MemoryBudget().reserve(DatasetReader.row_count_buffer_size * processes):
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                return list(executor.map(FileProfiler.profile_file, path_list, [text_qualifier] * len(path_list)))
@@ -0,0 +1,240 @@
+"""
+Module for splitting large raw data files
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Mapping, Optional
+from utils.config_manager import ConfigReader
+from utils.dataset_reader import DatasetReader
+from utils.logger_manager import Logger
+from utils.memory_budget import MemoryBudget
+import os
+
+
+class FileSplitter:
+    """
+    Class FileSplitter cuts large csv files into chunks of about target size, so they can be uploaded and loaded in
+    parallel. Cuts are placed only on row boundaries: line breaks inside quoted values are never used as cuts.
+    Header of file is repeated at the beginning of every chunk.
+    File is split in parallel by byte ranges. Every range is read once by its own process, which counts quotes of the
+    range and finds the first row boundary inside the range both for the case when range starts outside quotes and
+    inside them. Then prefix parity of quote counts tells which case is true for every range, and chunks are written in
+    parallel too. Range without row boundary (e.g. inside a very long row) is joined to the previous chunk.
+    """
+    split_folder_name: str = "split"
+
+    @staticmethod
+    def get_split_config(configs: Optional[Mapping] = None) -> Mapping:
+        """
+        Method get_split_config returns 'split_config' of pipeline or from main config if configs of pipeline aren't
+        given
+        :param configs: configs of pipeline
+        :type configs: Optional[Mapping]
+        :return: split configs as read-only dict
+        :rtype: Mapping
+        """
+        return (configs or ConfigReader.get_main_config())['split_config']
+
+    @staticmethod
+    def find_row_start(csv_file: BinaryIO, position: int, in_quotes: bool, quote: bytes) -> Optional[int]:
+        """
+        Method find_row_start finds the first line break after position which isn't placed inside quoted value
+        :param csv_file: csv file opened in binary mode
+        :type csv_file: BinaryIO
+        :param position: position where search starts
+        :type position: int
+        :param in_quotes: True if position is inside quoted value
+        :type in_quotes: bool
+        :param quote: quote character of csv file
+        :type quote: bytes
+        :return: position right after the line break (start of the next row) or None if there is no such line break
+        :rtype: Optional[int]
+        """
+        csv_file.seek(position)
+        while True:
+            buffer: bytes = csv_file.read(DatasetReader.row_count_buffer_size)
+            if not buffer:
+                return None
+            start: int = 0
+            while True:
+                quote_position: int = buffer.find(quote, start)
+                if not in_quotes:
+                    line_break_position: int = buffer.find(b"\n", start)
+                    if line_break_position >= 0 and (quote_position < 0 or line_break_position < quote_position):
+                        return position + line_break_position + 1
+                if quote_position < 0:
+                    break
+                in_quotes = not in_quotes
+                start = quote_position + len(quote)
+            position += len(buffer)
+
+    @staticmethod
+    def scan_range(path: str, start: int, end: int, quote: bytes) -> tuple[int, Optional[int], Optional[int]]:
+        """
+        Method scan_range counts quotes of the byte range and finds the first row start inside the range by one pass.
+        Both cases (range starts outside quotes or inside them) are checked together: they switch on the same quotes,
+        so the first case is outside quotes when even number of quotes is passed and the second one when it's odd.
+        :param path: path to csv file
+        :type path: str
+        :param start: position where range starts
+        :type start: int
+        :param end: position where range ends
+        :type end: int
+        :param quote: quote character of csv file
+        :type quote: bytes
+        :return: number of quotes in range, row start if range starts outside quotes and if it starts inside quotes
+        (None if there is no row start inside the range)
+        :rtype: tuple[int, Optional[int], Optional[int]]
+        """
+        row_starts: list[Optional[int]] = [None, None]
+        quote_count: int = 0
+        position: int = start
+        with open(os.path.normpath(path), "rb") as csv_file:
+            csv_file.seek(start)
+            while position < end:
+                buffer: bytes = csv_file.read(min(DatasetReader.row_count_buffer_size, end - position))
+                if not buffer:
+                    break
+                segment_start: int = 0
+                while None in row_starts:
+                    quote_position: int = buffer.find(quote, segment_start)
+                    segment_end: int = len(buffer) if quote_position < 0 else quote_position
+                    outside_case: int = quote_count % 2
+                    if row_starts[outside_case] is None:
+                        line_break_position: int = buffer.find(b"\n", segment_start, segment_end)
+                        if line_break_position >= 0:
+                            row_starts[outside_case] = position + line_break_position + 1
+                    if quote_position < 0:
+                        break
+                    quote_count += 1
+                    segment_start = quote_position + len(quote)
+                else:
+                    quote_count += buffer.count(quote, segment_start)
+                position += len(buffer)
+        return quote_count, row_starts[0], row_starts[1]
+
+    @staticmethod
+    def write_chunk(path: str, chunk_path: str, header_end: int, start: int, end: int):
+        """
+        Method write_chunk writes header of file and the byte range of its rows to chunk file. Chunk file is replaced
+        atomically, so it's never left half-written.
+        :param path: path to csv file
+        :type path: str
+        :param chunk_path: path to chunk file
+        :type chunk_path: str
+        :param header_end: position where header ends
+        :type header_end: int
+        :param start: position where rows of chunk start
+        :type start: int
+        :param end: position where rows of chunk end
+        :type end: int
+        :return: Nothing
+        """
+        chunk_path = os.path.normpath(chunk_path)
+        tmp_path: str = chunk_path + ".tmp"
+        with open(os.path.normpath(path), "rb") as csv_file, open(tmp_path, "wb") as chunk_file:
+            chunk_file.write(csv_file.read(header_end))
+            csv_file.seek(start)
+            position: int = start
+            while position < end:
+                buffer: bytes = csv_file.read(min(DatasetReader.row_count_buffer_size, end - position))
+                if not buffer:
+                    break
+                chunk_file.write(buffer)
+                position += len(buffer)
+        os.replace(tmp_path, chunk_path)
+
+    @staticmethod
+    def plan_chunks(path: str, chunk_size_bytes: int, text_qualifier: str = '"',
+                    max_processes: Optional[int] = None) -> tuple[int, list[tuple[int, int]]]:
+        """
+        Method plan_chunks finds row boundaries where file is cut into chunks of about chunk_size_bytes
+        :param path: path to csv file
+        :type path: str
+        :param chunk_size_bytes: target size of chunk
+        :type chunk_size_bytes: int
+        :param text_qualifier: quote character of csv file
+        :type text_qualifier: str
+        :param max_processes: number of processes which scan ranges, None means number of CPUs
+        :type max_processes: Optional[int]
+        :return: position where header ends and byte ranges of rows of every chunk
+        :rtype: tuple[int, list[tuple[int, int]]]
+        """
+        quote: bytes = text_qualifier.encode()
+        file_size: int = os.path.getsize(os.path.normpath(path))
+        with open(os.path.normpath(path), "rb") as csv_file:
+            header_end: Optional[int] = FileSplitter.find_row_start(csv_file, 0, False, quote)
+        if header_end is None or header_end >= file_size:
+            return file_size, [(file_size, file_size)]
+        range_count: int = max(round((file_size - header_end) / chunk_size_bytes), 1)
+        range_starts: list[int] = [header_end + (file_size - header_end) * k // range_count
+                                   for k in range(range_count)]
+        range_ends: list[int] = range_starts[1:] + [file_size]
+        if range_count == 1 or max_processes == 1:
+            scans: list[tuple[int, Optional[int], Optional[int]]] = [
+                FileSplitter.scan_range(path, start, end, quote) for start, end in zip(range_starts, range_ends)
+            ]
+        else:
+            with ProcessPoolExecutor(max_workers=max_processes) as executor:
+                scans = list(executor.map(FileSplitter.scan_range, [path] * range_count, range_starts, range_ends,
+                                          [quote] * range_count))
+        cuts: list[int] = [header_end]
+        in_quotes: bool = False
+        for k, (quote_count, row_start_outside, row_start_inside) in enumerate(scans):
+            # the first range starts right after header, so it's already a row boundary
+            cut: Optional[int] = header_end if k == 0 else row_start_inside if in_quotes else row_start_outside
+            if cut is not None and cuts[-1] < cut < file_size:
+                cuts.append(cut)
+            in_quotes = in_quotes != (quote_count % 2 == 1)
+        cuts.append(file_size)
+        return header_end, list(zip(cuts[:-1], cuts[1:]))
+
+    @staticmethod
+    def split_file(path: str, chunk_folder: str, text_qualifier: str = '"',
+                   split_config: Optional[Mapping] = None) -> list[str]:
+        """
+        Method split_file cuts csv file into chunks of about 'chunk_size_bytes' from 'split_config' on row boundaries.
+        Chunks are named as file with '_001', '_002', ... suffixes and are written in parallel. If file fits one chunk,
+        it isn't split. Every process keeps one read buffer in memory, so buffers of all processes are reserved in
+        memory budget while file is split.
+        :param path: path to csv file
+        :type path: str
+        :param chunk_folder: folder where chunks are written
+        :type chunk_folder: str
+        :param text_qualifier: quote character of csv file
+        :type text_qualifier: str
+        :param split_config: 'split_config' of pipeline, 'split_config' from main config is used if it isn't given
+        :type split_config: Optional[Mapping]
+        :return: paths to chunks or path to file if it isn't split
+        :rtype: list[str]
+        """
+        split_config = split_config or FileSplitter.get_split_config()
+        max_processes: Optional[int] = split_config['max_processes'] or None
+        with MemoryBudget().reserve(DatasetReader.row_count_buffer_size * (max_processes or os.cpu_count() or 1)):
+            return FileSplitter.__split_file(path, chunk_folder, text_qualifier, split_config)
+
+    @staticmethod
+    def __split_file(path: str, chunk_folder: str, text_qualifier: str, split_config: Mapping) -> list[str]:
+        """
+        Private method for splitting file by split_file
+        :return: paths to chunks or path to file if it isn't split
+        :rtype: list[str]
+        """
+        max_processes: Optional[int] = split_config['max_processes'] or None
+        header_end, chunk_ranges = FileSplitter.plan_chunks(path, split_config['chunk_size_bytes'], text_qualifier,
+                                                            max_processes)
+        if len(chunk_ranges) <= 1:
+            return [path]
+        file_stem, file_extension = os.path.splitext(os.path.basename(path))
+        width: int = max(len(str(len(chunk_ranges))), 3)
+        chunk_paths: list[str] = [os.path.join(chunk_folder, f"split_{file_stem}_{n:0{width}d}{file_extension}")
+                                  for n in range(1, len(chunk_ranges) + 1)]
+        Logger().get_logger().info(f"Splitting file '{path}' into {len(chunk_paths)} chunks")
+        if max_processes == 1:
+            for chunk_path, (start, end) in zip(chunk_paths, chunk_ranges):
+                FileSplitter.write_chunk(path, chunk_path, header_end, start, end)
+        else:
+            with ProcessPoolExecutor(max_workers=max_processes) as executor:
+                list(executor.map(FileSplitter.write_chunk, [path] * len(chunk_paths), chunk_paths,
+                                  [header_end] * len(chunk_paths), [start for start, _ in chunk_ranges],
+                                  [end for _, end in chunk_ranges]))
+        return chunk_paths
@@ -0,0 +1,82 @@
+"""
+Module of ingest_run. Classes DataFile and IngestRun are represented in this module.
+"""
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Mapping, Optional
+from utils.run_journal import RunJournal
+import os
+
+if TYPE_CHECKING:
+    from utils.manifest_index import ManifestIndex
+
+
+@dataclass
+class DataFile:
+    """
+    Class DataFile is a record of one data file of ingest run. Records are passed from stage to stage of ingesting, and
+    every stage fills its own fields. Every data file is uploaded as one S3 object, it's either raw data file, packed
+    file of small raw data files or chunk of split file.
+    Fields:
+    - path: local path to data file;
+    - source_name: name of raw data file before renaming, or name of packed file or chunk;
+    - sources: raw data files of packed file;
+    - split_of: source name of file which chunk was split from;
+    - file_name, object_name: name of file of S3 object and its key;
+    - uploaded: True if object was uploaded before the failure of resumed run;
+    - can_be_duplicate: True if file is profiled before upload to find out if it's a duplicate;
+    - profile: row count, size and checksum of file;
+    - duplicate_of: bucket and key of already uploaded object with the same content;
+    - upload_path: local path to file which is uploaded (converted file if files are converted to parquet).
+    """
+    path: str
+    source_name: str
+    sources: Optional[list[dict]] = None
+    split_of: Optional[str] = None
+    file_name: str = ""
+    object_name: str = ""
+    uploaded: bool = False
+    can_be_duplicate: bool = False
+    profile: Optional[dict] = None
+    duplicate_of: Optional[dict] = None
+    upload_path: str = ""
+
+
+@dataclass
+class IngestRun:
+    """
+    Class IngestRun keeps state of one ingest run which is shared by all stages of ingesting.
+    Fields:
+    - configs: configs of pipeline;
+    - journal: journal of pipeline where finished steps of the run are recorded;
+    - timestamp_mark: timestamp mark of the run;
+    - resumed: True if unfinished run is resumed;
+    - json_ingest_metadata: ingest metadata which is filled from the template;
+    - file_stats: stat results of raw data files by their paths after renaming;
+    - raw_file_paths: paths to renamed raw data files;
+    - derived_file_paths: paths to files which were made by the run (packed, split and converted files);
+    - upload_file_type, codec, stored_format: file type, compression codec and format of uploaded objects;
+    - read_once: True if files are profiled while they are uploaded;
+    - manifest_index: index of uploaded files if deduplication is enabled.
+    """
+    configs: Mapping
+    journal: RunJournal
+    timestamp_mark: str
+    resumed: bool
+    json_ingest_metadata: dict
+    file_stats: dict[str, os.stat_result] = field(default_factory=dict)
+    raw_file_paths: list[str] = field(default_factory=list)
+    derived_file_paths: list[str] = field(default_factory=list)
+    upload_file_type: str = ""
+    codec: str = "none"
+    stored_format: str = ""
+    read_once: bool = False
+    manifest_index: Optional["ManifestIndex"] = None
+
+    @property
+    def text_qualifier(self) -> str:
+        """
+        Property text_qualifier returns quote character of csv files from ingest metadata
+        :return: quote character
+        :rtype: str
+        """
+        return self.json_ingest_metadata["csv_config"]["text_qualifier"]
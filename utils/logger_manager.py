@@ -1,22 +1,76 @@
 """
-Module of logger_util. Class Logger is represented in this module.
+Module of logger_util. Classes Logger and LogSummary are represented in this module.
 """
+import atexit
+import itertools
 import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
 from utils.singleton_util import Singleton
 from utils.config_manager import ConfigReader
-from typing import Optional
+from typing import Iterable, Mapping, Optional
 import os
 
 
+class LogSummary:
+    """
+    Class LogSummary is a lazy summary of the big list (or any other collection) for log messages.
+    Only first items are kept, and they are formatted to string only when log record is really written,
+    so messages that are filtered out by logging level cost nothing.
+    """
+    def __init__(self, items: Iterable, limit: Optional[int] = None):
+        """
+        :param items: collection that is required to be logged
+        :type items: Iterable
+        :param limit: max number of items shown in the log message. By default, it's taken from logger config.
+        :type limit: Optional[int]
+        """
+        if limit is None:
+            limit = ConfigReader.get_logger_config()['list_summary_limit']
+        self.__head: list = list(itertools.islice(items, limit))
+        self.__count: int = len(items) if hasattr(items, '__len__') else len(self.__head)
+
+    def __str__(self) -> str:
+        if self.__count <= len(self.__head):
+            return str(self.__head)
+        return f"{self.__head} ... ({self.__count} items in total)"
+
+    # summary is often logged inside of dict or list, which format their items by repr()
+    __repr__ = __str__
+
+
+class DeferredFormattingQueueHandler(QueueHandler):
+    """
+    Class DeferredFormattingQueueHandler puts log records to the queue without formatting them,
+    so messages are formatted by the background thread of the listener instead of the calling thread.
+    Only messages with immutable arguments (and LogSummary, which keeps its own copy of items) are deferred: mutable
+    arguments can be changed by the calling thread before the record is written, so such messages are formatted
+    right away.
+    """
+    deferred_types: tuple = (str, bytes, int, float, complex, bool, type(None), LogSummary)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args: tuple = record.args if isinstance(record.args, tuple) else (record.args,)
+        if not all(isinstance(value, self.deferred_types) for value in (record.msg, *args)):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
 class Logger(metaclass=Singleton):
     """
     Class Logger contains method of getting logger.
     Logger is based on Singleton metaclass for keep the only instance of logger.
+    Records are put to the queue and written by stream and file handlers in the background thread,
+    so logging doesn't block the calling thread.
+    Configs are read when logger is configured by the first call of get_logger, so importing of the module doesn't
+    read any files.
     Methods: logger. This method returns instance of logger.
     """
     __logger: Optional[logging.Logger] = None
-    __config: dict = ConfigReader().get_logger_config()
-    __log_flag: str = ConfigReader().get_main_config()['log_file']
+    __listener: Optional[QueueListener] = None
+    __lock: threading.Lock = threading.Lock()
 
     def get_logger(self) -> logging.Logger:
         """
@@ -24,20 +78,36 @@ class Logger(metaclass=Singleton):
         :return: Instance of logger.
         :rtype: logging.Logger
         """
-        log_directory: str = os.path.normpath(self.__config['log_dir'])
-        log_path: str = os.path.join(log_directory, self.__config['log_file'])
-        if not os.path.exists(log_directory):
-            os.mkdir(log_directory)
-
         if self.__logger is None:
-            self.__logger = logging.getLogger(Logger.__name__)
-            self.__logger.setLevel(self.__config['level'])
-            ch = logging.StreamHandler()
-            formatter = logging.Formatter(self.__config['format'])
-            ch.setFormatter(formatter)
-            self.__logger.addHandler(ch)
-            if self.__log_flag == "True":
-                fh = logging.FileHandler(log_path, mode=self.__config['mode'])
-                fh.setFormatter(formatter)
-                self.__logger.addHandler(fh)
+            with self.__lock:
+                if self.__logger is None:
+                    self.__configure_logger()
         return self.__logger
+
+    def __configure_logger(self):
+        """
+        Private method for configuring logger: creates log directory, handlers and starts background listener.
+        :return: Nothing
+        """
+        config: Mapping = ConfigReader.get_logger_config()
+        formatter = logging.Formatter(config['format'])
+        ch = logging.StreamHandler()
+        ch.setFormatter(formatter)
+        handlers: list[logging.Handler] = [ch]
+        if ConfigReader.get_main_config()['log_file'] == "True":
+            log_directory: str = os.path.normpath(config['log_dir'])
+            log_path: str = os.path.join(log_directory, config['log_file'])
+            os.makedirs(log_directory, exist_ok=True)
+            fh = logging.FileHandler(log_path, mode=config['mode'])
+            fh.setFormatter(formatter)
+            handlers.append(fh)
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.__listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        self.__listener.start()
+        atexit.register(self.__listener.stop)
+
+        logger: logging.Logger = logging.getLogger(Logger.__name__)
+        logger.setLevel(config['level'])
+        logger.addHandler(DeferredFormattingQueueHandler(log_queue))
+        self.__logger = logger
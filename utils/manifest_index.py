@@ -0,0 +1,127 @@
+"""
+Module of manifest_index. Class ManifestIndex is represented in this module.
+"""
+from datetime import datetime, timezone
+from typing import Optional
+from utils.logger_manager import Logger
+import os
+import sqlite3
+import threading
+
+
+class ManifestIndex:
+    """
+    Class ManifestIndex is a persistent local index of files that were already uploaded to S3.
+    Index maps content hash, size and stored format of file to S3 object where it was uploaded. It's kept in SQLite
+    database with primary key on (sha256, size_bytes, stored_format), so lookups stay fast for millions of entries.
+    """
+    def __init__(self, path: str):
+        """
+        :param path: path to database file of the index
+        :type path: str
+        """
+        path = os.path.normpath(path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        Logger().get_logger().info(f"Opening manifest index '{path}'")
+        self.__lock: threading.Lock = threading.Lock()
+        self.__connection: sqlite3.Connection = sqlite3.connect(path, check_same_thread=False)
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute(
+            "CREATE TABLE IF NOT EXISTS uploaded_objects ("
+            "sha256 TEXT NOT NULL, size_bytes INTEGER NOT NULL, stored_format TEXT NOT NULL, "
+            "source_name TEXT NOT NULL, bucket TEXT NOT NULL, object_name TEXT NOT NULL, uploaded_at TEXT NOT NULL, "
+            "PRIMARY KEY (sha256, size_bytes, stored_format)) WITHOUT ROWID"
+        )
+        self.__connection.execute(
+            "CREATE INDEX IF NOT EXISTS uploaded_objects_size ON uploaded_objects (size_bytes, stored_format)"
+        )
+        self.__connection.commit()
+
+    def find_object(self, sha256: str, size_bytes: int, stored_format: str) -> Optional[dict]:
+        """
+        Method find_object finds S3 object which was uploaded from file with the same content
+        :param sha256: SHA-256 checksum of file
+        :type sha256: str
+        :param size_bytes: size of file in bytes
+        :type size_bytes: int
+        :param stored_format: format of S3 object, e.g. 'csv', 'csv.gz' or 'parquet'
+        :type stored_format: str
+        :return: 'bucket', 'object_name' and 'source_name' of S3 object or None if file wasn't uploaded before
+        :rtype: Optional[dict]
+        """
+        with self.__lock:
+            row: Optional[tuple] = self.__connection.execute(
+                "SELECT bucket, object_name, source_name FROM uploaded_objects "
+                "WHERE sha256 = ? AND size_bytes = ? AND stored_format = ?",
+                (sha256, size_bytes, stored_format)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"bucket": row[0], "object_name": row[1], "source_name": row[2]}
+
+    def has_size(self, size_bytes: int, stored_format: str) -> bool:
+        """
+        Method has_size checks if any file of the same size and format was uploaded before. Files of other sizes can't
+        be duplicates, so their hashes aren't required before upload.
+        :param size_bytes: size of file in bytes
+        :type size_bytes: int
+        :param stored_format: format of S3 object, e.g. 'csv', 'csv.gz' or 'parquet'
+        :type stored_format: str
+        :return: True if file of the same size and format is in the index
+        :rtype: bool
+        """
+        with self.__lock:
+            row: Optional[tuple] = self.__connection.execute(
+                "SELECT 1 FROM uploaded_objects WHERE size_bytes = ? AND stored_format = ? LIMIT 1",
+                (size_bytes, stored_format)
+            ).fetchone()
+        return row is not None
+
+    def add_objects(self, objects: list[dict]):
+        """
+        Method add_objects adds uploaded S3 objects to the index in one transaction
+        :param objects: dicts with 'sha256', 'size_bytes', 'stored_format', 'source_name', 'bucket' and 'object_name'
+        :type objects: list[dict]
+        :return: Nothing
+        """
+        uploaded_at: str = datetime.now(timezone.utc).isoformat()
+        with self.__lock, self.__connection:
+            self.__connection.executemany(
+                "INSERT OR REPLACE INTO uploaded_objects "
+                "(sha256, size_bytes, stored_format, source_name, bucket, object_name, uploaded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(uploaded_object["sha256"], uploaded_object["size_bytes"], uploaded_object["stored_format"],
+                  uploaded_object["source_name"], uploaded_object["bucket"], uploaded_object["object_name"],
+                  uploaded_at) for uploaded_object in objects]
+            )
+
+    def remove_object(self, sha256: str, size_bytes: int, stored_format: str, bucket: str, object_name: str):
+        """
+        Method remove_object removes S3 object which was found by find_object from the index, e.g. when it was deleted
+        from the bucket. Entry is found by primary key, and it's kept if it points to other object by now.
+        :param sha256: SHA-256 checksum of file
+        :type sha256: str
+        :param size_bytes: size of file in bytes
+        :type size_bytes: int
+        :param stored_format: format of S3 object, e.g. 'csv', 'csv.gz' or 'parquet'
+        :type stored_format: str
+        :param bucket: bucket of the object
+        :type bucket: str
+        :param object_name: key of the object
+        :type object_name: str
+        :return: Nothing
+        """
+        with self.__lock, self.__connection:
+            self.__connection.execute(
+                "DELETE FROM uploaded_objects "
+                "WHERE sha256 = ? AND size_bytes = ? AND stored_format = ? AND bucket = ? AND object_name = ?",
+                (sha256, size_bytes, stored_format, bucket, object_name)
+            )
+
+    def close(self):
+        """
+        Method close closes database of the index
+        :return: Nothing
+        """
+        with self.__lock:
+            self.__connection.close()
@@ -0,0 +1,101 @@
+"""
+Module of memory_budget. Class MemoryBudget is represented in this module.
+"""
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator, Mapping
+from utils.config_manager import ConfigReader
+from utils.run_report import RunReport
+from utils.singleton_util import Singleton
+import threading
+
+
+class MemoryBudget(metaclass=Singleton):
+    """
+    Class MemoryBudget keeps the only one budget of bytes which are kept in memory at the same time by all pipelines
+    and stages of the process. Every stage reserves its memory footprint (e.g. the whole file for single request
+    upload, one part for multipart upload) before it reads data and releases it when data isn't needed anymore.
+    If budget is used up, the stage blocks until other stages release their bytes, so memory doesn't depend on the
+    number and sizes of files in the batch.
+    Reservations are admitted in the order of requests, so big reservation isn't starved by small ones. Reservation
+    which is bigger than the whole budget is admitted when nothing else is reserved.
+    Size of the budget is set by 'max_in_flight_bytes' from 'memory_config' in main config, 0 means no limit.
+    """
+    def __init__(self):
+        self.__condition: threading.Condition = threading.Condition()
+        self.__waiting: deque = deque()
+        self.__in_flight_bytes: int = 0
+
+    @staticmethod
+    def get_memory_config() -> Mapping:
+        """
+        Method get_memory_config returns 'memory_config' from main config
+        :return: memory configs as read-only dict
+        :rtype: Mapping
+        """
+        return ConfigReader.get_main_config()['memory_config']
+
+    def acquire(self, size_bytes: int):
+        """
+        Method acquire reserves bytes of the budget and blocks until they are available
+        :param size_bytes: number of bytes which are going to be kept in memory
+        :type size_bytes: int
+        :return: Nothing
+        """
+        max_in_flight_bytes: int = self.get_memory_config()['max_in_flight_bytes']
+        with self.__condition:
+            if max_in_flight_bytes > 0 and (len(self.__waiting) > 0
+                                            or not self.__fits(size_bytes, max_in_flight_bytes)):
+                request: object = object()
+                self.__waiting.append(request)
+                with RunReport().span("memory_budget.wait", size_bytes=size_bytes):
+                    while self.__waiting[0] is not request or not self.__fits(size_bytes, max_in_flight_bytes):
+                        self.__condition.wait()
+                self.__waiting.popleft()
+                # the next request may fit into the rest of the budget too
+                self.__condition.notify_all()
+            self.__in_flight_bytes += size_bytes
+            in_flight_bytes: int = self.__in_flight_bytes
+        RunReport().set_measure("memory_budget.peak_in_flight_bytes", in_flight_bytes, keep_max=True)
+
+    def release(self, size_bytes: int):
+        """
+        Method release returns reserved bytes to the budget and wakes up stages which wait for them
+        :param size_bytes: number of bytes which were reserved
+        :type size_bytes: int
+        :return: Nothing
+        """
+        with self.__condition:
+            self.__in_flight_bytes -= size_bytes
+            self.__condition.notify_all()
+
+    @contextmanager
+    def reserve(self, size_bytes: int) -> Iterator[None]:
+        """
+        Method reserve keeps bytes of the budget reserved while the code inside 'with' block is run
+        :param size_bytes: number of bytes which are kept in memory inside the block
+        :type size_bytes: int
+        :return: Nothing
+        """
+        self.acquire(size_bytes)
+        try:
+            yield
+        finally:
+            self.release(size_bytes)
+
+    def get_in_flight_bytes(self) -> int:
+        """
+        Method get_in_flight_bytes returns number of bytes which are reserved now
+        :return: reserved bytes
+        :rtype: int
+        """
+        with self.__condition:
+            return self.__in_flight_bytes
+
+    def __fits(self, size_bytes: int, max_in_flight_bytes: int) -> bool:
+        """
+        Private method for checking that reservation fits into the rest of the budget
+        :return: True if reservation can be admitted
+        :rtype: bool
+        """
+        return self.__in_flight_bytes == 0 or self.__in_flight_bytes + size_bytes <= max_in_flight_bytes
@@ -0,0 +1,195 @@
+"""
+Module for converting csv datasets to parquet
+"""
+from typing import TYPE_CHECKING, Iterator, Mapping, Optional
+from utils.config_manager import ConfigReader
+from utils.dataset_reader import DatasetReader
+from utils.logger_manager import Logger
+from utils.memory_budget import MemoryBudget
+import os
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+
+class ParquetConverter:
+    """
+    Class ParquetConverter converts csv datasets to parquet files by chunks, so memory doesn't depend on file size.
+    Package 'pyarrow' is required for conversion. It's imported only when the first file is converted, so it isn't
+    loaded if conversion is disabled.
+    """
+    # csv text of chunk, its DataFrame, arrow table and cast copy of the table are kept in memory at the same time
+    memory_expansion_factor: int = 4
+
+    @staticmethod
+    def get_parquet_config(configs: Optional[Mapping] = None) -> Mapping:
+        """
+        Method get_parquet_config returns 'parquet_config' of pipeline or from main config if configs of pipeline
+        aren't given
+        :param configs: configs of pipeline
+        :type configs: Optional[Mapping]
+        :return: parquet configs as read-only dict
+        :rtype: Mapping
+        """
+        return (configs or ConfigReader.get_main_config())['parquet_config']
+
+    @staticmethod
+    def convert_csv_to_parquet(csv_path: str, parquet_path: str, delimiter: str = ",", text_qualifier: str = '"',
+                               parquet_config: Optional[Mapping] = None):
+        """
+        Method convert_csv_to_parquet reads csv file by chunks of 'row_group_size' rows and writes every chunk to
+        parquet file as separate row group. Values are kept as strings, so conversion is lossless (e.g. leading zeros
+        of codes and digits of long numbers are kept), unless 'infer_types' is 'True'. Schema of parquet file is taken
+        from the first chunk, the next chunks are cast to the same schema. If some chunk can't be cast (e.g. column is
+        empty in the first chunk and has strings in the next ones), schema is widened by widen_schema and file is
+        converted again from the beginning.
+        :param csv_path: path to csv file
+        :type csv_path: str
+        :param parquet_path: path where parquet file will be saved
+        :type parquet_path: str
+        :param delimiter: delimiter of csv file
+        :type delimiter: str
+        :param text_qualifier: quote character of csv file
+        :type text_qualifier: str
+        :param parquet_config: 'parquet_config' of pipeline, 'parquet_config' from main config is used if it isn't given
+        :type parquet_config: Optional[Mapping]
+        :return: Nothing
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            Logger().get_logger().error("Package 'pyarrow' is required for conversion of csv files to parquet")
+            raise ImportError
+        parquet_config = parquet_config or ParquetConverter.get_parquet_config()
+        Logger().get_logger().info(f"Converting csv file '{csv_path}' to parquet file '{parquet_path}'")
+
+        chunk_bytes: int = ParquetConverter.estimate_chunk_bytes(csv_path, parquet_config['row_group_size'])
+        schema: Optional[pa.Schema] = None
+        while True:
+            schema = ParquetConverter.__write_parquet_file(csv_path, parquet_path, delimiter, text_qualifier,
+                                                           parquet_config, schema, chunk_bytes)
+            if schema is None:
+                break
+            column_types: dict[str, str] = dict(zip(schema.names, map(str, schema.types)))
+            Logger().get_logger().warning(f"Types of columns of csv file '{csv_path}' differ between chunks, it's "
+                                          f"converted again with types {column_types}")
+
+    @staticmethod
+    def estimate_chunk_bytes(csv_path: str, row_group_size: int) -> int:
+        """
+        Method estimate_chunk_bytes estimates memory which is used by conversion of one chunk of rows: average size of
+        row in the head of file times 'row_group_size' times memory_expansion_factor. Csv text of chunk isn't bigger
+        than the whole file, but data of chunk in memory is, so the factor is applied after the text is limited by
+        size of file.
+        :param csv_path: path to csv file
+        :type csv_path: str
+        :param row_group_size: number of rows in chunk
+        :type row_group_size: int
+        :return: estimated number of bytes
+        :rtype: int
+        """
+        csv_path = os.path.normpath(csv_path)
+        file_size: int = os.path.getsize(csv_path)
+        with open(csv_path, "rb") as csv_file:
+            head: bytes = csv_file.read(DatasetReader.row_count_buffer_size)
+        row_bytes: float = len(head) / max(head.count(b"\n"), 1)
+        return min(int(row_bytes * row_group_size), file_size) * ParquetConverter.memory_expansion_factor
+
+    @staticmethod
+    def __write_parquet_file(csv_path: str, parquet_path: str, delimiter: str, text_qualifier: str,
+                             parquet_config: Mapping, schema: Optional["pa.Schema"],
+                             chunk_bytes: int) -> Optional["pa.Schema"]:
+        """
+        Private method for writing chunks of csv file to parquet file by convert_csv_to_parquet. Every chunk is
+        read and written while chunk_bytes are reserved in memory budget.
+        :return: None if file is written or widened schema if some chunk doesn't fit the schema
+        :rtype: Optional[pa.Schema]
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        writer: Optional[pq.ParquetWriter] = None
+        as_strings: bool = parquet_config['infer_types'] != "True"
+        chunks: Iterator["pd.DataFrame"] = DatasetReader.iterate_dataset_from_csv(
+            csv_path, parquet_config['row_group_size'], delimiter, text_qualifier, as_strings
+        )
+        try:
+            while True:
+                with MemoryBudget().reserve(chunk_bytes):
+                    chunk: Optional["pd.DataFrame"] = next(chunks, None)
+                    if chunk is None:
+                        break
+                    table: pa.Table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if schema is None:
+                        schema = ParquetConverter.__get_string_schema(table) if as_strings else table.schema
+                    if table.schema.names != schema.names:
+                        Logger().get_logger().error(f"Columns {table.schema.names} of chunk of csv file '{csv_path}' "
+                                                    f"aren't columns {schema.names} of the first chunk")
+                        raise ValueError
+                    try:
+                        table = table.cast(schema)
+                    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                        return ParquetConverter.widen_schema(schema, table)
+                    if writer is None:
+                        writer = pq.ParquetWriter(
+                            os.path.normpath(parquet_path),
+                            schema,
+                            use_dictionary=parquet_config['use_dictionary'] == "True",
+                            compression=parquet_config['compression']
+                        )
+                    writer.write_table(table, row_group_size=parquet_config['row_group_size'])
+            if writer is None:
+                empty_table: pa.Table = pa.Table.from_pandas(
+                    DatasetReader.read_dataset_from_csv(csv_path, delimiter=delimiter, text_qualifier=text_qualifier,
+                                                        as_strings=as_strings),
+                    preserve_index=False
+                )
+                if as_strings:
+                    empty_table = empty_table.cast(ParquetConverter.__get_string_schema(empty_table))
+                pq.write_table(empty_table, os.path.normpath(parquet_path))
+        finally:
+            chunks.close()
+            if writer is not None:
+                writer.close()
+        return None
+
+    @staticmethod
+    def __get_string_schema(table: "pa.Table") -> "pa.Schema":
+        """
+        Private method for schema where every column of table is string, columns without values have null type and
+        pandas may give large strings otherwise
+        :return: schema of string columns
+        :rtype: pa.Schema
+        """
+        import pyarrow as pa
+        return pa.schema([pa.field(name, pa.string()) for name in table.column_names])
+
+    @staticmethod
+    def widen_schema(schema: "pa.Schema", table: "pa.Table") -> "pa.Schema":
+        """
+        Method widen_schema finds schema which fits both data of the schema and table. Columns of table which can't
+        be cast to the schema get type of table if the schema has null type, float if both types are numeric, and
+        string otherwise, so every column is widened only a few times.
+        :param schema: schema of parquet file
+        :type schema: pa.Schema
+        :param table: chunk of data with the same columns
+        :type table: pa.Table
+        :return: widened schema
+        :rtype: pa.Schema
+        """
+        import pyarrow as pa
+        fields: list[pa.Field] = []
+        for field, column in zip(schema, table.columns):
+            try:
+                column.cast(field.type)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                if pa.types.is_null(field.type):
+                    field = field.with_type(column.type)
+                elif all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in (field.type, column.type)):
+                    field = field.with_type(pa.float64())
+                else:
+                    field = field.with_type(pa.large_string() if pa.types.is_large_string(column.type)
+                                            else pa.string())
+            fields.append(field)
+        # pandas metadata of the first chunk describes the old types, so it isn't kept
+        return pa.schema(fields)
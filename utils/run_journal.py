@@ -0,0 +1,163 @@
+"""
+Module of run_journal. Class RunJournal is represented in this module.
+"""
+from typing import Any, Mapping, Optional
+from utils.logger_manager import Logger
+import hashlib
+import json
+import os
+import threading
+
+
+class RunJournal:
+    """
+    Class RunJournal is a durable journal of one ingest run of pipeline. It records which steps of the run (rename,
+    count, upload, metadata upload and move) are finished, so the run which failed or was killed can be resumed under
+    the same timestamp and only the remaining work is done again.
+    Journal is a json lines file in 'journal_dir' of 'journal_config', one file per 'raw_data_dir'. Every record is
+    appended and synced to disk before the step is considered finished; broken last line (left by crash in the middle
+    of writing) is ignored. Journal is removed when the run is finished.
+    If 'enabled' in 'journal_config' is not 'True', records are kept only in memory and runs are never resumed.
+    """
+    def __init__(self, configs: Mapping):
+        """
+        :param configs: configs of pipeline with 'journal_config' and 'raw_data_dir'
+        :type configs: Mapping
+        """
+        journal_config: Mapping = configs["journal_config"]
+        self.__enabled: bool = journal_config["enabled"] == "True"
+        self.__lock: threading.Lock = threading.Lock()
+        self.__records: dict[str, dict[Optional[str], Any]] = {}
+        journal_dir: str = os.path.normpath(journal_config["journal_dir"])
+        journal_name: str = hashlib.sha1(os.path.normpath(configs["raw_data_dir"]).encode()).hexdigest() + ".jsonl"
+        self.__path: str = os.path.join(journal_dir, journal_name)
+        if self.__enabled:
+            os.makedirs(journal_dir, exist_ok=True)
+            self.__read_journal()
+
+    def has_unfinished_run(self) -> bool:
+        """
+        Method has_unfinished_run checks if there is a run which was started but wasn't finished
+        :return: True if there is unfinished run
+        :rtype: bool
+        """
+        return self.__enabled and "start" in self.__records
+
+    def get_timestamp_mark(self) -> str:
+        """
+        Method get_timestamp_mark returns timestamp mark of the run
+        :return: timestamp mark
+        :rtype: str
+        """
+        return self.__records["start"][None]["timestamp_mark"]
+
+    def get_source_file_names(self) -> list[str]:
+        """
+        Method get_source_file_names returns names of raw data files of the run before they were renamed
+        :return: names of raw data files
+        :rtype: list[str]
+        """
+        return list(self.__records["start"][None]["source_file_names"])
+
+    def start(self, timestamp_mark: str, source_file_names: list[str]):
+        """
+        Method start starts journal of the new run. It must be called before any file of the run is changed.
+        :param timestamp_mark: timestamp mark of the run
+        :type timestamp_mark: str
+        :param source_file_names: names of raw data files of the run
+        :type source_file_names: list[str]
+        :return: Nothing
+        """
+        with self.__lock:
+            self.__records = {}
+        self.record("start", value={"timestamp_mark": timestamp_mark, "source_file_names": source_file_names})
+
+    def is_done(self, step: str, key: Optional[str] = None) -> bool:
+        """
+        Method is_done checks if the step (or the step for the given key, e.g. file) is finished
+        :param step: name of the step
+        :type step: str
+        :param key: key of the step, e.g. file or object name
+        :type key: Optional[str]
+        :return: True if the step is finished
+        :rtype: bool
+        """
+        with self.__lock:
+            return key in self.__records.get(step, {})
+
+    def get_value(self, step: str, key: Optional[str] = None) -> Any:
+        """
+        Method get_value returns value which was recorded when the step was finished
+        :param step: name of the step
+        :type step: str
+        :param key: key of the step, e.g. file or object name
+        :type key: Optional[str]
+        :return: recorded value or None if the step isn't finished
+        :rtype: Any
+        """
+        with self.__lock:
+            return self.__records.get(step, {}).get(key)
+
+    def record(self, step: str, key: Optional[str] = None, value: Any = True):
+        """
+        Method record records that the step is finished. It's thread-safe, so steps of different files can be recorded
+        from different workers.
+        :param step: name of the step
+        :type step: str
+        :param key: key of the step, e.g. file or object name
+        :type key: Optional[str]
+        :param value: value of the step which is required for resuming, e.g. ETag of uploaded object
+        :type value: Any
+        :return: Nothing
+        """
+        self.record_many(step, {key: value})
+
+    def record_many(self, step: str, values: Mapping[Optional[str], Any]):
+        """
+        Method record_many records that the step is finished for several keys by one write to disk
+        :param step: name of the step
+        :type step: str
+        :param values: values of the step by their keys
+        :type values: Mapping[Optional[str], Any]
+        :return: Nothing
+        """
+        if len(values) == 0:
+            return
+        with self.__lock:
+            if self.__enabled:
+                lines: str = "".join(json.dumps({"step": step, "key": key, "value": value}) + "\n"
+                                     for key, value in values.items())
+                with open(self.__path, "a", encoding='utf-8') as journal_file:
+                    journal_file.write(lines)
+                    journal_file.flush()
+                    os.fsync(journal_file.fileno())
+            self.__records.setdefault(step, {}).update(values)
+
+    def finish(self):
+        """
+        Method finish removes journal of the finished run
+        :return: Nothing
+        """
+        with self.__lock:
+            self.__records = {}
+            if self.__enabled and os.path.isfile(self.__path):
+                os.remove(self.__path)
+
+    def __read_journal(self):
+        """
+        Private method for reading records of unfinished run from journal file
+        :return: Nothing
+        """
+        if not os.path.isfile(self.__path):
+            return
+        with open(self.__path, encoding='utf-8') as journal_file:
+            for line in journal_file:
+                try:
+                    record: dict = json.loads(line)
+                except json.JSONDecodeError:
+                    Logger().get_logger().warning(f"Broken record of journal '{self.__path}' is ignored")
+                    continue
+                self.__records.setdefault(record["step"], {})[record["key"]] = record["value"]
+        if "start" in self.__records:
+            Logger().get_logger().info(f"Journal '{self.__path}' contains unfinished run with timestamp "
+                                       f"'{self.get_timestamp_mark()}'")
@@ -0,0 +1,249 @@
+"""
+Module of run_report. Class RunReport is represented in this module.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Iterator, Mapping, Optional
+from utils.config_manager import ConfigReader
+from utils.logger_manager import Logger
+from utils.singleton_util import Singleton
+import cProfile
+import json
+import os
+import re
+import threading
+import time
+
+
+class RunReport(metaclass=Singleton):
+    """
+    Class RunReport collects timing spans of stages, measures of every processed file (bytes, duration, retries) and
+    measures of the run and writes them to machine-readable json report in the log directory.
+    Spans can be nested and can be opened from any thread, every span knows its parent in the same thread.
+    If 'cprofile' in 'run_report_config' is 'True', the run is also profiled by cProfile and stats are saved next to
+    the report.
+    Records are collected into report of the name which is set by use_report in the current thread (e.g. every
+    pipeline in watch mode has its own report). Tasks of pools of workers get the name of the thread which submitted
+    them, so every pipeline writes and resets only its own report while the other pipelines keep running.
+    """
+    __report_name: ContextVar[Optional[str]] = ContextVar("report_name", default=None)
+
+    def __init__(self):
+        self.__lock: threading.Lock = threading.Lock()
+        self.__local: threading.local = threading.local()
+        self.__reports: dict[Optional[str], dict] = {None: self.__start_report()}
+        self.__profiler: Optional[cProfile.Profile] = None
+
+    @staticmethod
+    def get_run_report_config() -> Mapping:
+        """
+        Method get_run_report_config returns 'run_report_config' from main config
+        :return: run report configs as read-only dict
+        :rtype: Mapping
+        """
+        return ConfigReader.get_main_config()['run_report_config']
+
+    def use_report(self, name: Optional[str]):
+        """
+        Method use_report makes records of the current thread and of tasks which it submits to pools of workers be
+        collected into separate report with the name
+        :param name: name of the report (e.g. name of pipeline), None means common report of the run
+        :type name: Optional[str]
+        :return: Nothing
+        """
+        RunReport.__report_name.set(name)
+        with self.__lock:
+            self.__reports.setdefault(name, self.__start_report())
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[dict]:
+        """
+        Method span measures duration of the code inside 'with' block. Attributes of the span (e.g. 'bytes' or 'files')
+        can be given as arguments or added to yielded dict inside the block.
+        :param name: name of the stage
+        :type name: str
+        :return: span record
+        :rtype: Iterator[dict]
+        """
+        stack: list[dict] = self.__get_stack()
+        start: float = time.perf_counter()
+        record: dict = {"name": name, "parent": stack[-1]["name"] if len(stack) > 0 else None,
+                        "thread": threading.current_thread().name, **attributes}
+        stack.append(record)
+        try:
+            yield record
+        except BaseException:
+            record["failed"] = True
+            raise
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            stack.pop()
+            with self.__lock:
+                report: dict = self.__get_report()
+                # span can be opened before the report is started, so start is counted from the report it's added to
+                record["start_seconds"] = start - report["start"]
+                report["spans"].append(record)
+
+    def add_file(self, stage: str, file_name: str, size_bytes: int, seconds: float, retries: int = 0, **attributes):
+        """
+        Method add_file records measures of one file processed by the stage
+        :param stage: name of the stage
+        :type stage: str
+        :param file_name: path to file
+        :type file_name: str
+        :param size_bytes: number of bytes of file processed by the stage
+        :type size_bytes: int
+        :param seconds: duration of processing of the file
+        :type seconds: float
+        :param retries: number of retried requests
+        :type retries: int
+        :return: Nothing
+        """
+        with self.__lock:
+            self.__get_report()["files"].append({"stage": stage, "file_name": file_name, "bytes": size_bytes,
+                                                 "seconds": seconds, "retries": retries, **attributes})
+
+    def set_measure(self, name: str, value: Any, keep_max: bool = False):
+        """
+        Method set_measure records measure of the run which isn't bound to stage or file (e.g. peak of memory budget)
+        :param name: name of the measure
+        :type name: str
+        :param value: value of the measure
+        :type value: Any
+        :param keep_max: if True, the biggest value since the previous report is kept
+        :type keep_max: bool
+        :return: Nothing
+        """
+        with self.__lock:
+            measures: dict[str, Any] = self.__get_report()["measures"]
+            if keep_max and name in measures:
+                value = max(value, measures[name])
+            measures[name] = value
+
+    def start_profiling(self):
+        """
+        Method start_profiling starts cProfile of the calling thread if 'enabled' and 'cprofile' in 'run_report_config'
+        are 'True'. Profiling stops when the report is written.
+        :return: Nothing
+        """
+        run_report_config: Mapping = self.get_run_report_config()
+        if run_report_config['enabled'] == "True" and run_report_config['cprofile'] == "True" \
+                and self.__profiler is None:
+            self.__profiler = cProfile.Profile()
+            self.__profiler.enable()
+
+    def build_report(self) -> dict:
+        """
+        Method build_report summarizes spans of report of the current thread by stages. 'seconds' of stage is a sum of
+        durations of its spans and 'wall_seconds' is time when at least one span of the stage was open, so throughput
+        of stages which are run in parallel (e.g. uploads of files) is counted by wall time.
+        :return: report of the run
+        :rtype: dict
+        """
+        with self.__lock:
+            report: dict = self.__get_report()
+            collected: dict = {**report, "spans": list(report["spans"]), "files": list(report["files"]),
+                               "measures": dict(report["measures"])}
+        return self.__summarize(collected)
+
+    @staticmethod
+    def __summarize(collected: dict) -> dict:
+        """
+        Private method for summarizing spans, files and measures which were collected into report
+        :return: report of the run
+        :rtype: dict
+        """
+        spans: list[dict] = collected["spans"]
+        files: list[dict] = collected["files"]
+        stages: dict[str, dict] = {}
+        for span in sorted(spans, key=lambda record: record["start_seconds"]):
+            stage: dict = stages.setdefault(span["name"], {"calls": 0, "failed": 0, "seconds": 0.0,
+                                                           "wall_seconds": 0.0, "bytes": 0, "files": 0,
+                                                           "wall_end": 0.0})
+            stage["calls"] += 1
+            stage["failed"] += 1 if span.get("failed") else 0
+            stage["seconds"] += span["seconds"]
+            stage["bytes"] += span.get("bytes", 0)
+            stage["files"] += span.get("files", 0)
+            span_end: float = span["start_seconds"] + span["seconds"]
+            stage["wall_seconds"] += max(span_end - max(span["start_seconds"], stage["wall_end"]), 0.0)
+            stage["wall_end"] = max(stage["wall_end"], span_end)
+        for stage in stages.values():
+            del stage["wall_end"]
+            stage["mb_per_second"] = stage["bytes"] / 1024 ** 2 / stage["wall_seconds"] \
+                if stage["bytes"] > 0 and stage["wall_seconds"] > 0 else None
+            stage["files_per_second"] = stage["files"] / stage["wall_seconds"] \
+                if stage["files"] > 0 and stage["wall_seconds"] > 0 else None
+        return {
+            "started_at": collected["started_at"].isoformat(),
+            "seconds": time.perf_counter() - collected["start"],
+            "retries": sum(file["retries"] for file in files),
+            "stages": stages,
+            "measures": collected["measures"],
+            "files": files,
+            "spans": spans
+        }
+
+    def write_report(self) -> Optional[str]:
+        """
+        Method write_report writes report of the current thread with spans and files which were collected since its
+        previous report to the log directory (if 'enabled' in 'run_report_config' is 'True') and starts collecting of
+        the next report. Reports of the other names aren't touched.
+        :return: path to the report or None if report is disabled
+        :rtype: Optional[str]
+        """
+        name: Optional[str] = RunReport.__report_name.get()
+        with self.__lock:
+            collected: dict = self.__get_report()
+            # the next records of the name go to the new report
+            self.__reports[name] = self.__start_report()
+        if self.get_run_report_config()['enabled'] != "True":
+            return None
+        report: dict = self.__summarize(collected)
+        log_dir: str = os.path.normpath(ConfigReader.get_logger_config()['log_dir'])
+        os.makedirs(log_dir, exist_ok=True)
+        name_part: str = "" if name is None else re.sub(r"[^\w.-]", "_", name) + "_"
+        report_path: str = os.path.join(
+            log_dir, f"run_report_{name_part}{collected['started_at'].strftime('%Y%m%d%H%M%S%f')}.json"
+        )
+        with open(report_path, "w", encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=2)
+        if self.__profiler is not None:
+            self.__profiler.disable()
+            self.__profiler.dump_stats(report_path[:-len(".json")] + ".prof")
+            self.__profiler = None
+        Logger().get_logger().info(f"Run report is written to '{report_path}': {report['seconds']:.3f} seconds, "
+                                   f"{report['retries']} retries")
+        return report_path
+
+    def __get_report(self) -> dict:
+        """
+        Private method for getting report of the current thread, report is started if it doesn't exist yet.
+        Lock must be held by the caller.
+        :return: spans, files, measures and start of the report
+        :rtype: dict
+        """
+        name: Optional[str] = RunReport.__report_name.get()
+        if name not in self.__reports:
+            self.__reports[name] = self.__start_report()
+        return self.__reports[name]
+
+    @staticmethod
+    def __start_report() -> dict:
+        """
+        Private method for starting empty report
+        :return: spans, files, measures and start of the report
+        :rtype: dict
+        """
+        return {"spans": [], "files": [], "measures": {}, "started_at": datetime.now(), "start": time.perf_counter()}
+
+    def __get_stack(self) -> list[dict]:
+        """
+        Private method for getting stack of spans which are open in the current thread
+        :return: open spans
+        :rtype: list[dict]
+        """
+        if not hasattr(self.__local, "stack"):
+            self.__local.stack = []
+        return self.__local.stack
@@ -0,0 +1,57 @@
+"""
+Module of worker_pool. Class WorkerPool is represented in this module.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Mapping, Optional
+from utils.config_manager import ConfigReader
+from utils.singleton_util import Singleton
+import contextvars
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    Class ContextThreadPoolExecutor runs every task in a copy of context of the thread which submitted it, so context
+    variables of the thread (e.g. name of report of RunReport) are seen by the task
+    """
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        """
+        Method submit schedules task in a copy of context of the calling thread
+        :param fn: function of the task, it's called with args and kwargs
+        :type fn: Callable
+        :return: future of the task
+        :rtype: Future
+        """
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+class WorkerPool(metaclass=Singleton):
+    """
+    Class WorkerPool keeps the only one pool of upload workers per process.
+    Size of the pool is set by 'max_workers' from 'upload_config' in main config. If adaptive limit of parallel upload
+    requests is 'enabled' in 'concurrency_config', the pool has at least 'max_limit' workers, so the limit isn't capped
+    by the pool.
+    """
+    __executor: Optional[ContextThreadPoolExecutor] = None
+
+    def get_executor(self) -> ContextThreadPoolExecutor:
+        """
+        Method get_executor creates pool of workers on the first call and returns the same pool on the next calls
+        :return: pool of workers
+        :rtype: ContextThreadPoolExecutor
+        """
+        if self.__executor is None:
+            self.__executor = ContextThreadPoolExecutor(max_workers=self.get_max_workers(),
+                                                        thread_name_prefix="upload_worker")
+        return self.__executor
+
+    def get_max_workers(self) -> int:
+        """
+        Method get_max_workers returns size of the pool of workers
+        :return: number of workers
+        :rtype: int
+        """
+        main_config: Mapping = ConfigReader.get_main_config()
+        max_workers: int = main_config['upload_config']['max_workers']
+        if main_config['concurrency_config']['enabled'] == "True":
+            return max(max_workers, main_config['concurrency_config']['max_limit'])
+        return max_workers